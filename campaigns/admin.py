@@ -49,7 +49,7 @@ class CampaignAdmin(admin.ModelAdmin):
 class CharacterSkillInline(admin.TabularInline):
     model = CharacterSkill
     extra = 0
-    readonly_fields = ("total_value",)
+    readonly_fields = ("total",)
 
 # ===========================================================
 # ADMIN: CampaignCharacter
@@ -107,7 +107,7 @@ class SkillAdmin(admin.ModelAdmin):
 
 @admin.register(CharacterSkill)
 class CharacterSkillAdmin(admin.ModelAdmin):
-    list_display = ("id", "character", "skill", "proficiency_level", "total_value")
+    list_display = ("id", "character", "skill", "proficiency_level", "total")
     list_filter = ("skill", "proficiency_level")
     search_fields = ("character__name", "skill__name")
 
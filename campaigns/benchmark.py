@@ -0,0 +1,173 @@
+"""
+Benchmark dos endpoints de /api/.
+
+Cada endpoint é chamado pelo cliente de teste do DRF e medido em
+latência (p50/p95), número de consultas SQL e tempo gasto no banco.
+O resultado pode ser comparado com um arquivo de baseline.
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+
+# quanto a latência p95 pode piorar em relação à baseline (0.5 = +50%)
+DEFAULT_TOLERANCE = 0.5
+
+# folga absoluta, para que ruído em endpoints de poucos ms não conte
+MIN_SLACK_MS = 5
+
+
+def endpoints(data):
+    """Lista (nome, url) com todos os endpoints do router de /api/."""
+    campaign = data["campaigns"][0]
+    character = next(c for c in data["characters"] if c.campaign_id == campaign.pk)
+
+    return [
+        ("campaigns-list", "/api/campaigns/"),
+        ("campaigns-detail", f"/api/campaigns/{campaign.pk}/"),
+        ("campaigns-characters", f"/api/campaigns/{campaign.pk}/characters/"),
+        ("campaigns-invites", f"/api/campaigns/{campaign.pk}/invites/"),
+        ("characters-list", "/api/characters/"),
+        ("characters-detail", f"/api/characters/{character.pk}/"),
+        ("characters-skills", f"/api/characters/{character.pk}/skills/"),
+        ("invites-list", "/api/invites/"),
+        ("campaign-logs-list", "/api/campaign-logs/"),
+    ]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = round((len(ordered) - 1) * pct / 100)
+    return ordered[index]
+
+
+class QueryTimer:
+    """Conta consultas e soma o tempo de cada uma (execute_wrapper)."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def measure(client, url, repeat=5):
+    latencies = []
+    query_counts = []
+    sql_times = []
+
+    for _ in range(repeat):
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            start = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} respondeu {response.status_code}")
+
+        query_counts.append(timer.count)
+        sql_times.append(timer.seconds * 1000)
+
+    return {
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "queries": max(query_counts),
+        "sql_ms": round(statistics.median(sql_times), 2),
+    }
+
+
+def run(data, *, repeat=5, user=None):
+    """Mede todos os endpoints como o usuário informado (ou o primeiro gerado)."""
+    from characters import catalog
+
+    # como no servidor (setup/wsgi.py), o catálogo já está em memória
+    catalog.invalidate()
+    catalog.warm()
+
+    client = APIClient()
+    client.force_authenticate(user or data["users"][0])
+
+    return {
+        name: measure(client, url, repeat=repeat)
+        for name, url in endpoints(data)
+    }
+
+
+def query_plans(user):
+    """
+    EXPLAIN das consultas de escopo (get_queryset) das listagens, como
+    o usuário informado. Útil para conferir que não há DISTINCT nem
+    JOIN em players.
+    """
+    from .views import CampaignViewSet, CampaignCharacterViewSet, CampaignLogViewSet
+
+    factory = APIRequestFactory()
+    plans = {}
+
+    for name, viewset in [
+        ("campaigns", CampaignViewSet),
+        ("characters", CampaignCharacterViewSet),
+        ("campaign-logs", CampaignLogViewSet),
+    ]:
+        request = Request(factory.get("/"))
+        request.user = user
+
+        view = viewset(request=request, action="list", format_kwarg=None, kwargs={})
+        queryset = view.get_queryset()
+        plans[name] = {"sql": str(queryset.query), "plan": queryset.explain()}
+
+    return plans
+
+
+def compare(results, baseline, *, tolerance=DEFAULT_TOLERANCE):
+    """
+    Devolve a lista de regressões em relação à baseline.
+
+    Número de consultas não pode aumentar; a latência p95 pode variar
+    até `tolerance` (e no mínimo MIN_SLACK_MS) antes de contar como
+    regressão.
+    """
+    regressions = []
+
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            regressions.append(f"{name}: endpoint ausente no resultado")
+            continue
+
+        if current["queries"] > base["queries"]:
+            regressions.append(
+                f"{name}: {current['queries']} consultas (baseline {base['queries']})"
+            )
+
+        limit = max(base["p95_ms"] * (1 + tolerance), base["p95_ms"] + MIN_SLACK_MS)
+        if current["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']}ms (baseline {base['p95_ms']}ms)"
+            )
+
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def save_baseline(params, results, path=BASELINE_PATH):
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump({"params": params, "endpoints": results}, fp, indent=2, ensure_ascii=False)
+        fp.write("\n")
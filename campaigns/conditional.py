@@ -0,0 +1,50 @@
+"""
+GET condicional (ETag / Last-Modified) para fichas e campanhas.
+
+Os validadores vêm de uma única consulta que lê só o updated_at da
+linha (e, para fichas, a versão do catálogo de regras embutido nelas).
+"""
+from django.db.models import Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from characters.models import CatalogVersion
+
+
+def catalog_annotations():
+    version = CatalogVersion.objects.filter(pk=1)
+    return {
+        "catalog_version": Subquery(version.values("version")[:1]),
+        "catalog_updated_at": Subquery(version.values("updated_at")[:1]),
+    }
+
+
+def validators(prefix, pk, user, updated_at, catalog_version=None, catalog_updated_at=None):
+    """
+    (etag, last_modified) de um objeto. O ETag inclui o usuário porque
+    a resposta depende dele (ex.: available_actions).
+    """
+    parts = [prefix, str(pk), f"u{user.pk}", str(int(updated_at.timestamp() * 1_000_000))]
+    last_modified = updated_at
+    if catalog_version is not None:
+        parts.append(f"c{catalog_version}")
+    if catalog_updated_at is not None:
+        last_modified = max(last_modified, catalog_updated_at)
+
+    return '"' + "-".join(parts) + '"', int(last_modified.timestamp())
+
+
+def not_modified(request, etag, last_modified):
+    """Resposta 304 se o cliente já tem essa versão, senão None."""
+    return get_conditional_response(
+        request._request if hasattr(request, "_request") else request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,447 @@
+"""
+Dados: testes em grupo e expressões de dados.
+
+Testes em grupo (perícia ou resistência) rolam para um grupo inteiro de
+uma vez: todos os d20 saem de um único sorteio (`Random.choices` com
+k = número de dados) e o resto é aritmética sobre as listas. O gerador
+é semeado: o mesmo seed repete exatamente as mesmas rolagens.
+"""
+import random
+import re
+import secrets
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from math import comb
+
+D20 = range(1, 21)
+
+NORMAL = "normal"
+ADVANTAGE = "advantage"
+DISADVANTAGE = "disadvantage"
+
+MODES = [
+    (NORMAL, "Normal"),
+    (ADVANTAGE, "Vantagem"),
+    (DISADVANTAGE, "Desvantagem"),
+]
+
+# limite de participantes por chamada (personagens + NPCs)
+MAX_PARTICIPANTS = 10000
+
+
+def new_seed():
+    return secrets.randbits(32)
+
+
+def roll_d20s(count, mode=NORMAL, rng=None):
+    """
+    `count` testes de d20 num único sorteio. Devolve (mantidos, rolagens):
+    o dado que vale de cada teste e os dados rolados (dois com
+    vantagem/desvantagem).
+    """
+    rng = rng or random.Random()
+    if mode == NORMAL:
+        kept = rng.choices(D20, k=count)
+        return kept, [(face,) for face in kept]
+
+    faces = rng.choices(D20, k=count * 2)
+    pairs = list(zip(faces[::2], faces[1::2]))
+    pick = max if mode == ADVANTAGE else min
+    return [pick(pair) for pair in pairs], pairs
+
+
+@dataclass(frozen=True)
+class Participant:
+    id: int | None
+    name: str
+    modifier: int
+    npc: bool = False
+
+
+def group_check(participants, dc, mode=NORMAL, seed=None):
+    """
+    Rola o teste para todos os `participants` contra a CD `dc`.
+
+    Sucesso é total >= CD; 20 e 1 naturais só são contados à parte. O
+    grupo passa se pelo menos metade passar.
+    """
+    seed = new_seed() if seed is None else seed
+    kept, rolls = roll_d20s(len(participants), mode, random.Random(seed))
+
+    results = []
+    successes = critical_successes = critical_failures = 0
+    for participant, natural, dice in zip(participants, kept, rolls):
+        total = natural + participant.modifier
+        success = total >= dc
+        successes += success
+        critical_successes += natural == 20
+        critical_failures += natural == 1
+        results.append({
+            "id": participant.id,
+            "name": participant.name,
+            "npc": participant.npc,
+            "modifier": participant.modifier,
+            "rolls": list(dice),
+            "natural": natural,
+            "total": total,
+            "success": success,
+        })
+
+    count = len(participants)
+    return {
+        "seed": seed,
+        "dc": dc,
+        "mode": mode,
+        "results": results,
+        "summary": {
+            "count": count,
+            "successes": successes,
+            "failures": count - successes,
+            "critical_successes": critical_successes,
+            "critical_failures": critical_failures,
+            "group_success": count > 0 and successes * 2 >= count,
+        },
+    }
+
+
+# ----------------------------------------
+# EXPRESSÕES DE DADOS (4d6kh3, 2d20kl1+5, 1d8+1d6+3)
+# ----------------------------------------
+# Cada expressão é compilada uma vez (cache LRU) num DiceExpression, que
+# rola em lote e calcula a distribuição exata dos resultados por
+# convolução das contagens de cada termo, sem amostragem.
+
+CACHE_SIZE = 512
+
+MAX_DICE = 100
+MAX_SIDES = 1000
+# amplitude máxima (max - min) para a distribuição exata
+MAX_RANGE = 5000
+# custo máximo (estados x faces) da contagem de kh/kl
+MAX_KEEP_WORK = 5_000_000
+
+MODE_DICE = {
+    NORMAL: "1d20",
+    ADVANTAGE: "2d20kh1",
+    DISADVANTAGE: "2d20kl1",
+}
+
+_TERM = re.compile(r"([+-]?)(?:(\d*)d(\d+)(?:(kh|kl)(\d+))?|(\d+))")
+
+
+class DiceError(ValueError):
+    pass
+
+
+class Distribution:
+    """
+    Contagem exata de resultados: counts[i] maneiras de obter offset + i,
+    em `total` combinações igualmente prováveis.
+    """
+
+    def __init__(self, offset, counts, total):
+        self.offset = offset
+        self.counts = counts
+        self.total = total
+
+    @classmethod
+    def constant(cls, value):
+        return cls(value, [1], 1)
+
+    @property
+    def min(self):
+        return self.offset
+
+    @property
+    def max(self):
+        return self.offset + len(self.counts) - 1
+
+    @property
+    def mean(self):
+        return Fraction(
+            sum((self.offset + i) * ways for i, ways in enumerate(self.counts)), self.total
+        )
+
+    def probability(self, value):
+        i = value - self.offset
+        if 0 <= i < len(self.counts):
+            return Fraction(self.counts[i], self.total)
+        return Fraction(0)
+
+    def at_least(self, value):
+        i = max(value - self.offset, 0)
+        return Fraction(sum(self.counts[i:]), self.total)
+
+    def shift(self, value):
+        return Distribution(self.offset + value, self.counts, self.total)
+
+    def negate(self):
+        return Distribution(-self.max, self.counts[::-1], self.total)
+
+    def convolve(self, other):
+        counts = [0] * (len(self.counts) + len(other.counts) - 1)
+        for i, a in enumerate(self.counts):
+            if a:
+                for j, b in enumerate(other.counts):
+                    counts[i + j] += a * b
+        return Distribution(self.offset + other.offset, counts, self.total * other.total)
+
+    def as_floats(self):
+        return {self.offset + i: ways / self.total for i, ways in enumerate(self.counts) if ways}
+
+
+def _sum_counts(count, sides):
+    """Contagens da soma de `count` dados de `sides` faces (NdS)."""
+    counts = [1]
+    for _ in range(count):
+        # somar um dado = janela deslizante de largura `sides`
+        prefix = [0]
+        for ways in counts:
+            prefix.append(prefix[-1] + ways)
+        length = len(counts) + sides - 1
+        counts = [
+            prefix[min(t + 1, len(counts))] - prefix[max(t + 1 - sides, 0)]
+            for t in range(length)
+        ]
+    return Distribution(count, counts, sides ** count)
+
+
+def _keep_highest_counts(count, sides, keep):
+    """
+    Contagens da soma dos `keep` maiores de `count` dados (NdSkhK).
+
+    Percorre as faces da maior para a menor distribuindo os dados; os
+    primeiros `keep` dados atribuídos são os mantidos.
+    """
+    states = {(0, 0): 1}  # (dados atribuídos, soma mantida) -> maneiras
+    for face in range(sides, 0, -1):
+        following = defaultdict(int)
+        for (used, kept_sum), ways in states.items():
+            free = count - used
+            for j in range(free + 1):
+                kept = max(0, min(j, keep - used))
+                following[used + j, kept_sum + kept * face] += ways * comb(free, j)
+        states = following
+
+    counts = [0] * (keep * sides - keep + 1)
+    for (used, kept_sum), ways in states.items():
+        if used == count:
+            counts[kept_sum - keep] += ways
+    return Distribution(keep, counts, sides ** count)
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    count: int
+    sides: int
+    keep: int | None = None
+    highest: bool = True
+    sign: int = 1
+
+    def __str__(self):
+        text = f"{self.count}d{self.sides}"
+        if self.keep is not None:
+            text += f"{'kh' if self.highest else 'kl'}{self.keep}"
+        return text
+
+    @property
+    def kept(self):
+        return self.count if self.keep is None else self.keep
+
+    def roll_many(self, n, rng):
+        """`n` rolagens do termo, com todos os dados num único sorteio."""
+        faces = rng.choices(range(1, self.sides + 1), k=n * self.count)
+        if self.keep is None:
+            sums = [sum(faces[i:i + self.count]) for i in range(0, len(faces), self.count)]
+        else:
+            sums = [
+                sum(sorted(faces[i:i + self.count], reverse=self.highest)[:self.keep])
+                for i in range(0, len(faces), self.count)
+            ]
+        return sums if self.sign > 0 else [-value for value in sums]
+
+    def distribution(self):
+        if self.keep is None or self.keep == self.count:
+            dist = _sum_counts(self.count, self.sides)
+        else:
+            work = self.sides * self.count ** 2 * self.keep * self.sides
+            if work > MAX_KEEP_WORK:
+                raise DiceError(f"{self} é grande demais para a distribuição exata.")
+            dist = _keep_highest_counts(self.count, self.sides, self.keep)
+            if not self.highest:
+                # kl de S faces = kh de (S + 1 - face)
+                dist = dist.negate().shift(self.keep * (self.sides + 1))
+        return dist if self.sign > 0 else dist.negate()
+
+
+class DiceExpression:
+    """Expressão compilada: soma de termos de dados e um modificador fixo."""
+
+    def __init__(self, terms, modifier):
+        self.terms = tuple(terms)
+        self.modifier = modifier
+        self._distribution = None
+
+    def __str__(self):
+        parts = []
+        for term in self.terms:
+            parts.append(("-" if term.sign < 0 else "+") + str(term))
+        if self.modifier or not parts:
+            parts.append(f"{self.modifier:+d}")
+        return "".join(parts).lstrip("+")
+
+    @property
+    def min(self):
+        return self.modifier + sum(
+            t.kept if t.sign > 0 else -t.kept * t.sides for t in self.terms
+        )
+
+    @property
+    def max(self):
+        return self.modifier + sum(
+            t.kept * t.sides if t.sign > 0 else -t.kept for t in self.terms
+        )
+
+    def roll(self, rng=None):
+        return self.roll_many(1, rng)[0]
+
+    def roll_many(self, n, rng=None):
+        rng = rng or random.Random()
+        totals = [self.modifier] * n
+        for term in self.terms:
+            totals = [a + b for a, b in zip(totals, term.roll_many(n, rng))]
+        return totals
+
+    @property
+    def distribution(self):
+        """Distribuição exata (calculada na primeira vez e guardada)."""
+        if self._distribution is None:
+            if self.max - self.min > MAX_RANGE:
+                raise DiceError(f"{self} tem resultados demais para a distribuição exata.")
+            dist = Distribution.constant(self.modifier)
+            for term in self.terms:
+                dist = dist.convolve(term.distribution())
+            self._distribution = dist
+        return self._distribution
+
+
+def _normalize(expression):
+    if re.search(r"[0-9a-z]\s+[0-9a-z]", expression, re.IGNORECASE):
+        raise DiceError(f"Expressão de dados inválida: {expression!r}")
+    return re.sub(r"\s+", "", expression).lower()
+
+
+def parse(expression):
+    """Compila sem cache; prefira compile_expression."""
+    text = _normalize(expression)
+    if not text:
+        raise DiceError("Expressão de dados vazia.")
+
+    terms, modifier, position = [], 0, 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if match is None or match.end() == position or (position and not match.group(1)):
+            raise DiceError(f"Expressão de dados inválida: {expression!r}")
+        position = match.end()
+
+        sign, count, sides, keep_kind, keep, constant = match.groups()
+        sign = -1 if sign == "-" else 1
+        if constant is not None:
+            modifier += sign * int(constant)
+            continue
+
+        count = int(count) if count else 1
+        sides = int(sides)
+        if not 1 <= count <= MAX_DICE or not 1 <= sides <= MAX_SIDES:
+            raise DiceError(f"Use de 1 a {MAX_DICE} dados de 1 a {MAX_SIDES} faces.")
+
+        keep_count = None
+        if keep_kind:
+            keep_count = int(keep)
+            if not 1 <= keep_count <= count:
+                raise DiceError(f"Não dá para manter {keep_count} de {count} dados.")
+        terms.append(DiceTerm(count, sides, keep_count, keep_kind != "kl", sign))
+
+    return DiceExpression(terms, modifier)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile(text):
+    return parse(text)
+
+
+def compile_expression(expression):
+    """Expressão compilada, do cache LRU quando já vista."""
+    return _compile(_normalize(expression))
+
+
+def success_chance(modifier, dc, die=MODE_DICE[NORMAL]):
+    """Chance exata de die + modificador >= CD."""
+    return compile_expression(die).distribution.at_least(dc - modifier)
+
+
+def party_odds(modifiers, dc, die=MODE_DICE[NORMAL]):
+    """
+    Chances de um grupo num teste: de cada um, de todos, de ao menos um,
+    do teste em grupo (metade ou mais) e o número esperado de sucessos.
+    """
+    chances = [float(success_chance(m, dc, die)) for m in modifiers]
+
+    # distribuição do número de sucessos (binomial de Poisson)
+    successes = [1.0]
+    for p in chances:
+        following = [0.0] * (len(successes) + 1)
+        for k, prob in enumerate(successes):
+            following[k] += prob * (1 - p)
+            following[k + 1] += prob * p
+        successes = following
+
+    half = (len(chances) + 1) // 2
+    return {
+        "each": chances,
+        "all": successes[-1],
+        "any": 1 - successes[0],
+        "group": sum(successes[half:]) if chances else 0.0,
+        "expected_successes": sum(chances),
+    }
+
+
+def monte_carlo(expression, samples, seed=0):
+    """Distribuição estimada por amostragem (para comparar com a exata)."""
+    totals = compile_expression(expression).roll_many(samples, random.Random(seed))
+    return {value: hits / samples for value, hits in Counter(totals).items()}
+
+
+def benchmark(expressions, samples=100_000, seed=0):
+    """
+    Tempo da distribuição exata (sem cache e com cache) contra Monte
+    Carlo com `samples` amostras, e o maior erro da estimativa.
+    """
+    results = []
+    for expression in expressions:
+        start = time.perf_counter()
+        exact = parse(expression).distribution.as_floats()
+        exact_ms = (time.perf_counter() - start) * 1000
+
+        compile_expression(expression).distribution
+        start = time.perf_counter()
+        compile_expression(expression).distribution
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        estimate = monte_carlo(expression, samples, seed)
+        monte_carlo_ms = (time.perf_counter() - start) * 1000
+
+        results.append({
+            "expression": expression,
+            "exact_ms": round(exact_ms, 3),
+            "cached_ms": round(cached_ms, 4),
+            "monte_carlo_ms": round(monte_carlo_ms, 3),
+            "max_error": max(
+                abs(exact.get(v, 0) - estimate.get(v, 0)) for v in exact.keys() | estimate.keys()
+            ),
+        })
+    return results
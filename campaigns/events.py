@@ -0,0 +1,136 @@
+"""
+Atividade da mesa em tempo real (Server-Sent Events).
+
+Cada escrita relevante (novo CampaignLog, recursos alterados) é
+serializada uma vez e entregue a todos os ouvintes da campanha neste
+processo, sem nenhuma leitura extra no banco por assinante.
+
+As escritas acontecem em threads (views síncronas) e os ouvintes vivem
+no event loop do ASGI: a entrega atravessa com call_soon_threadsafe.
+Com vários processos cada um tem seu próprio hub; quem reconecta com
+Last-Event-ID recebe do banco os logs que perdeu.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# eventos pendentes por ouvinte antes de derrubar a conexão (o cliente
+# reconecta e recupera os logs pelo Last-Event-ID)
+DEFAULT_QUEUE_SIZE = 256
+
+# comentário enviado quando a mesa fica quieta, para proxies não
+# fecharem a conexão
+DEFAULT_KEEPALIVE = 15.0
+
+
+def encode(event, data, id=None):
+    """Um evento no formato text/event-stream."""
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in json.dumps(data, default=str).splitlines())
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Subscription:
+    def __init__(self, campaign_id, loop, queue_size):
+        self.campaign_id = campaign_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def _push(self, payload):
+        # roda no loop do ouvinte
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # ouvinte lento: encerra o stream em vez de acumular memória
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """Próximo evento já codificado, ou None se o stream acabou."""
+        return await self.queue.get()
+
+
+class EventHub:
+    """Fan-out em processo: um publish, N ouvintes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, campaign_id):
+        queue_size = getattr(settings, "CAMPAIGN_EVENTS_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+        subscription = Subscription(campaign_id, asyncio.get_running_loop(), queue_size)
+        with self._lock:
+            self._subscribers[campaign_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            listeners = self._subscribers.get(subscription.campaign_id)
+            if listeners is not None:
+                listeners.discard(subscription)
+                if not listeners:
+                    del self._subscribers[subscription.campaign_id]
+
+    def listeners(self, campaign_id):
+        with self._lock:
+            return len(self._subscribers.get(campaign_id, ()))
+
+    def publish(self, campaign_id, event, data, id=None):
+        with self._lock:
+            listeners = list(self._subscribers.get(campaign_id, ()))
+        if not listeners:
+            return 0
+
+        payload = encode(event, data, id)
+        for subscription in listeners:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._push, payload)
+            except RuntimeError:
+                # loop já fechado (servidor encerrando)
+                self.unsubscribe(subscription)
+        return len(listeners)
+
+
+hub = EventHub()
+
+
+def publish_on_commit(campaign_id, event, build, id=None):
+    """
+    Publica depois do commit, e só se alguém estiver ouvindo: `build`
+    monta o payload e não é chamado para campanhas sem ouvintes.
+    """
+    def send():
+        if hub.listeners(campaign_id):
+            hub.publish(campaign_id, event, build(), id=id)
+
+    transaction.on_commit(send)
+
+
+def publish_log(log):
+    from .serializers import CampaignLogSerializer
+
+    publish_on_commit(
+        log.campaign_id, "log", lambda: CampaignLogSerializer(log).data, id=log.pk
+    )
+
+
+def publish_resources(campaign_id, characters):
+    from .models import RESOURCE_FIELDS
+
+    rows = [
+        {"id": c.pk, **{field: getattr(c, field) for field in RESOURCE_FIELDS}}
+        for c in characters
+    ]
+    publish_on_commit(campaign_id, "resources", lambda: {"characters": rows})
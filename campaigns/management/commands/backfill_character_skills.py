@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from campaigns.models import CampaignCharacter, CharacterSkill
+
+
+class Command(BaseCommand):
+    help = "Cria as linhas de CharacterSkill que faltam em fichas já existentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Personagens por INSERT.")
+
+    def handle(self, *args, **options):
+        before = CharacterSkill.objects.count()
+
+        CharacterSkill.objects.provision(
+            CampaignCharacter.objects.order_by("pk").values_list("pk", flat=True).iterator(),
+            chunk_size=options["chunk_size"],
+        )
+
+        created = CharacterSkill.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(f"{created} skills criadas."))
@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from campaigns import benchmark, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera dados sintéticos num banco de teste e mede latência, "
+        "consultas e tempo SQL de cada endpoint de /api/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--campaigns", type=int, default=10)
+        parser.add_argument("--characters", type=int, default=40,
+                            help="Personagens por campanha.")
+        parser.add_argument("--logs", type=int, default=20000)
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Requisições por endpoint.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--baseline", default=benchmark.BASELINE_PATH)
+        parser.add_argument("--tolerance", type=float, default=benchmark.DEFAULT_TOLERANCE)
+        parser.add_argument("--update-baseline", action="store_true",
+                            help="Grava o resultado como nova baseline.")
+        parser.add_argument("--no-compare", action="store_true",
+                            help="Só mede, sem comparar com a baseline.")
+        parser.add_argument("--explain", action="store_true",
+                            help="Mostra o plano das consultas de escopo das listagens.")
+
+    def handle(self, *args, **options):
+        params = {
+            "users": options["users"],
+            "campaigns": options["campaigns"],
+            "characters_per_campaign": options["characters"],
+            "logs": options["logs"],
+            "seed": options["seed"],
+        }
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            data = synthetic.generate(**params)
+            results = benchmark.run(data, repeat=options["repeat"])
+            plans = benchmark.query_plans(data["users"][0]) if options["explain"] else {}
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self._print(results)
+        for name, plan in plans.items():
+            self.stdout.write(f"\n{name}:\n{plan['sql']}\n{plan['plan']}")
+
+        if options["update_baseline"]:
+            benchmark.save_baseline(params, results, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline gravada em {options['baseline']}"))
+            return
+
+        if options["no_compare"]:
+            return
+
+        try:
+            baseline = benchmark.load_baseline(options["baseline"])
+        except FileNotFoundError:
+            raise CommandError(f"Baseline não encontrada: {options['baseline']}")
+
+        if baseline["params"] != params:
+            raise CommandError(
+                f"Parâmetros diferentes da baseline ({baseline['params']}); "
+                "rode com os mesmos parâmetros ou use --update-baseline."
+            )
+
+        regressions = benchmark.compare(
+            results, baseline["endpoints"], tolerance=options["tolerance"]
+        )
+        if regressions:
+            raise CommandError("Regressões:\n  " + "\n  ".join(regressions))
+
+        self.stdout.write(self.style.SUCCESS("Nenhuma regressão em relação à baseline."))
+
+    def _print(self, results):
+        header = f"{'endpoint':<24}{'p50 ms':>10}{'p95 ms':>10}{'queries':>10}{'sql ms':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<24}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['queries']:>10}{r['sql_ms']:>10}"
+            )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from campaigns import dice
+
+DEFAULT_EXPRESSIONS = ["1d20+5", "2d20kh1+5", "2d20kl1+5", "4d6kh3", "1d8+1d6+3", "8d6", "10d10kh5"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a distribuição exata das expressões de dados com a "
+        "estimativa por Monte Carlo (tempo e maior erro)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("expressions", nargs="*", default=DEFAULT_EXPRESSIONS)
+        parser.add_argument("--samples", type=int, default=100_000,
+                            help="Amostras de Monte Carlo por expressão.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            results = dice.benchmark(
+                options["expressions"], samples=options["samples"], seed=options["seed"]
+            )
+        except dice.DiceError as e:
+            raise CommandError(str(e))
+
+        header = f"{'expressão':<16}{'exata ms':>10}{'cache ms':>10}{'monte carlo ms':>16}{'erro máx':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in results:
+            self.stdout.write(
+                f"{r['expression']:<16}{r['exact_ms']:>10}{r['cached_ms']:>10}"
+                f"{r['monte_carlo_ms']:>16}{r['max_error']:>10.4f}"
+            )
@@ -0,0 +1,54 @@
+from django.db.models import Value
+
+from .models import Campaign
+
+
+class CampaignMembership:
+    """
+    Campanhas em que um usuário é mestre (owned) ou jogador (joined).
+
+    Carregada com uma única consulta e guardada no request, para que
+    todos os querysets filtrem por campaign_id IN (...) em vez de fazer
+    JOIN em players + DISTINCT.
+    """
+    OWNER = "owner"
+    PLAYER = "player"
+
+    def __init__(self, owned=(), joined=()):
+        self.owned = frozenset(owned)
+        self.joined = frozenset(joined)
+        self.visible = self.owned | self.joined
+
+    @classmethod
+    def load(cls, user):
+        if not user.is_authenticated:
+            return cls()
+
+        Players = Campaign.players.through
+        rows = Campaign.objects.filter(owner=user).annotate(
+            role=Value(cls.OWNER)
+        ).values_list("pk", "role").union(
+            Players.objects.filter(user=user).annotate(
+                role=Value(cls.PLAYER)
+            ).values_list("campaign_id", "role")
+        )
+
+        owned, joined = set(), set()
+        for campaign_id, role in rows:
+            (owned if role == cls.OWNER else joined).add(campaign_id)
+        return cls(owned, joined)
+
+    def is_owner(self, campaign_id):
+        return campaign_id in self.owned
+
+    def is_member(self, campaign_id):
+        return campaign_id in self.visible
+
+
+def get_membership(request):
+    """Membership do usuário do request, carregada uma vez por request."""
+    membership = getattr(request, "_campaign_membership", None)
+    if membership is None:
+        membership = CampaignMembership.load(request.user)
+        request._campaign_membership = membership
+    return membership
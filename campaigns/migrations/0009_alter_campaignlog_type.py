@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0008_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='campaignlog',
+            name='type',
+            field=models.CharField(choices=[('status_change', 'Mudança de status'), ('character_created', 'Personagem criado'), ('character_removed', 'Personagem removido'), ('resource_change', 'Recursos alterados'), ('system', 'Sistema')], default='system', max_length=30),
+        ),
+    ]
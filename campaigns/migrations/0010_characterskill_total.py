@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:39
+
+from django.db import migrations, models
+
+
+def fill_totals(apps, schema_editor):
+    CharacterSkill = apps.get_model("campaigns", "CharacterSkill")
+
+    rows = CharacterSkill.objects.select_related("character", "skill").order_by("pk")
+    last_pk = 0
+    while chunk := list(rows.filter(pk__gt=last_pk)[:500]):
+        for row in chunk:
+            mod = (getattr(row.character, row.skill.ability) - 10) // 2
+            prof = 2 + ((row.character.level - 1) // 4)
+            row.total = mod + prof * row.proficiency_level
+        CharacterSkill.objects.bulk_update(chunk, ["total"])
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0009_alter_campaignlog_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='characterskill',
+            name='total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0010_characterskill_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='campaigncharacter',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
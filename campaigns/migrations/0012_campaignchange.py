@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_changes(apps, schema_editor):
+    # o estado que já existia entra no feed, para since=0 trazer tudo
+    CampaignChange = apps.get_model("campaigns", "CampaignChange")
+
+    sources = [
+        ("characters", "CampaignCharacter"),
+        ("skills", "CampaignCharacter"),
+        ("invites", "CampaignInvite"),
+        ("logs", "CampaignLog"),
+    ]
+    for kind, model_name in sources:
+        model = apps.get_model("campaigns", model_name)
+        CampaignChange.objects.bulk_create(
+            (
+                CampaignChange(kind=kind, object_id=pk, campaign_id=campaign_id)
+                for pk, campaign_id in model.objects.order_by("pk").values_list("pk", "campaign_id")
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0011_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('characters', 'Personagem'), ('skills', 'Skills do personagem'), ('invites', 'Convite'), ('logs', 'Log')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('updated', 'Alterado'), ('deleted', 'Removido')], default='updated', max_length=10)),
+                ('campaign', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='changes', to='campaigns.campaign')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['campaign', 'id'], name='campaigns_c_campaig_4177f9_idx')],
+            },
+        ),
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
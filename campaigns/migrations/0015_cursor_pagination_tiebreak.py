@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0014_campaignlog_type_loot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='campaignlog',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='campaignlog',
+            name='campaigns_c_campaig_f4d79a_idx',
+        ),
+        migrations.AlterField(
+            model_name='campaign',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='campaigninvite',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='campaignlog',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['-created_at', '-id'], name='campaigns_c_created_c2ec3e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaigninvite',
+            index=models.Index(fields=['invited_user', '-created_at', '-id'], name='campaigns_c_invited_2fec4f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaigninvite',
+            index=models.Index(fields=['campaign', '-created_at', '-id'], name='campaigns_c_campaig_85d6e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaignlog',
+            index=models.Index(fields=['-created_at', '-id'], name='campaigns_c_created_1657c5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaignlog',
+            index=models.Index(fields=['campaign', '-created_at', '-id'], name='campaigns_c_campaig_f6063d_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0015_cursor_pagination_tiebreak'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='campaignlog',
+            name='campaign',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='logs', to='campaigns.campaign'),
+        ),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+from itertools import islice
+
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least, Now
+from django.utils import timezone
 from django.conf import settings
 from characters.models import (
     CharacterBase,
@@ -8,8 +13,40 @@ from characters.models import (
 )
 from django.core.exceptions import ValidationError
 
+from . import events
+
 User = settings.AUTH_USER_MODEL
 
+# Número fixo de consultas para serializar fichas carregadas com with_sheet()
+# (com o catálogo de regras em memória, ver characters.catalog)
+SHEET_QUERY_COUNT = 4
+
+ABILITIES = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+
+
+def ability_mod(score):
+    return (score - 10) // 2
+
+
+def proficiency_for(level):
+    return 2 + ((level - 1) // 4)
+
+
+def skill_total(mod, proficiency_bonus, proficiency_level):
+    # 0 = só o modificador, 1 = + proficiência, 2 = + 2x proficiência (expertise)
+    return mod + proficiency_bonus * proficiency_level
+
+
+# Recursos variáveis alterados durante o combate
+RESOURCE_FIELDS = ("hp", "mana", "sanity")
+
+# Limites usados quando um delta pede clamp: (mínimo, máximo); None = sem limite
+RESOURCE_LIMITS = {
+    "hp": (0, None),
+    "mana": (0, None),
+    "sanity": (0, None),
+}
+
 
 class Campaign(models.Model):
     name = models.CharField(max_length=100)
@@ -28,6 +65,13 @@ class Campaign(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # ordem da paginação por cursor (id desempata created_at)
+            models.Index(fields=["-created_at", "-id"]),
+        ]
 
     def log(self, *, actor, message, type=None):
         from .models import CampaignLog  # ou from . import CampaignLog
@@ -41,10 +85,229 @@ class Campaign(models.Model):
 
 
 
+    def update_resources(self, changes, *, actor):
+        """
+        Aplica {character_id: {"hp": .., "mana": .., "sanity": ..}} aos
+        personagens da campanha numa transação: um SELECT, um UPDATE
+        (bulk_update) e um único log consolidado.
+        """
+        with transaction.atomic():
+            characters = list(
+                self.characters.filter(pk__in=changes)
+                .only("id", "campaign_id", "name", *RESOURCE_FIELDS)
+                .order_by("pk")
+            )
+
+            missing = set(changes) - {c.pk for c in characters}
+            if missing:
+                raise ValidationError(
+                    f"Personagens não encontrados na campanha: {sorted(missing)}"
+                )
+
+            fields = set()
+            summary = []
+            for character in characters:
+                parts = []
+                for field, value in changes[character.pk].items():
+                    old = getattr(character, field)
+                    if old != value:
+                        setattr(character, field, value)
+                        fields.add(field)
+                        parts.append(f"{field} {old}→{value}")
+                if parts:
+                    summary.append(f"{character.name}: {', '.join(parts)}")
+
+            if fields:
+                now = timezone.now()
+                for character in characters:
+                    character.updated_at = now
+                CampaignCharacter.objects.bulk_update(characters, sorted(fields) + ["updated_at"])
+                CampaignChange.record(
+                    CampaignChange.CHARACTERS, [(c.pk, self.pk) for c in characters]
+                )
+                events.publish_resources(self.pk, characters)
+                self.log(
+                    actor=actor,
+                    type=CampaignLog.LogType.RESOURCE_CHANGE,
+                    message="; ".join(summary)
+                )
+
+        return characters
+
     def __str__(self):
         return self.name
 
+class CampaignCharacterQuerySet(models.QuerySet):
+    def touch(self, kind=None):
+        """
+        Marca as fichas como alteradas (updated_at) sem carregá-las e
+        registra no feed de delta sync (`kind`: CampaignChange.CHARACTERS
+        ou SKILLS).
+        """
+        rows = list(self.values_list("pk", "campaign_id"))
+        if not rows:
+            return 0
+        CampaignCharacter.objects.filter(pk__in=[pk for pk, _ in rows]).update(updated_at=Now())
+        CampaignChange.record(kind or CampaignChange.CHARACTERS, rows)
+        return len(rows)
+
+    def check_modifiers(self, *, skill=None, ability=None):
+        """
+        [(id, nome, modificador)] dos personagens do queryset numa consulta:
+        o total gravado da skill (teste de perícia) ou o modificador do
+        atributo (resistência).
+        """
+        if skill is not None:
+            return list(
+                CharacterSkill.objects.filter(character__in=self, skill_id=skill)
+                .order_by("character_id")
+                .values_list("character_id", "character__name", "total")
+            )
+        if ability not in ABILITIES:
+            raise ValueError(f"Atributo inválido: {ability}")
+        return [
+            (pk, name, ability_mod(score))
+            for pk, name, score in self.order_by("pk").values_list("pk", "name", ability)
+        ]
+
+    def apply_resource_deltas(self, deltas, clamp=False):
+        """
+        Soma deltas ({"hp": -7, "mana": 3}) nos recursos de todos os
+        personagens do queryset num único UPDATE com F(), sem ler antes
+        nem travar linhas: escritas concorrentes nunca se perdem.
+
+        Com clamp=True o resultado respeita RESOURCE_LIMITS.
+
+        Como update(), não registra no feed de delta sync: quem chama
+        registra (CampaignChange.record).
+        """
+        values = {}
+        for field, delta in deltas.items():
+            if field not in RESOURCE_FIELDS:
+                raise ValueError(f"Recurso inválido: {field}")
+
+            expression = F(field) + Value(delta)
+            if clamp:
+                low, high = RESOURCE_LIMITS[field]
+                if low is not None:
+                    expression = Greatest(expression, Value(low))
+                if high is not None:
+                    expression = Least(expression, Value(high))
+            values[field] = expression
+
+        if not values:
+            return 0
+        return self.update(**values, updated_at=Now())
+
+    def split_prefetch(self):
+        """
+        (queryset sem os prefetches, lookups): carrega a linha primeiro e
+        as relações só se precisar, com prefetch_related_objects.
+        """
+        return self.prefetch_related(None), self._prefetch_related_lookups
+
+    def with_sheet(self, fieldset=None):
+        """
+        Plano de carregamento da ficha completa (CampaignCharacterSerializer).
+
+        As regras (origem, classe, features...) vêm do catálogo em memória,
+        então a ficha custa SHEET_QUERY_COUNT consultas, independente do
+        tamanho do grupo:
+          1. personagens + campanha, usuário e personagem base (JOIN)
+          2. ids das features escolhidas
+          3. ids das opções de features escolhidas
+          4. skills do personagem + skill base (JOIN)
+
+        Se o catálogo estiver desligado (grande demais), carrega as regras
+        junto, com consultas fixas a mais.
+
+        Com um `fieldset` (campaigns.sparse) só carrega o que foi pedido.
+        """
+        from characters.catalog import get_catalog
+
+        if get_catalog() is None:
+            return self._with_sheet_relations()
+
+        if fieldset is not None:
+            return self._with_sparse_sheet(fieldset)
+
+        return self.select_related(
+            "campaign",
+            "user",
+            "base_character",
+        ).prefetch_related(
+            models.Prefetch("chosen_features", queryset=Feature.objects.only("id")),
+            models.Prefetch("chosen_feature_options", queryset=FeatureOption.objects.only("id")),
+            models.Prefetch(
+                "skills",
+                queryset=CharacterSkill.objects.select_related("skill"),
+            ),
+        )
+
+    def _with_sparse_sheet(self, fieldset):
+        # só as colunas e relações que a ficha parcial vai mostrar
+        qs = self.only(*fieldset.columns())
+
+        related = []
+        if fieldset.includes("available_actions"):
+            related.append("campaign")
+        if fieldset.includes("user_name"):
+            related.append("user")
+        if fieldset.expands("base_character"):
+            related.append("base_character")
+        if related:
+            qs = qs.select_related(*related)
+
+        prefetches = []
+        if fieldset.includes("chosen_features"):
+            prefetches.append(
+                models.Prefetch("chosen_features", queryset=Feature.objects.only("id"))
+            )
+        if fieldset.includes("chosen_feature_options"):
+            prefetches.append(
+                models.Prefetch("chosen_feature_options", queryset=FeatureOption.objects.only("id"))
+            )
+        if fieldset.expands("skills"):
+            prefetches.append(
+                models.Prefetch("skills", queryset=CharacterSkill.objects.select_related("skill"))
+            )
+        elif fieldset.includes("skills"):
+            prefetches.append(
+                models.Prefetch("skills", queryset=CharacterSkill.objects.only("id", "character_id"))
+            )
+        if prefetches:
+            qs = qs.prefetch_related(*prefetches)
+
+        return qs
+
+    def _with_sheet_relations(self):
+        return self.select_related(
+            "campaign",
+            "user",
+            "base_character",
+            "origin",
+            "lineage",
+            "char_class",
+            "subclass",
+        ).prefetch_related(
+            "origin__lineages",
+            "char_class__subclasses",
+            models.Prefetch(
+                "chosen_features",
+                queryset=Feature.objects.select_related("base_class", "subclass"),
+            ),
+            "chosen_features__options",
+            "chosen_feature_options",
+            models.Prefetch(
+                "skills",
+                queryset=CharacterSkill.objects.select_related("skill"),
+            ),
+        )
+
+
 class CampaignCharacter(models.Model):
+    objects = CampaignCharacterQuerySet.as_manager()
+
     class Status(models.TextChoices):
         DRAFT = "draft", "Rascunho"
         ACTIVE = "active", "Ativo"
@@ -58,40 +321,56 @@ class CampaignCharacter(models.Model):
         default=Status.DRAFT
     )
 
+    # Papéis de um usuário em relação a um personagem
+    ROLE_GM = "gm"        # mestre da campanha
+    ROLE_OWNER = "owner"  # dono do personagem
+
+    # Tabela de transições: (status atual, novo status) -> (papel exigido, mensagem)
+    TRANSITIONS = {
+        (Status.DRAFT, Status.ACTIVE): (ROLE_OWNER, "Apenas o dono pode ativar o personagem."),
+
+        (Status.ACTIVE, Status.DEAD): (ROLE_GM, "Apenas o mestre pode fazer isso."),
+        (Status.ACTIVE, Status.REMOVED): (ROLE_GM, "Apenas o mestre pode fazer isso."),
+        (Status.ACTIVE, Status.RETIRED): (ROLE_OWNER, "Apenas o dono pode aposentar o personagem."),
+
+        # DEAD → ACTIVE (reviver / inimigo / NPC)
+        (Status.DEAD, Status.ACTIVE): (ROLE_GM, "Apenas o mestre pode reativar."),
+
+        # RETIRED → ACTIVE (voltar à campanha)
+        (Status.RETIRED, Status.ACTIVE): (ROLE_GM, "Apenas o mestre pode reativar."),
+
+        # removido: só o mestre mexe
+        (Status.REMOVED, Status.DRAFT): (ROLE_GM, "Apenas o mestre pode alterar um personagem removido."),
+        (Status.REMOVED, Status.ACTIVE): (ROLE_GM, "Apenas o mestre pode alterar um personagem removido."),
+        (Status.REMOVED, Status.DEAD): (ROLE_GM, "Apenas o mestre pode alterar um personagem removido."),
+        (Status.REMOVED, Status.RETIRED): (ROLE_GM, "Apenas o mestre pode alterar um personagem removido."),
+    }
+
+    @classmethod
+    def roles_for(cls, user_id, character_user_id, campaign_owner_id):
+        roles = set()
+        if user_id is None:
+            return frozenset(roles)
+        if user_id == campaign_owner_id:
+            roles.add(cls.ROLE_GM)
+        if user_id == character_user_id:
+            roles.add(cls.ROLE_OWNER)
+        return frozenset(roles)
+
+    def roles(self, user):
+        return self.roles_for(user.pk, self.user_id, self.campaign.owner_id)
+
     def can_change_status(self, new_status, user):
         if new_status == self.status:
             return False, "O personagem já está nesse status."
-        
-        # não pode mudar se já foi removido
-        if self.status == self.Status.REMOVED:
-            return (
-                user == self.campaign.owner,
-                "Apenas o mestre pode alterar um personagem removido."
-            )
 
-        # regras por status atual
-        if self.status == self.Status.DRAFT:
-            if new_status == self.Status.ACTIVE:
-                return self.user == user, "Apenas o dono pode ativar o personagem."
-
-        if self.status == self.Status.ACTIVE:
-            if new_status in [self.Status.DEAD, self.Status.REMOVED]:
-                return self.campaign.owner == user, "Apenas o mestre pode fazer isso."
-            if new_status == self.Status.RETIRED:
-                return self.user == user, "Apenas o dono pode aposentar o personagem."
-            
-        # DEAD → ACTIVE (reviver / inimigo / NPC)
-        if self.status == self.Status.DEAD:
-            if new_status == self.Status.ACTIVE:
-                return self.campaign.owner == user, "Apenas o mestre pode reativar."
+        rule = self.TRANSITIONS.get((self.status, new_status))
+        if rule is None:
+            return False, "Transição de status inválida."
 
-    # RETIRED → ACTIVE (voltar à campanha)
-        if self.status == self.Status.RETIRED:
-            if new_status == self.Status.ACTIVE:
-                return self.campaign.owner == user, "Apenas o mestre pode reativar."
+        role, message = rule
+        return role in self.roles(user), message
 
-        return False, "Transição de status inválida."
-    
     def change_status(self, new_status, user):
         allowed, message = self.can_change_status(new_status, user)
         if not allowed:
@@ -107,18 +386,81 @@ class CampaignCharacter(models.Model):
             message=f"{self.name}: {old_status} → {new_status}"
         )
 
-    def available_actions(self, user):
-        actions = []
+    def set_skill_levels(self, levels):
+        """
+        Grava vários níveis de proficiência ({skill_id: nível}) de uma vez.
+
+        A validação é feita em memória (sem o full_clean() de cada save)
+        e a escrita é um único upsert numa transação. Devolve as skills
+        do personagem com a skill base carregada.
+        """
+        invalid = sorted(
+            skill_id for skill_id, level in levels.items()
+            if level not in CharacterSkill.PROFICIENCY_LEVELS
+        )
+        if invalid:
+            raise ValidationError(f"Nível de proficiência inválido para as skills {invalid}.")
+
+        abilities = dict(Skill.objects.filter(pk__in=levels).values_list("pk", "ability"))
+        missing = sorted(set(levels) - set(abilities))
+        if missing:
+            raise ValidationError(f"Skills não encontradas: {missing}")
+
+        stats = self.derived_stats()
+        with transaction.atomic():
+            CharacterSkill.objects.bulk_create(
+                [
+                    CharacterSkill(
+                        character=self,
+                        skill_id=skill_id,
+                        proficiency_level=level,
+                        total=skill_total(
+                            stats["modifiers"][abilities[skill_id]],
+                            stats["proficiency_bonus"],
+                            level,
+                        ),
+                    )
+                    for skill_id, level in levels.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["character", "skill"],
+                update_fields=["proficiency_level", "total"],
+            )
+            CampaignCharacter.objects.filter(pk=self.pk).touch(CampaignChange.SKILLS)
 
-        for status, _ in self.Status.choices:
-            if status == self.status:
-                continue
+        return list(self.skills.select_related("skill"))
 
-            allowed, _ = self.can_change_status(status, user)
-            if allowed:
-                actions.append(status)
+    def available_actions(self, user):
+        return list(STATUS_ACTIONS.get((self.status, self.roles(user)), ()))
+
+    @classmethod
+    def bulk_available_actions(cls, characters, user):
+        """
+        Ações disponíveis para vários personagens num único passe:
+        {pk: [status, ...]}.
+
+        Usa a campanha já carregada (select_related) quando houver; para
+        as demais, busca o mestre de todas as campanhas numa consulta só.
+        """
+        characters = list(characters)
+
+        owners = {
+            c.campaign_id: c.campaign.owner_id
+            for c in characters
+            if cls.campaign.is_cached(c)
+        }
+        missing = {c.campaign_id for c in characters} - owners.keys()
+        if missing:
+            owners.update(
+                Campaign.objects.filter(pk__in=missing).values_list("pk", "owner_id")
+            )
 
-        return actions
+        return {
+            c.pk: list(STATUS_ACTIONS.get(
+                (c.status, cls.roles_for(user.pk, c.user_id, owners[c.campaign_id])), ()
+            ))
+            for c in characters
+        }
 
     campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name="characters")
     base_character = models.ForeignKey(CharacterBase, on_delete=models.SET_NULL, null=True, blank=True)
@@ -159,31 +501,105 @@ class CampaignCharacter(models.Model):
 
     notes = models.TextField(blank=True)
 
+    # Atualizado por save() e por todos os caminhos de escrita em massa
+    # (status, skills, recursos, features); base do ETag da ficha
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return f"{self.name} (Lv {self.level}) em {self.campaign.name}"
 
 # --- MODIFICADORES ---
     @property
-    def strength_mod(self): return (self.strength - 10) // 2
+    def strength_mod(self): return ability_mod(self.strength)
     @property
-    def dexterity_mod(self): return (self.dexterity - 10) // 2
+    def dexterity_mod(self): return ability_mod(self.dexterity)
     @property
-    def constitution_mod(self): return (self.constitution - 10) // 2
+    def constitution_mod(self): return ability_mod(self.constitution)
     @property
-    def intelligence_mod(self): return (self.intelligence - 10) // 2
+    def intelligence_mod(self): return ability_mod(self.intelligence)
     @property
-    def wisdom_mod(self): return (self.wisdom - 10) // 2
+    def wisdom_mod(self): return ability_mod(self.wisdom)
     @property
-    def charisma_mod(self): return (self.charisma - 10) // 2
+    def charisma_mod(self): return ability_mod(self.charisma)
 
     # --- PROFICIÊNCIA ---
     @property
     def proficiency_bonus(self):
-        return 2 + ((self.level - 1) // 4)
+        return proficiency_for(self.level)
+
+    # --- ESTATÍSTICAS DERIVADAS ---
+    # Os totais das skills ficam gravados em CharacterSkill.total e são
+    # recalculados quando atributos, nível ou proficiências mudam.
+    DERIVED_SOURCE_FIELDS = ("level", *ABILITIES)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._derived_source = instance._get_derived_source()
+        return instance
+
+    def _get_derived_source(self):
+        # campos adiados (only/defer) ficam de fora para não gerar consultas
+        deferred = self.get_deferred_fields()
+        return {
+            field: getattr(self, field)
+            for field in self.DERIVED_SOURCE_FIELDS
+            if field not in deferred
+        }
+
+    def derived_stats(self):
+        """Modificadores e bônus de proficiência calculados num passe só."""
+        return {
+            "modifiers": {ability: ability_mod(getattr(self, ability)) for ability in ABILITIES},
+            "proficiency_bonus": self.proficiency_bonus,
+        }
+
+    def refresh_skill_totals(self):
+        stats = self.derived_stats()
+        skills = list(self.skills.select_related("skill"))
+        for char_skill in skills:
+            char_skill.total = skill_total(
+                stats["modifiers"][char_skill.skill.ability],
+                stats["proficiency_bonus"],
+                char_skill.proficiency_level,
+            )
+        CharacterSkill.objects.bulk_update(skills, ["total"])
+        return skills
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        # fichas novas recebem os totais em CharacterSkill.objects.provision
+        source = self._get_derived_source()
+        if not adding and source != getattr(self, "_derived_source", None):
+            self.refresh_skill_totals()
+            CampaignChange.record(CampaignChange.SKILLS, [(self.pk, self.campaign_id)])
+        self._derived_source = source
 
     def __str__(self):
         return f"{self.name} - {self.campaign.name}"
     
+def _compile_status_actions():
+    """(status atual, papéis) -> novos status permitidos, na ordem das choices."""
+    Status = CampaignCharacter.Status
+    GM, OWNER = CampaignCharacter.ROLE_GM, CampaignCharacter.ROLE_OWNER
+    role_sets = [frozenset(), frozenset({GM}), frozenset({OWNER}), frozenset({GM, OWNER})]
+
+    return {
+        (current, roles): tuple(
+            new for new in Status.values
+            if (current, new) in CampaignCharacter.TRANSITIONS
+            and CampaignCharacter.TRANSITIONS[current, new][0] in roles
+        )
+        for current in Status.values
+        for roles in role_sets
+    }
+
+
+STATUS_ACTIONS = _compile_status_actions()
+
+
 class Skill(models.Model):
     ABILITY_CHOICES = [
         ("strength", "Força"),
@@ -203,7 +619,57 @@ class Skill(models.Model):
     def __str__(self):
         return self.name
 
+class CharacterSkillQuerySet(models.QuerySet):
+    def provision(self, character_ids, skill_ids=None, chunk_size=500):
+        """
+        Garante uma linha de CharacterSkill para cada (personagem, skill).
+
+        Os personagens são processados em blocos de `chunk_size`; cada
+        bloco é um único INSERT que ignora as linhas já existentes.
+        """
+        skills = Skill.objects.all()
+        if skill_ids is not None:
+            skills = skills.filter(pk__in=skill_ids)
+        abilities = dict(skills.values_list("pk", "ability"))
+        if not abilities:
+            return
+
+        character_ids = iter(character_ids)
+        while chunk := list(islice(character_ids, chunk_size)):
+            characters = CampaignCharacter.objects.filter(pk__in=chunk).values(
+                "pk", *CampaignCharacter.DERIVED_SOURCE_FIELDS
+            )
+            self.bulk_create(
+                [
+                    CharacterSkill(
+                        character_id=c["pk"],
+                        skill_id=skill_id,
+                        total=skill_total(ability_mod(c[ability]), proficiency_for(c["level"]), 0),
+                    )
+                    for c in characters
+                    for skill_id, ability in abilities.items()
+                ],
+                ignore_conflicts=True,
+            )
+            CampaignCharacter.objects.filter(pk__in=chunk).touch(CampaignChange.SKILLS)
+
+    def refresh_totals(self, chunk_size=500):
+        """Recalcula CharacterSkill.total das linhas do queryset, em blocos."""
+        rows = self.select_related("character", "skill").order_by("pk")
+        last_pk = 0
+        while chunk := list(rows.filter(pk__gt=last_pk)[:chunk_size]):
+            for char_skill in chunk:
+                char_skill.total = char_skill.compute_total()
+            CharacterSkill.objects.bulk_update(chunk, ["total"])
+            CampaignCharacter.objects.filter(
+                pk__in={char_skill.character_id for char_skill in chunk}
+            ).touch(CampaignChange.SKILLS)
+            last_pk = chunk[-1].pk
+
+
 class CharacterSkill(models.Model):
+    objects = CharacterSkillQuerySet.as_manager()
+
     character = models.ForeignKey(
         CampaignCharacter,
         on_delete=models.CASCADE,
@@ -212,8 +678,12 @@ class CharacterSkill(models.Model):
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
 
     # 0 = nada, 1 = proficiente, 2 = expertise
+    PROFICIENCY_LEVELS = (0, 1, 2)
     proficiency_level = models.IntegerField(default=0)
 
+    # modificador + proficiência, gravado (ver CampaignCharacter.refresh_skill_totals)
+    total = models.IntegerField(default=0, editable=False)
+
     class Meta:
         unique_together = ("character", "skill")
 
@@ -221,24 +691,25 @@ class CharacterSkill(models.Model):
         return f"{self.character} - {self.skill}"
 
     def clean(self):
-        if self.proficiency_level not in [0, 1, 2]:
+        if self.proficiency_level not in self.PROFICIENCY_LEVELS:
             raise ValidationError("Nível de proficiência inválido.")
 
+    def compute_total(self):
+        return skill_total(
+            getattr(self.character, f"{self.skill.ability}_mod"),
+            self.character.proficiency_bonus,
+            self.proficiency_level,
+        )
+
     def save(self, *args, **kwargs):
         self.full_clean()
+        self.total = self.compute_total()
         super().save(*args, **kwargs)
+        CampaignCharacter.objects.filter(pk=self.character_id).touch(CampaignChange.SKILLS)
 
     @property
     def total_value(self):
-        ability_mod = getattr(self.character, f"{self.skill.ability}_mod")
-        prof = self.character.proficiency_bonus
-
-        if self.proficiency_level == 1:
-            return ability_mod + prof
-        if self.proficiency_level == 2:
-            return ability_mod + (prof * 2)
-
-        return ability_mod
+        return self.total
 
     
 class CampaignInvite(models.Model):
@@ -262,6 +733,10 @@ class CampaignInvite(models.Model):
 
     class Meta:
         unique_together = ("campaign", "invited_user")  # evita duplicar convites
+        indexes = [
+            models.Index(fields=["invited_user", "-created_at", "-id"]),
+            models.Index(fields=["campaign", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"Convite para {self.invited_user} na campanha {self.campaign}"
@@ -271,12 +746,17 @@ class CampaignLog(models.Model):
         STATUS_CHANGE = "status_change", "Mudança de status"
         CHARACTER_CREATED = "character_created", "Personagem criado"
         CHARACTER_REMOVED = "character_removed", "Personagem removido"
+        RESOURCE_CHANGE = "resource_change", "Recursos alterados"
+        GROUP_CHECK = "group_check", "Teste em grupo"
+        LOOT = "loot", "Saque"
         SYSTEM = "system", "Sistema"
 
     campaign = models.ForeignKey(
         Campaign,
         on_delete=models.CASCADE,
-        related_name="logs"
+        related_name="logs",
+        # coberto pelo índice (campaign, -created_at, -id)
+        db_index=False
     )
 
     actor = models.ForeignKey(
@@ -296,7 +776,71 @@ class CampaignLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["campaign", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"[{self.campaign.name}] {self.message}"
+
+
+class CampaignChange(models.Model):
+    """
+    Feed de alterações de uma campanha para o delta sync: uma linha por
+    objeto alterado. O id é a sequência monotônica que o cliente guarda
+    como cursor ("o que mudou depois de N").
+
+    `object_id` é o personagem para CHARACTERS e SKILLS (as skills da
+    ficha mudaram), o convite para INVITES e o log para LOGS.
+    """
+    CHARACTERS = "characters"
+    SKILLS = "skills"
+    INVITES = "invites"
+    LOGS = "logs"
+
+    KIND_CHOICES = [
+        (CHARACTERS, "Personagem"),
+        (SKILLS, "Skills do personagem"),
+        (INVITES, "Convite"),
+        (LOGS, "Log"),
+    ]
+
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+    ACTION_CHOICES = [
+        (UPDATED, "Alterado"),
+        (DELETED, "Removido"),
+    ]
+
+    # sem constraint: remoções em cascata de personagens e convites
+    # registram a remoção antes da campanha sumir; as linhas da campanha
+    # removida são apagadas no post_delete dela (campaigns.signals)
+    campaign = models.ForeignKey(
+        Campaign,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="changes",
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default=UPDATED)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["campaign", "id"]),
+        ]
+
+    @classmethod
+    def record(cls, kind, rows, action=UPDATED):
+        """Registra [(object_id, campaign_id), ...] num único INSERT."""
+        return cls.objects.bulk_create([
+            cls(campaign_id=campaign_id, kind=kind, object_id=object_id, action=action)
+            for object_id, campaign_id in rows
+        ])
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.object_id} {self.action}"
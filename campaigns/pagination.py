@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CampaignCursorPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset): sem COUNT(*) e com ordem estável
+    mesmo com inserções concorrentes. Cada página custa O(page_size).
+    O id desempata registros criados no mesmo instante (bulk_create).
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-created_at", "-id")
+
+
+class CharacterCursorPagination(CampaignCursorPagination):
+    # CampaignCharacter não tem created_at; a PK é crescente e indexada
+    ordering = "id"
+
+
+class CampaignLogCursorPagination(CampaignCursorPagination):
+    page_size = 100
+    max_page_size = 500
@@ -1,40 +1,39 @@
 from rest_framework.permissions import BasePermission
 
+from .membership import get_membership
+
+# Os papéis do usuário (mestre/jogador por campanha) vêm de get_membership,
+# carregado uma vez por request: cada checagem é só um lookup em set.
+
 
 class IsCampaignOwner(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
+        return get_membership(request).is_owner(obj.pk)
 
 
 class IsCampaignPlayer(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return (
-            obj.owner == request.user or
-            request.user in obj.players.all()
-        )
+        return get_membership(request).is_member(obj.pk)
 
 class IsCharacterOwner(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
 
 class IsCampaignCharacterPlayer(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return (
-            obj.campaign.owner == request.user or
-            request.user in obj.campaign.players.all()
-        )
+        return get_membership(request).is_member(obj.campaign_id)
     
 class IsCampaignOwnerForCharacter(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.campaign.owner == request.user    
+        return get_membership(request).is_owner(obj.campaign_id)
 
 class CanEditCharacterResources(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
-            obj.user == request.user or
-            obj.campaign.owner == request.user
+            obj.user_id == request.user.pk or
+            get_membership(request).is_owner(obj.campaign_id)
         )
 
 class IsInviteReceiver(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.invited_user == request.user
+        return obj.invited_user_id == request.user.pk
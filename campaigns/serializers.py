@@ -1,16 +1,22 @@
 from rest_framework import serializers
-from .models import Campaign, CampaignCharacter, CampaignInvite, CharacterSkill, CampaignLog
+from . import dice
+from .models import (
+    Campaign, CampaignCharacter, CampaignInvite, CharacterSkill, CampaignLog, Skill,
+    ABILITIES,
+)
+from .sparse import SHEET_FIELDS, NESTED_FIELDS
 from characters.serializers import (
     CharacterBaseSerializer,
     OriginSerializer, OriginLineageSerializer,
     ClassSerializer, SubclassSerializer,
-    FeatureSerializer, FeatureOptionSerializer
+    FeatureSerializer, FeatureOptionSerializer,
+    CatalogField,
 )
 # SKILLS
 class CharacterSkillSerializer(serializers.ModelSerializer):
     skill_name = serializers.CharField(source="skill.name", read_only=True)
     ability = serializers.CharField(source="skill.ability", read_only=True)
-    total = serializers.IntegerField(source="total_value", read_only=True)  # calculado na model
+    total = serializers.IntegerField(read_only=True)  # gravado na model
 
     class Meta:
         model = CharacterSkill
@@ -44,17 +50,33 @@ class CampaignSerializer(serializers.ModelSerializer):
 # CAMPAIGN CHARACTER (FICHA)
 
 
+class CampaignCharacterListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # calcula available_actions da lista inteira de uma vez
+        iterable = data.all() if hasattr(data, "all") else data
+        iterable = list(iterable)
+
+        request = self.context.get("request")
+        if request and "available_actions" in self.child.fields:
+            self.child.actions_by_pk = CampaignCharacter.bulk_available_actions(
+                iterable, request.user
+            )
+
+        return super().to_representation(iterable)
+
+
 class CampaignCharacterSerializer(serializers.ModelSerializer):
     available_actions = serializers.SerializerMethodField()
     base_character = CharacterBaseSerializer(read_only=True)
 
-    origin = OriginSerializer(read_only=True)
-    lineage = OriginLineageSerializer(read_only=True)
-    char_class = ClassSerializer(read_only=True)
-    subclass = SubclassSerializer(read_only=True)
+    # regras vêm prontas do catálogo em memória (characters.catalog)
+    origin = CatalogField("origins", OriginSerializer)
+    lineage = CatalogField("lineages", OriginLineageSerializer)
+    char_class = CatalogField("classes", ClassSerializer)
+    subclass = CatalogField("subclasses", SubclassSerializer)
 
-    chosen_features = FeatureSerializer(many=True, read_only=True)
-    chosen_feature_options = FeatureOptionSerializer(many=True, read_only=True)
+    chosen_features = CatalogField("features", FeatureSerializer, many=True)
+    chosen_feature_options = CatalogField("options", FeatureOptionSerializer, many=True)
 
     skills = CharacterSkillSerializer(many=True, read_only=True)
 
@@ -62,29 +84,38 @@ class CampaignCharacterSerializer(serializers.ModelSerializer):
 
     status = serializers.CharField(read_only=True)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # ?fields= / ?expand= (ver campaigns.sparse)
+        fieldset = self._context.get("sheet_fieldset")
+        if fieldset is None:
+            return
+
+        for name in list(self.fields):
+            if not fieldset.includes(name):
+                self.fields.pop(name)
+            elif name in NESTED_FIELDS and not fieldset.expands(name):
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True,
+                    many=name in ("chosen_features", "chosen_feature_options", "skills"),
+                )
+
     def get_available_actions(self, obj):
         request = self.context.get("request")
         if not request:
             return []
 
+        actions_by_pk = getattr(self, "actions_by_pk", None)
+        if actions_by_pk is not None and obj.pk in actions_by_pk:
+            return actions_by_pk[obj.pk]
+
         return obj.available_actions(request.user)
 
     class Meta:
         model = CampaignCharacter
-        fields = [
-            "id", "campaign", "base_character", "user", "user_name",
-            "name", "level",
-            "status",
-            "available_actions",
-            "origin", "lineage",
-            "char_class", "subclass",
-            "chosen_features", "chosen_feature_options",
-            "skills",
-            "strength", "dexterity", "constitution",
-            "intelligence", "wisdom", "charisma",
-            "hp", "mana", "sanity",
-            "notes",
-        ]
+        list_serializer_class = CampaignCharacterListSerializer
+        fields = SHEET_FIELDS
 
 
 
@@ -130,4 +161,97 @@ class CampaignLogSerializer(serializers.ModelSerializer):
             "actor",
             "actor_name",
             "created_at"
-        ]
\ No newline at end of file
+        ]
+
+# RECURSOS (COMBATE)
+
+class CharacterResourcesSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    hp = serializers.IntegerField(required=False)
+    mana = serializers.IntegerField(required=False)
+    sanity = serializers.IntegerField(required=False)
+
+
+class BulkResourcesSerializer(serializers.Serializer):
+    characters = CharacterResourcesSerializer(many=True, allow_empty=False)
+
+    def validate_characters(self, value):
+        ids = [item["id"] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Personagem repetido na lista.")
+        return value
+
+
+class ResourceDeltaSerializer(serializers.Serializer):
+    hp = serializers.IntegerField(required=False)
+    mana = serializers.IntegerField(required=False)
+    sanity = serializers.IntegerField(required=False)
+    clamp = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if not set(attrs) - {"clamp"}:
+            raise serializers.ValidationError("Informe ao menos um recurso.")
+        return attrs
+
+
+class SkillLevelSerializer(serializers.Serializer):
+    skill = serializers.IntegerField()
+    proficiency_level = serializers.ChoiceField(choices=CharacterSkill.PROFICIENCY_LEVELS)
+
+
+class BulkSkillLevelSerializer(serializers.Serializer):
+    skills = SkillLevelSerializer(many=True, allow_empty=False)
+
+    def validate_skills(self, value):
+        ids = [item["skill"] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Skill repetida na lista.")
+        return value
+
+
+# TESTES EM GRUPO (ROLAGENS)
+
+class NpcGroupSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    modifier = serializers.IntegerField(min_value=-20, max_value=40)
+    count = serializers.IntegerField(min_value=1, max_value=dice.MAX_PARTICIPANTS)
+
+
+class CheckSerializer(serializers.Serializer):
+    skill = serializers.PrimaryKeyRelatedField(queryset=Skill.objects.all(), required=False)
+    ability = serializers.ChoiceField(choices=ABILITIES, required=False)
+    dc = serializers.IntegerField(min_value=1, max_value=40)
+    mode = serializers.ChoiceField(choices=dice.MODES, default=dice.NORMAL)
+    # sem a lista: todos os personagens ativos ou em rascunho da campanha
+    characters = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        if ("skill" in attrs) == ("ability" in attrs):
+            raise serializers.ValidationError("Informe uma skill ou um atributo.")
+        return attrs
+
+
+class GroupCheckSerializer(CheckSerializer):
+    npcs = NpcGroupSerializer(many=True, required=False, default=list)
+    seed = serializers.IntegerField(min_value=0, max_value=2**63 - 1, required=False)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if sum(group["count"] for group in attrs["npcs"]) > dice.MAX_PARTICIPANTS:
+            raise serializers.ValidationError(
+                f"No máximo {dice.MAX_PARTICIPANTS} participantes por teste."
+            )
+        return attrs
+
+
+class CheckOddsSerializer(CheckSerializer):
+    # dado do teste no lugar do d20 do modo (ex.: "1d20+1d4")
+    die = serializers.CharField(max_length=100, required=False)
+
+    def validate_die(self, value):
+        try:
+            expression = dice.compile_expression(value)
+            expression.distribution
+        except dice.DiceError as e:
+            raise serializers.ValidationError(str(e))
+        return str(expression)
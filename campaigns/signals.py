@@ -0,0 +1,107 @@
+from django.db.models.functions import Now
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import events
+from .models import (
+    Campaign, CampaignCharacter, CampaignInvite, CampaignLog, CampaignChange,
+    CharacterSkill, Skill,
+)
+
+
+@receiver(post_save, sender=CampaignCharacter)
+def provision_character_skills(sender, instance, created, raw=False, **kwargs):
+    # toda ficha nasce com todas as skills (nível 0)
+    if created and not raw:
+        CharacterSkill.objects.provision([instance.pk])
+
+
+@receiver(post_save, sender=Skill)
+def provision_new_skill(sender, instance, created, raw=False, **kwargs):
+    # skill nova no catálogo: cria a linha em todas as fichas existentes
+    if created and not raw:
+        CharacterSkill.objects.provision(
+            CampaignCharacter.objects.values_list("pk", flat=True).iterator(),
+            skill_ids=[instance.pk],
+        )
+
+
+@receiver(pre_save, sender=Skill)
+def remember_skill_ability(sender, instance, raw=False, **kwargs):
+    instance._old_ability = None
+    if instance.pk and not raw:
+        instance._old_ability = (
+            Skill.objects.filter(pk=instance.pk).values_list("ability", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Skill)
+def refresh_totals_on_ability_change(sender, instance, created, raw=False, **kwargs):
+    # mudar o atributo base de uma skill muda o total em todas as fichas
+    old = getattr(instance, "_old_ability", None)
+    if not created and not raw and old is not None and old != instance.ability:
+        CharacterSkill.objects.filter(skill=instance).refresh_totals()
+
+
+@receiver(m2m_changed, sender=CampaignCharacter.chosen_features.through)
+@receiver(m2m_changed, sender=CampaignCharacter.chosen_feature_options.through)
+def touch_character_on_choices_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # feature/opção alterada pelo outro lado: afeta as fichas em pk_set
+        if pk_set:
+            CampaignCharacter.objects.filter(pk__in=pk_set).touch()
+    else:
+        CampaignCharacter.objects.filter(pk=instance.pk).touch()
+
+
+@receiver(m2m_changed, sender=Campaign.players.through)
+def touch_campaign_on_players_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    campaigns = Campaign.objects.filter(pk__in=pk_set or []) if reverse else Campaign.objects.filter(pk=instance.pk)
+    campaigns.update(updated_at=Now())
+
+
+@receiver(post_save, sender=CampaignLog)
+def stream_new_log(sender, instance, created, raw=False, **kwargs):
+    # entrega o log para quem está ouvindo a mesa (campaigns.events)
+    if created and not raw:
+        events.publish_log(instance)
+
+
+# ----------------------------------------
+# FEED DE DELTA SYNC (CampaignChange)
+# ----------------------------------------
+SYNCED = {
+    CampaignCharacter: CampaignChange.CHARACTERS,
+    CampaignInvite: CampaignChange.INVITES,
+}
+
+
+@receiver(post_save, sender=CampaignCharacter)
+@receiver(post_save, sender=CampaignInvite)
+def record_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        CampaignChange.record(SYNCED[sender], [(instance.pk, instance.campaign_id)])
+
+
+@receiver(post_delete, sender=CampaignCharacter)
+@receiver(post_delete, sender=CampaignInvite)
+def record_deletion(sender, instance, **kwargs):
+    CampaignChange.record(
+        SYNCED[sender], [(instance.pk, instance.campaign_id)], CampaignChange.DELETED
+    )
+
+
+@receiver(post_save, sender=CampaignLog)
+def record_new_log(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CampaignChange.record(CampaignChange.LOGS, [(instance.pk, instance.campaign_id)])
+
+
+@receiver(post_delete, sender=Campaign)
+def drop_campaign_changes(sender, instance, **kwargs):
+    # o feed não tem constraint (ver CampaignChange.campaign)
+    CampaignChange.objects.filter(campaign_id=instance.pk).delete()
@@ -0,0 +1,90 @@
+"""
+Fichas parciais: ?fields= e ?expand= em CampaignCharacterSerializer.
+
+  ?fields=id,name,status,hp   só essas colunas
+  ?expand=origin,skills       objetos aninhados completos
+
+Sem nenhum dos dois a ficha vem completa, como sempre. Com qualquer um
+deles, os objetos aninhados que não estão em ?expand= vêm só como id
+(ou lista de ids), e o queryset carrega apenas o que foi pedido.
+"""
+import zlib
+
+from rest_framework.exceptions import ValidationError
+
+SHEET_FIELDS = [
+    "id", "campaign", "base_character", "user", "user_name",
+    "name", "level",
+    "status",
+    "available_actions",
+    "origin", "lineage",
+    "char_class", "subclass",
+    "chosen_features", "chosen_feature_options",
+    "skills",
+    "strength", "dexterity", "constitution",
+    "intelligence", "wisdom", "charisma",
+    "hp", "mana", "sanity",
+    "notes",
+]
+
+NESTED_FIELDS = {
+    "base_character",
+    "origin", "lineage",
+    "char_class", "subclass",
+    "chosen_features", "chosen_feature_options",
+    "skills",
+}
+
+# colunas de CampaignCharacter que cada campo da ficha precisa
+COLUMNS = {
+    "user_name": ["user"],
+    "available_actions": ["status", "user", "campaign"],
+    "chosen_features": [],
+    "chosen_feature_options": [],
+    "skills": [],
+}
+
+
+def _parse(value, allowed, param):
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - allowed
+    if unknown:
+        raise ValidationError({param: f"Campos desconhecidos: {', '.join(sorted(unknown))}"})
+    return names
+
+
+class SheetFieldset:
+    def __init__(self, fields=None, expand=()):
+        self.fields = set(fields) if fields is not None else set(SHEET_FIELDS)
+        self.expand = set(expand)
+
+    @classmethod
+    def from_request(cls, request):
+        """Fieldset pedido na query string, ou None para a ficha completa."""
+        params = request.query_params
+        if "fields" not in params and "expand" not in params:
+            return None
+
+        fields = None
+        if "fields" in params:
+            fields = _parse(params["fields"], set(SHEET_FIELDS), "fields") | {"id"}
+        expand = _parse(params.get("expand", ""), NESTED_FIELDS, "expand")
+        return cls(fields, expand)
+
+    def includes(self, name):
+        return name in self.fields
+
+    def expands(self, name):
+        return name in self.fields and name in self.expand
+
+    @property
+    def key(self):
+        """Identifica a representação (entra no ETag da ficha)."""
+        raw = ",".join(sorted(self.fields)) + "|" + ",".join(sorted(self.expand))
+        return f"{zlib.crc32(raw.encode()):08x}"
+
+    def columns(self):
+        columns = {"id"}
+        for name in self.fields:
+            columns.update(COLUMNS.get(name, [name]))
+        return sorted(columns)
@@ -0,0 +1,122 @@
+"""
+Delta sync de uma campanha: "o que mudou depois do cursor N".
+
+O cursor é o id do último CampaignChange visto. Cada objeto aparece uma
+vez por resposta, no estado atual, mesmo que tenha mudado várias vezes
+no intervalo; só os objetos alterados são carregados e serializados.
+"""
+from collections import defaultdict
+
+from .models import CampaignCharacter, CampaignInvite, CampaignLog, CampaignChange, CharacterSkill
+from .serializers import (
+    CampaignCharacterSerializer,
+    CampaignInviteSerializer,
+    CampaignLogSerializer,
+    CharacterSkillSerializer,
+)
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 5000
+
+
+def latest_cursor(campaign):
+    return (
+        CampaignChange.objects.filter(campaign=campaign)
+        .order_by("-pk").values_list("pk", flat=True).first()
+    ) or 0
+
+
+def changes_since(campaign, since, limit=DEFAULT_LIMIT, context=None, fieldset=None,
+                  include_removed=True):
+    """
+    {"cursor", "has_more", "characters", "skills", "invites", "logs",
+     "deleted": {"characters": [...], "invites": [...]}}
+
+    Com has_more o cliente repete a chamada com o cursor devolvido.
+
+    Sem `include_removed` (quem não é mestre), personagens REMOVED ficam
+    de fora como na listagem de fichas e aparecem em deleted.characters.
+    """
+    rows = list(
+        CampaignChange.objects.filter(campaign=campaign, pk__gt=since)
+        .order_by("pk")
+        .values_list("pk", "kind", "object_id", "action")[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # última ação de cada objeto no intervalo
+    latest = {}
+    for _, kind, object_id, action in rows:
+        latest[kind, object_id] = action
+
+    changed, deleted = defaultdict(set), defaultdict(set)
+    for (kind, object_id), action in latest.items():
+        (deleted if action == CampaignChange.DELETED else changed)[kind].add(object_id)
+
+    context = context or {}
+    result = {
+        "cursor": rows[-1][0] if rows else since,
+        "has_more": has_more,
+        "characters": [],
+        "skills": [],
+        "invites": [],
+        "logs": [],
+        "deleted": {"characters": [], "invites": []},
+    }
+
+    ids = changed[CampaignChange.CHARACTERS] - deleted[CampaignChange.CHARACTERS]
+    if ids:
+        characters = campaign.characters.filter(pk__in=ids)
+        if not include_removed:
+            characters = characters.exclude(status=CampaignCharacter.Status.REMOVED)
+        characters = characters.order_by("pk").with_sheet(fieldset)
+        result["characters"] = CampaignCharacterSerializer(
+            characters, many=True, context={**context, "sheet_fieldset": fieldset}
+        ).data
+
+    ids = changed[CampaignChange.SKILLS] - deleted[CampaignChange.CHARACTERS]
+    if ids:
+        skills = defaultdict(list)
+        char_skills = (
+            CharacterSkill.objects.filter(character__campaign=campaign, character_id__in=ids)
+            .select_related("skill")
+            .order_by("character_id", "skill__name")
+        )
+        if not include_removed:
+            char_skills = char_skills.exclude(character__status=CampaignCharacter.Status.REMOVED)
+        for char_skill in char_skills:
+            skills[char_skill.character_id].append(char_skill)
+        result["skills"] = [
+            {"character": pk, "skills": CharacterSkillSerializer(items, many=True).data}
+            for pk, items in skills.items()
+        ]
+
+    ids = changed[CampaignChange.INVITES] - deleted[CampaignChange.INVITES]
+    if ids:
+        invites = (
+            CampaignInvite.objects.filter(campaign=campaign, pk__in=ids)
+            .select_related("invited_user", "invited_by")
+            .order_by("pk")
+        )
+        result["invites"] = CampaignInviteSerializer(invites, many=True).data
+
+    ids = changed[CampaignChange.LOGS]
+    if ids:
+        logs = (
+            CampaignLog.objects.filter(campaign=campaign, pk__in=ids)
+            .select_related("actor")
+            .order_by("pk")
+        )
+        result["logs"] = CampaignLogSerializer(logs, many=True).data
+
+    # objetos que sumiram sem registro de remoção (cascatas) também contam
+    loaded = {
+        "characters": {c["id"] for c in result["characters"]},
+        "invites": {i["id"] for i in result["invites"]},
+    }
+    for key, kind in (("characters", CampaignChange.CHARACTERS), ("invites", CampaignChange.INVITES)):
+        gone = deleted[kind] | (changed[kind] - deleted[kind] - loaded[key])
+        result["deleted"][key] = sorted(gone)
+
+    return result
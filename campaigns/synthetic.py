@@ -0,0 +1,201 @@
+"""
+Gerador de dados sintéticos para medir a API em escala.
+
+Tudo é criado com bulk_create, então gerar dezenas de milhares de
+linhas leva segundos. Não use no banco de produção.
+"""
+import random
+
+from django.contrib.auth import get_user_model
+
+from characters.models import (
+    Origin, OriginLineage,
+    Class, Subclass,
+    Feature, FeatureOption,
+)
+from .models import (
+    Campaign, CampaignCharacter, CampaignInvite,
+    CampaignLog, Skill, CharacterSkill,
+    skill_total,
+)
+
+User = get_user_model()
+
+SKILLS = [
+    ("Acrobacia", "dexterity"),
+    ("Arcanismo", "intelligence"),
+    ("Atletismo", "strength"),
+    ("Enganação", "charisma"),
+    ("Furtividade", "dexterity"),
+    ("Intuição", "wisdom"),
+    ("Percepção", "wisdom"),
+    ("Persuasão", "charisma"),
+    ("Sobrevivência", "wisdom"),
+    ("Vigor", "constitution"),
+]
+
+
+def _create_catalog(origins=4, classes=4):
+    origin_objs = Origin.objects.bulk_create(
+        Origin(name=f"Origem {i}", description="Origem sintética.")
+        for i in range(origins)
+    )
+    lineages = OriginLineage.objects.bulk_create(
+        OriginLineage(origin=o, name=f"{o.name} - Linhagem {j}", description="")
+        for o in origin_objs for j in range(2)
+    )
+
+    class_objs = Class.objects.bulk_create(
+        Class(name=f"Classe {i}", description="Classe sintética.")
+        for i in range(classes)
+    )
+    subclasses = Subclass.objects.bulk_create(
+        Subclass(base_class=c, name=f"{c.name} - Subclasse {j}", description="")
+        for c in class_objs for j in range(2)
+    )
+
+    features = Feature.objects.bulk_create(
+        [
+            Feature(type=Feature.CLASS, base_class=c, name=f"{c.name} - Feature {j}",
+                    description="", level_required=j + 1)
+            for c in class_objs for j in range(3)
+        ] + [
+            Feature(type=Feature.SUBCLASS, subclass=s, name=f"{s.name} - Feature",
+                    description="", level_required=3)
+            for s in subclasses
+        ]
+    )
+    FeatureOption.objects.bulk_create(
+        FeatureOption(feature=f, name=f"{f.name} - Opção {j}", description="")
+        for f in features for j in range(2)
+    )
+
+    skills = Skill.objects.bulk_create(
+        Skill(name=name, ability=ability) for name, ability in SKILLS
+    )
+
+    return {
+        "origins": origin_objs,
+        "lineages": lineages,
+        "classes": class_objs,
+        "subclasses": subclasses,
+        "features": features,
+        "skills": skills,
+    }
+
+
+def generate(*, users=50, campaigns=10, characters_per_campaign=40,
+             logs=20000, seed=0):
+    """
+    Popula o banco com usuários, campanhas, fichas (com skills e
+    features) e logs. Devolve um dict com os objetos principais.
+
+    O primeiro usuário é mestre da primeira campanha e jogador de todas
+    as outras, para que as consultas de escopo tenham trabalho a fazer.
+    """
+    rng = random.Random(seed)
+    catalog = _create_catalog()
+
+    user_objs = User.objects.bulk_create(
+        User(username=f"bench-user-{i}") for i in range(users)
+    )
+
+    campaign_objs = Campaign.objects.bulk_create(
+        Campaign(name=f"Campanha {i}", owner=user_objs[i % users])
+        for i in range(campaigns)
+    )
+
+    # jogadores: o primeiro usuário participa de tudo, os outros
+    # são sorteados para preencher as mesas
+    Players = Campaign.players.through
+    memberships = set()
+    for campaign in campaign_objs:
+        if campaign.owner_id != user_objs[0].pk:
+            memberships.add((campaign.pk, user_objs[0].pk))
+        for user in rng.sample(user_objs, min(users, characters_per_campaign)):
+            if user.pk != campaign.owner_id:
+                memberships.add((campaign.pk, user.pk))
+    Players.objects.bulk_create(
+        Players(campaign_id=c, user_id=u) for c, u in memberships
+    )
+
+    players_by_campaign = {}
+    for campaign_id, user_id in memberships:
+        players_by_campaign.setdefault(campaign_id, []).append(user_id)
+
+    statuses = [s for s, _ in CampaignCharacter.Status.choices]
+    character_objs = []
+    for campaign in campaign_objs:
+        players = sorted(players_by_campaign.get(campaign.pk, [campaign.owner_id]))
+        for i in range(characters_per_campaign):
+            origin = rng.choice(catalog["origins"])
+            char_class = rng.choice(catalog["classes"])
+            character_objs.append(CampaignCharacter(
+                campaign=campaign,
+                user_id=players[i % len(players)],
+                name=f"{campaign.name} - PC {i}",
+                level=rng.randint(1, 20),
+                status=rng.choice(statuses),
+                origin=origin,
+                lineage=rng.choice([l for l in catalog["lineages"] if l.origin_id == origin.pk]),
+                char_class=char_class,
+                subclass=rng.choice([s for s in catalog["subclasses"] if s.base_class_id == char_class.pk]),
+                strength=rng.randint(8, 18),
+                dexterity=rng.randint(8, 18),
+                constitution=rng.randint(8, 18),
+                intelligence=rng.randint(8, 18),
+                wisdom=rng.randint(8, 18),
+                charisma=rng.randint(8, 18),
+                hp=rng.randint(5, 120),
+                mana=rng.randint(0, 50),
+            ))
+    character_objs = CampaignCharacter.objects.bulk_create(character_objs)
+
+    char_skills = []
+    for c in character_objs:
+        stats = c.derived_stats()
+        for s in catalog["skills"]:
+            level = rng.randint(0, 2)
+            char_skills.append(CharacterSkill(
+                character=c, skill=s, proficiency_level=level,
+                total=skill_total(stats["modifiers"][s.ability], stats["proficiency_bonus"], level),
+            ))
+    CharacterSkill.objects.bulk_create(char_skills, batch_size=1000)
+
+    Features = CampaignCharacter.chosen_features.through
+    Features.objects.bulk_create(
+        Features(campaigncharacter_id=c.pk, feature_id=f.pk)
+        for c in character_objs
+        for f in rng.sample(catalog["features"], 3)
+    )
+
+    invites = []
+    for campaign in campaign_objs:
+        members = set(players_by_campaign.get(campaign.pk, [])) | {campaign.owner_id}
+        outsiders = [u for u in user_objs if u.pk not in members]
+        for user in outsiders[:3]:
+            invites.append(CampaignInvite(
+                campaign=campaign, invited_by_id=campaign.owner_id, invited_user=user
+            ))
+    CampaignInvite.objects.bulk_create(invites)
+
+    log_types = [t for t, _ in CampaignLog.LogType.choices]
+    CampaignLog.objects.bulk_create(
+        (
+            CampaignLog(
+                campaign=campaign_objs[i % campaigns],
+                actor=campaign_objs[i % campaigns].owner,
+                type=rng.choice(log_types),
+                message=f"Evento sintético {i}",
+            )
+            for i in range(logs)
+        ),
+        batch_size=1000,
+    )
+
+    return {
+        "users": user_objs,
+        "campaigns": campaign_objs,
+        "characters": character_objs,
+        **catalog,
+    }
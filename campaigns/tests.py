@@ -1,3 +1,1270 @@
-from django.test import TestCase
+import asyncio
+import itertools
+import random
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+
+from characters import catalog
+from creatures import statblocks
+from creatures.models import Creature
+from characters.models import (
+    CatalogVersion,
+    Origin, OriginLineage,
+    Class, Subclass,
+    Feature, FeatureOption,
+)
+from . import benchmark, dice, events, synthetic
+from .membership import CampaignMembership
+from .permissions import (
+    IsCampaignOwner, IsCampaignPlayer,
+    IsCampaignCharacterPlayer, IsCampaignOwnerForCharacter,
+    CanEditCharacterResources,
+)
+from .models import (
+    Campaign, CampaignCharacter, CampaignInvite, CampaignChange,
+    Skill, CharacterSkill, CampaignLog,
+    SHEET_QUERY_COUNT,
+)
+from .serializers import CampaignCharacterSerializer
+
+User = get_user_model()
+
+
+class CampaignTestMixin:
+    def setUp(self):
+        self.owner = User.objects.create_user("mestre")
+        self.campaign = Campaign.objects.create(name="Mesa", owner=self.owner)
+
+        self.origin = Origin.objects.create(name="Humano", description="")
+        OriginLineage.objects.create(origin=self.origin, name="Nortista", description="")
+        OriginLineage.objects.create(origin=self.origin, name="Sulista", description="")
+
+        self.char_class = Class.objects.create(name="Guerreiro", description="")
+        self.subclass = Subclass.objects.create(
+            base_class=self.char_class, name="Campeão", description=""
+        )
+
+        self.class_feature = Feature.objects.create(
+            type=Feature.CLASS, base_class=self.char_class,
+            name="Segundo Fôlego", description=""
+        )
+        self.subclass_feature = Feature.objects.create(
+            type=Feature.SUBCLASS, subclass=self.subclass,
+            name="Crítico Aprimorado", description=""
+        )
+        self.option = FeatureOption.objects.create(
+            feature=self.class_feature, name="Defesa", description=""
+        )
+
+        self.skills = [
+            Skill.objects.create(name="Atletismo", ability="strength"),
+            Skill.objects.create(name="Furtividade", ability="dexterity"),
+            Skill.objects.create(name="Percepção", ability="wisdom"),
+        ]
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+        # o catálogo de regras fica em memória; nada de reconferir a
+        # versão no meio de um teste que conta consultas
+        self.enterContext(override_settings(CATALOG_VERSION_TTL=3600))
+        catalog.invalidate()
+
+    def make_character(self, name, user=None):
+        user = user or User.objects.create_user(f"player-{name}")
+        self.campaign.players.add(user)
+
+        character = CampaignCharacter.objects.create(
+            campaign=self.campaign,
+            user=user,
+            name=name,
+            origin=self.origin,
+            lineage=self.origin.lineages.first(),
+            char_class=self.char_class,
+            subclass=self.subclass,
+        )
+        character.chosen_features.add(self.class_feature, self.subclass_feature)
+        character.chosen_feature_options.add(self.option)
+
+        character.set_skill_levels({skill.pk: 1 for skill in self.skills})
+
+        return character
+
+
+class CharacterSheetQueryBudgetTests(CampaignTestMixin, TestCase):
+    def count_queries(self, url):
+        catalog.warm()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_with_sheet_serializes_in_fixed_number_of_queries(self):
+        for i in range(5):
+            self.make_character(f"pc{i}")
+        catalog.warm()
+
+        with self.assertNumQueries(SHEET_QUERY_COUNT):
+            data = CampaignCharacterSerializer(
+                CampaignCharacter.objects.with_sheet(), many=True
+            ).data
+
+        self.assertEqual(len(data), 5)
+        self.assertEqual(len(data[0]["skills"]), 3)
+
+    def test_sheet_is_the_same_without_catalog_cache(self):
+        for i in range(2):
+            self.make_character(f"pc{i}")
+
+        cached = CampaignCharacterSerializer(
+            CampaignCharacter.objects.with_sheet(), many=True
+        ).data
+
+        with override_settings(CATALOG_CACHE_MAX_ENTRIES=0):
+            catalog.invalidate()
+            uncached = CampaignCharacterSerializer(
+                CampaignCharacter.objects.with_sheet(), many=True
+            ).data
+
+        self.assertEqual(cached, uncached)
+        self.assertEqual(cached[0]["chosen_features"][1]["related"], {"subclass": "Campeão"})
+
+    def test_available_actions_costs_no_extra_queries(self):
+        for i in range(5):
+            self.make_character(f"pc{i}")
+        request = APIRequestFactory().get("/")
+        request.user = self.owner
+        catalog.warm()
+
+        with self.assertNumQueries(SHEET_QUERY_COUNT):
+            data = CampaignCharacterSerializer(
+                CampaignCharacter.objects.with_sheet(), many=True,
+                context={"request": request},
+            ).data
+
+        self.assertEqual(data[0]["available_actions"], [])
+
+    def test_campaign_characters_query_count_is_constant(self):
+        url = f"/api/campaigns/{self.campaign.pk}/characters/"
+
+        self.make_character("pc0")
+        small = self.count_queries(url)
+
+        for i in range(1, 10):
+            self.make_character(f"pc{i}")
+        large = self.count_queries(url)
+
+        self.assertEqual(small, large)
+
+    def test_character_list_query_count_is_constant(self):
+        url = "/api/characters/"
+
+        self.make_character("pc0")
+        small = self.count_queries(url)
+
+        for i in range(1, 10):
+            self.make_character(f"pc{i}")
+        large = self.count_queries(url)
+
+        self.assertEqual(small, large)
+
+
+class BenchmarkTests(TestCase):
+    def test_generator_and_benchmark_cover_every_endpoint(self):
+        data = synthetic.generate(users=6, campaigns=2, characters_per_campaign=3, logs=20)
+
+        self.assertEqual(CampaignCharacter.objects.count(), 6)
+        self.assertEqual(CharacterSkill.objects.count(), 6 * len(synthetic.SKILLS))
+        self.assertEqual(CampaignLog.objects.count(), 20)
+
+        results = benchmark.run(data, repeat=2)
+
+        self.assertEqual(
+            set(results), {name for name, _ in benchmark.endpoints(data)}
+        )
+        for result in results.values():
+            self.assertGreater(result["queries"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+
+    def test_compare_flags_query_and_latency_regressions(self):
+        baseline = {"a": {"p95_ms": 20, "queries": 5}, "b": {"p95_ms": 20, "queries": 5}}
+        results = {
+            "a": {"p95_ms": 28, "queries": 6},
+            "b": {"p95_ms": 31, "queries": 5},
+        }
+
+        regressions = benchmark.compare(results, baseline, tolerance=0.5)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("a:"))
+        self.assertTrue(regressions[1].startswith("b:"))
+
+
+class StatusTransitionTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.player = User.objects.create_user("jogador")
+        self.character = self.make_character("pc", user=self.player)
+
+    def test_table_matches_transition_rules(self):
+        Status = CampaignCharacter.Status
+        c = self.character
+
+        self.assertEqual(c.available_actions(self.player), [Status.ACTIVE])
+        self.assertEqual(c.available_actions(self.owner), [])
+
+        c.status = Status.ACTIVE
+        self.assertEqual(c.available_actions(self.player), [Status.RETIRED])
+        self.assertEqual(c.available_actions(self.owner), [Status.DEAD, Status.REMOVED])
+
+        c.status = Status.REMOVED
+        self.assertEqual(c.available_actions(self.player), [])
+        self.assertEqual(
+            c.available_actions(self.owner),
+            [Status.DRAFT, Status.ACTIVE, Status.DEAD, Status.RETIRED],
+        )
+
+        allowed, message = c.can_change_status(Status.REMOVED, self.owner)
+        self.assertFalse(allowed)
+        self.assertEqual(message, "O personagem já está nesse status.")
+
+    def test_bulk_available_actions_costs_no_queries_with_loaded_campaign(self):
+        for i in range(3):
+            self.make_character(f"pc{i}")
+        characters = list(CampaignCharacter.objects.select_related("campaign"))
+
+        with self.assertNumQueries(0):
+            actions = CampaignCharacter.bulk_available_actions(characters, self.player)
+
+        self.assertEqual(actions[self.character.pk], ["active"])
+        self.assertEqual(
+            actions,
+            {c.pk: c.available_actions(self.player) for c in characters},
+        )
+
+    def test_serializer_lists_use_bulk_actions_with_one_owner_query(self):
+        for i in range(3):
+            self.make_character(f"pc{i}")
+        characters = list(CampaignCharacter.objects.all())  # campanha não carregada
+        request = APIRequestFactory().get("/")
+        request.user = self.owner
+
+        serializer = CampaignCharacterSerializer(
+            characters, many=True, context={"request": request}
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            data = serializer.data
+        owner_queries = [q for q in ctx.captured_queries if '"campaigns_campaign"' in q["sql"]]
+        self.assertEqual(len(owner_queries), 1)
+
+        self.assertEqual(
+            {row["id"]: row["available_actions"] for row in data},
+            {c.pk: c.available_actions(self.owner) for c in characters},
+        )
+
+    def test_status_endpoints(self):
+        self.client.force_authenticate(self.player)
+        url = f"/api/characters/{self.character.pk}/"
+
+        response = self.client.post(url + "activate/")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(url + "kill/")
+        self.assertEqual(response.status_code, 403)
+
+        self.character.refresh_from_db()
+        self.assertEqual(self.character.status, CampaignCharacter.Status.ACTIVE)
+
+
+class CursorPaginationTests(CampaignTestMixin, TestCase):
+    def test_logs_are_paged_by_cursor_without_count(self):
+        CampaignLog.objects.bulk_create(
+            CampaignLog(campaign=self.campaign, actor=self.owner, message=f"log {i}")
+            for i in range(30)
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/campaign-logs/", {"page_size": 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+        self.assertNotIn("count", response.data)
+
+        first = response.data["results"]
+        self.assertEqual(len(first), 20)
+
+        # um log novo não desloca as páginas seguintes
+        self.campaign.log(actor=self.owner, message="novo")
+
+        response = self.client.get(response.data["next"])
+        second = response.data["results"]
+
+        ids = [log["id"] for log in first + second]
+        self.assertEqual(len(ids), 30)
+        self.assertEqual(len(set(ids)), 30)
+        self.assertIsNone(response.data["next"])
+
+    def test_logs_with_the_same_timestamp_are_neither_skipped_nor_repeated(self):
+        CampaignLog.objects.bulk_create(
+            CampaignLog(campaign=self.campaign, actor=self.owner, message=f"log {i}")
+            for i in range(30)
+        )
+        CampaignLog.objects.update(created_at=self.campaign.created_at)
+
+        ids = []
+        response = self.client.get("/api/campaign-logs/", {"page_size": 7})
+        while True:
+            ids += [log["id"] for log in response.data["results"]]
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(ids, sorted(CampaignLog.objects.values_list("id", flat=True), reverse=True))
+
+    def test_character_lists_are_paginated(self):
+        for i in range(3):
+            self.make_character(f"pc{i}")
+
+        response = self.client.get("/api/characters/", {"page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(
+            f"/api/campaigns/{self.campaign.pk}/characters/", {"page_size": 2}
+        )
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+
+
+class MembershipScopingTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.player = User.objects.create_user("jogador")
+        self.other = Campaign.objects.create(name="Outra mesa", owner=self.player)
+        self.other.players.add(self.owner)
+        self.hidden = Campaign.objects.create(name="Fechada", owner=self.player)
+
+    def test_membership_is_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            membership = CampaignMembership.load(self.owner)
+
+        self.assertEqual(membership.owned, {self.campaign.pk})
+        self.assertEqual(membership.joined, {self.other.pk})
+        self.assertNotIn(self.hidden.pk, membership.visible)
+
+    def test_scoped_querysets_need_no_distinct(self):
+        plans = benchmark.query_plans(self.owner)
+
+        for name, plan in plans.items():
+            self.assertNotIn("DISTINCT", plan["sql"], name)
+            self.assertNotIn("players", plan["sql"], name)
+
+    def test_lists_only_show_visible_campaigns(self):
+        response = self.client.get("/api/campaigns/")
+
+        ids = {c["id"] for c in response.data["results"]}
+        self.assertEqual(ids, {self.campaign.pk, self.other.pk})
+
+
+class PermissionRoleCacheTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.player = User.objects.create_user("jogador")
+        self.character = self.make_character("pc", user=self.player)
+        self.outsider = User.objects.create_user("curioso")
+
+    def make_request(self, user):
+        request = APIRequestFactory().get("/")
+        request.user = user
+        return request
+
+    def test_object_checks_are_lookups_after_first_load(self):
+        request = self.make_request(self.player)
+        characters = [self.character] + [self.make_character(f"pc{i}") for i in range(5)]
+
+        with self.assertNumQueries(1):
+            for character in characters:
+                self.assertTrue(
+                    IsCampaignCharacterPlayer().has_object_permission(request, None, character)
+                )
+                self.assertFalse(
+                    IsCampaignOwnerForCharacter().has_object_permission(request, None, character)
+                )
+                self.assertTrue(
+                    IsCampaignPlayer().has_object_permission(request, None, self.campaign)
+                )
+
+    def test_roles(self):
+        owner_request = self.make_request(self.owner)
+        outsider_request = self.make_request(self.outsider)
+
+        self.assertTrue(IsCampaignOwner().has_object_permission(owner_request, None, self.campaign))
+        self.assertTrue(CanEditCharacterResources().has_object_permission(owner_request, None, self.character))
+        self.assertFalse(CanEditCharacterResources().has_object_permission(outsider_request, None, self.character))
+        self.assertFalse(IsCampaignPlayer().has_object_permission(outsider_request, None, self.campaign))
+
+    def test_outsider_cannot_read_character(self):
+        self.client.force_authenticate(self.outsider)
+
+        response = self.client.get(f"/api/characters/{self.character.pk}/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkResourcesTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.player = User.objects.create_user("jogador")
+        self.characters = [self.make_character("pc", user=self.player)] + [
+            self.make_character(f"pc{i}") for i in range(4)
+        ]
+        self.url = f"/api/campaigns/{self.campaign.pk}/resources/"
+
+    def payload(self, characters, **values):
+        return {"characters": [{"id": c.pk, **values} for c in characters]}
+
+    def test_updates_many_characters_with_one_log(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, self.payload(self.characters[:2], hp=3), format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(
+                self.url, self.payload(self.characters, hp=7, mana=2), format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(
+            response.data[0],
+            {"id": self.characters[0].pk, "hp": 7, "mana": 2, "sanity": 60},
+        )
+        self.assertEqual(
+            set(CampaignCharacter.objects.values_list("hp", flat=True)), {7}
+        )
+        self.assertEqual(
+            CampaignLog.objects.filter(type=CampaignLog.LogType.RESOURCE_CHANGE).count(), 2
+        )
+
+    def test_player_can_only_update_own_characters(self):
+        self.client.force_authenticate(self.player)
+
+        response = self.client.post(self.url, self.payload(self.characters[:2], hp=1), format="json")
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post(self.url, self.payload(self.characters[:1], hp=1), format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_character_rolls_back(self):
+        payload = self.payload(self.characters[:1], hp=1)
+        payload["characters"].append({"id": 9999, "hp": 1})
+
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.characters[0].refresh_from_db()
+        self.assertEqual(self.characters[0].hp, 0)
+
+
+class ResourceDeltaTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.character = self.make_character("pc")
+        CampaignCharacter.objects.filter(pk=self.character.pk).update(hp=10, mana=5)
+        self.url = f"/api/characters/{self.character.pk}/resources/"
+
+    def test_delta_is_a_single_update(self):
+        qs = CampaignCharacter.objects.filter(pk=self.character.pk)
+
+        with self.assertNumQueries(1):
+            qs.apply_resource_deltas({"hp": -7, "mana": 3})
+
+        self.assertEqual(qs.values_list("hp", "mana").get(), (3, 8))
+
+    def test_clamp(self):
+        response = self.client.post(self.url, {"hp": -50, "clamp": True}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["hp"], 0)
+
+        response = self.client.post(self.url, {"hp": -5}, format="json")
+        self.assertEqual(response.data["hp"], -5)
+
+    def test_requires_a_resource(self):
+        response = self.client.post(self.url, {"clamp": True}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ConcurrentResourceDeltaTests(CampaignTestMixin, TransactionTestCase):
+    def test_parallel_deltas_never_lose_writes(self):
+        character = self.make_character("pc")
+        CampaignCharacter.objects.filter(pk=character.pk).update(hp=100)
+
+        def hit(_):
+            try:
+                CampaignCharacter.objects.filter(pk=character.pk).apply_resource_deltas({"hp": -1})
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(hit, range(40)))
+
+        character.refresh_from_db()
+        self.assertEqual(character.hp, 60)
+
+
+class BulkSkillUpdateTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.character = self.make_character("pc")
+        self.character.skills.all().delete()
+        self.url = f"/api/characters/{self.character.pk}/update_skills/"
+
+    def payload(self, levels):
+        return {"skills": [{"skill": s.pk, "proficiency_level": level} for s, level in levels]}
+
+    def test_saves_whole_skill_page_in_few_queries(self):
+        extra = [Skill.objects.create(name=f"Skill {i}", ability="charisma") for i in range(10)]
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.patch(self.url, self.payload([(self.skills[0], 1)]), format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.patch(
+                self.url,
+                self.payload([(s, 2) for s in self.skills + extra]),
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.data), 13)
+        self.assertEqual(
+            set(self.character.skills.values_list("proficiency_level", flat=True)), {2}
+        )
+
+        # total recalculado: charisma 8 (-1) + 2 x proficiência 2
+        total = next(s["total"] for s in response.data if s["skill"] == extra[0].pk)
+        self.assertEqual(total, 3)
+
+    def test_invalid_level_or_skill(self):
+        response = self.client.patch(self.url, self.payload([(self.skills[0], 5)]), format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch(
+            self.url, {"skills": [{"skill": 9999, "proficiency_level": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.character.skills.exists())
+
+
+class SkillProvisioningTests(CampaignTestMixin, TestCase):
+    def test_new_character_gets_every_skill(self):
+        character = CampaignCharacter.objects.create(
+            campaign=self.campaign, user=self.owner, name="npc"
+        )
+
+        self.assertEqual(
+            set(character.skills.values_list("skill_id", flat=True)),
+            {s.pk for s in self.skills},
+        )
+        self.assertEqual(
+            set(character.skills.values_list("proficiency_level", flat=True)), {0}
+        )
+
+    def test_new_skill_is_added_to_existing_characters(self):
+        character = self.make_character("pc")
+
+        skill = Skill.objects.create(name="Medicina", ability="wisdom")
+
+        self.assertTrue(character.skills.filter(skill=skill).exists())
+
+    def test_backfill_command_fills_missing_rows_in_chunks(self):
+        characters = [self.make_character(f"pc{i}") for i in range(5)]
+        CharacterSkill.objects.filter(skill=self.skills[0]).delete()
+        characters[0].skills.all().delete()
+
+        out = StringIO()
+        call_command("backfill_character_skills", chunk_size=2, stdout=out)
+
+        self.assertIn("7 skills criadas", out.getvalue())
+        self.assertEqual(CharacterSkill.objects.count(), 5 * len(self.skills))
+
+
+class DerivedStatsTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.character = self.make_character("pc")
+
+    def totals(self):
+        return dict(self.character.skills.values_list("skill__name", "total"))
+
+    def test_totals_are_stored_on_creation(self):
+        # strength/dexterity/wisdom 8 (-1) + proficiência 2
+        self.assertEqual(self.totals(), {"Atletismo": 1, "Furtividade": 1, "Percepção": 1})
+
+    def test_attribute_and_level_changes_refresh_totals(self):
+        self.character.strength = 16
+        self.character.level = 5
+        self.character.save()
+
+        self.assertEqual(self.totals(), {"Atletismo": 6, "Furtividade": 2, "Percepção": 2})
+
+    def test_unrelated_save_does_not_recompute(self):
+        character = CampaignCharacter.objects.get(pk=self.character.pk)
+        character.notes = "anotação"
+
+        # o UPDATE e o registro no feed de delta sync, sem recalcular skills
+        with self.assertNumQueries(2):
+            character.save()
+
+    def test_skill_ability_change_refreshes_totals(self):
+        self.character.strength = 16
+        self.character.save()
+
+        skill = self.skills[1]
+        skill.ability = "strength"
+        skill.save()
+
+        self.assertEqual(self.totals()["Furtividade"], 5)
+
+    def test_sheet_api_reports_stored_totals(self):
+        self.character.wisdom = 14
+        self.character.save()
+
+        response = self.client.get(f"/api/characters/{self.character.pk}/skills/")
+
+        totals = {s["skill_name"]: s["total"] for s in response.data}
+        self.assertEqual(totals["Percepção"], 4)
+
+
+class ConditionalGetTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.character = self.make_character("pc")
+        self.url = f"/api/characters/{self.character.pk}/"
+
+    def get_etag(self, url=None):
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+        return response["ETag"]
+
+    def assert_not_modified(self, etag, url=None):
+        response = self.client.get(url or self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def assert_modified(self, etag, url=None):
+        response = self.client.get(url or self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unchanged_sheet_is_304_after_one_row_query(self):
+        etag = self.get_etag()
+
+        # membership do request + a linha da ficha
+        with self.assertNumQueries(2):
+            self.assert_not_modified(etag)
+
+    def test_write_paths_change_the_etag(self):
+        character = self.character
+        writes = [
+            lambda: character.change_status(CampaignCharacter.Status.ACTIVE, self.character.user),
+            lambda: character.set_skill_levels({self.skills[0].pk: 2}),
+            lambda: CampaignCharacter.objects.filter(pk=character.pk).apply_resource_deltas({"hp": -1}),
+            lambda: self.campaign.update_resources({character.pk: {"mana": 9}}, actor=self.owner),
+            lambda: character.chosen_features.remove(self.class_feature),
+            lambda: setattr(self.origin, "name", "Humana") or self.origin.save(),
+        ]
+
+        for write in writes:
+            etag = self.get_etag()
+            write()
+            self.assert_modified(etag)
+
+    @override_settings(CATALOG_VERSION_TTL=3600)
+    def test_body_uses_the_catalog_version_in_the_etag(self):
+        self.get_etag()
+
+        # outro processo renomeia a origem: este ainda tem o catálogo velho
+        Origin.objects.filter(pk=self.origin.pk).update(name="Humana")
+        version = CatalogVersion.bump()
+
+        response = self.client.get(self.url)
+        self.assertIn(f"-c{version}", response["ETag"])
+        self.assertEqual(response.data["origin"]["name"], "Humana")
+
+    def test_last_modified(self):
+        response = self.client.get(self.url)
+
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_campaign_etag(self):
+        url = f"/api/campaigns/{self.campaign.pk}/"
+        etag = self.get_etag(url)
+        self.assert_not_modified(etag, url)
+
+        self.campaign.players.add(User.objects.create_user("novo"))
+        self.assert_modified(etag, url)
+
+    def test_outsider_gets_404_not_304(self):
+        etag = self.get_etag()
+        self.client.force_authenticate(User.objects.create_user("curioso"))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class SparseSheetTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            self.make_character(f"pc{i}")
+        catalog.warm()
+
+    def get(self, query):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"/api/characters/{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data["results"], ctx
+
+    def test_initiative_list_loads_only_requested_columns(self):
+        full, full_ctx = self.get("")
+        rows, ctx = self.get("?fields=name,status,hp")
+
+        self.assertEqual(set(rows[0]), {"id", "name", "status", "hp"})
+        self.assertLess(len(ctx), len(full_ctx))
+
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn("notes", sql)
+        self.assertNotIn("campaigns_characterskill", sql)
+
+    def test_nested_objects_are_ids_unless_expanded(self):
+        rows, _ = self.get("?fields=name,origin,skills,chosen_features")
+        self.assertEqual(rows[0]["origin"], self.origin.pk)
+        self.assertEqual(len(rows[0]["skills"]), 3)
+        self.assertIsInstance(rows[0]["skills"][0], int)
+        self.assertEqual(
+            sorted(rows[0]["chosen_features"]),
+            sorted([self.class_feature.pk, self.subclass_feature.pk]),
+        )
+
+        rows, _ = self.get("?fields=name,origin,skills&expand=origin,skills")
+        self.assertEqual(rows[0]["origin"]["name"], "Humano")
+        self.assertIn("skill_name", rows[0]["skills"][0])
+
+    def test_expand_alone_keeps_every_field(self):
+        rows, _ = self.get("?expand=char_class")
+        self.assertEqual(rows[0]["char_class"]["name"], "Guerreiro")
+        self.assertEqual(rows[0]["subclass"], self.subclass.pk)
+        self.assertIn("notes", rows[0])
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get("/api/characters/?fields=name,armor")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.data)
+
+        response = self.client.get("/api/characters/?expand=name")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("expand", response.data)
+
+    def test_retrieve_and_campaign_characters(self):
+        character = CampaignCharacter.objects.first()
+        response = self.client.get(
+            f"/api/characters/{character.pk}/?fields=name,available_actions"
+        )
+        self.assertEqual(set(response.data), {"id", "name", "available_actions"})
+
+        # outra representação, outro ETag
+        full = self.client.get(f"/api/characters/{character.pk}/")
+        self.assertNotEqual(response["ETag"], full["ETag"])
+        response = self.client.get(
+            f"/api/characters/{character.pk}/?fields=name,available_actions",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            f"/api/campaigns/{self.campaign.pk}/characters/?fields=name,user_name"
+        )
+        self.assertEqual(set(response.data["results"][0]), {"id", "name", "user_name"})
+
+
+class CampaignEventStreamTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.character = self.make_character("pc")
+        self.url = f"/api/campaigns/{self.campaign.pk}/events/"
+        self.streams = []
+
+    def write_log(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.log(actor=self.owner, message=message)
+
+    async def open_stream(self, user, **headers):
+        client = AsyncClient()
+        await client.aforce_login(user)
+        response = await client.get(self.url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        self.streams.append(stream)
+        return stream
+
+    async def close_streams(self):
+        # cliente desconectou: o ASGI cancela a task que lê o stream e o
+        # ouvinte sai do hub
+        for stream in self.streams:
+            while True:  # descarta o que ninguém leu até a leitura travar
+                try:
+                    await asyncio.wait_for(anext(stream), 0.05)
+                except asyncio.TimeoutError:
+                    break
+        self.assertEqual(events.hub.listeners(self.campaign.pk), 0)
+
+    async def next_event(self, stream):
+        return await asyncio.wait_for(anext(stream), 1)
+
+    async def test_players_receive_logs_and_resource_changes(self):
+        gm = await self.open_stream(self.owner)
+        player = await self.open_stream(self.character.user)
+
+        await sync_to_async(self.write_log)("Rolagem de iniciativa")
+        for stream in (gm, player):
+            payload = (await self.next_event(stream)).decode()
+            self.assertIn("event: log", payload)
+            self.assertIn("Rolagem de iniciativa", payload)
+
+        def damage():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.campaign.update_resources({self.character.pk: {"hp": 3}}, actor=self.owner)
+
+        await sync_to_async(damage)()
+        events_seen = [(await self.next_event(gm)).decode() for _ in range(2)]
+        self.assertTrue(any("event: resources" in e and '"hp": 3' in e for e in events_seen))
+        await self.close_streams()
+
+    async def test_sheet_edits_publish_resource_changes(self):
+        gm = await self.open_stream(self.owner)
+
+        def edit(data):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(f"/api/characters/{self.character.pk}/", data, format="json")
+            self.assertEqual(response.status_code, 200, response.content)
+
+        # sem mudar recurso não publica nada; o primeiro evento é o do hp
+        await sync_to_async(edit)({"strength": 14})
+        await sync_to_async(edit)({"hp": 4, "sanity": 7})
+        payload = (await self.next_event(gm)).decode()
+        self.assertIn("event: resources", payload)
+        self.assertIn('"hp": 4', payload)
+        self.assertIn('"sanity": 7', payload)
+        await self.close_streams()
+
+    async def test_publishing_does_not_read_per_listener(self):
+        streams = [await self.open_stream(self.owner) for _ in range(3)]
+
+        def write():
+            # o INSERT do log e o do feed de delta sync, com qualquer número de ouvintes
+            with self.assertNumQueries(2):
+                self.write_log("Descanso longo")
+
+        await sync_to_async(write)()
+        payloads = {await self.next_event(stream) for stream in streams}
+        self.assertEqual(len(payloads), 1)
+        await self.close_streams()
+
+    async def test_reconnect_replays_missed_logs(self):
+        def write():
+            self.write_log("primeiro")
+            self.write_log("segundo")
+            return CampaignLog.objects.filter(message="primeiro").get().pk
+
+        first = await sync_to_async(write)()
+        stream = await self.open_stream(self.owner, **{"Last-Event-ID": str(first)})
+        payload = (await self.next_event(stream)).decode()
+        self.assertIn("segundo", payload)
+        self.assertNotIn("primeiro", payload)
+        await self.close_streams()
+
+    async def test_outsiders_cannot_listen(self):
+        outsider = await sync_to_async(User.objects.create_user)("curioso")
+        client = AsyncClient()
+        await client.aforce_login(outsider)
+        self.assertEqual((await client.get(self.url)).status_code, 404)
+        self.assertEqual((await AsyncClient().get(self.url)).status_code, 403)
+
+    def test_hub_fans_out_across_threads(self):
+        async def scenario():
+            subscriptions = [events.hub.subscribe(7) for _ in range(2)]
+            thread = threading.Thread(target=events.hub.publish, args=(7, "ping", {"ok": True}))
+            thread.start()
+            thread.join()
+            received = [await asyncio.wait_for(s.get(), 1) for s in subscriptions]
+            for s in subscriptions:
+                events.hub.unsubscribe(s)
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertEqual(received[0], b'event: ping\ndata: {"ok": true}\n\n')
+        self.assertIs(received[0], received[1])
+        self.assertEqual(events.hub.listeners(7), 0)
+
+
+class DeltaSyncTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = self.make_character("pc1")
+        self.second = self.make_character("pc2")
+        self.url = f"/api/campaigns/{self.campaign.pk}/changes/"
+
+    def cursor(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data["cursor"]
+
+    def changes(self, since, **params):
+        response = self.client.get(self.url, {"since": since, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_returns_only_what_changed_after_the_cursor(self):
+        cursor = self.cursor()
+
+        self.client.post(f"/api/characters/{self.first.pk}/resources/", {"hp": -3}, format="json")
+        self.second.set_skill_levels({self.skills[0].pk: 2})
+        invited = User.objects.create_user("convidado")
+        invite = CampaignInvite.objects.create(
+            campaign=self.campaign, invited_by=self.owner, invited_user=invited
+        )
+
+        data = self.changes(cursor)
+        self.assertEqual([c["id"] for c in data["characters"]], [self.first.pk])
+        self.assertEqual(data["characters"][0]["hp"], -3)
+        self.assertEqual([s["character"] for s in data["skills"]], [self.second.pk])
+        self.assertEqual(len(data["skills"][0]["skills"]), 3)
+        self.assertEqual([i["id"] for i in data["invites"]], [invite.pk])
+        self.assertEqual(len(data["logs"]), 1)
+        self.assertFalse(data["has_more"])
+        self.assertGreater(data["cursor"], cursor)
+
+        # nada novo: resposta vazia com o mesmo cursor
+        again = self.changes(data["cursor"])
+        self.assertEqual(again["cursor"], data["cursor"])
+        self.assertEqual(again["characters"], [])
+        self.assertEqual(again["logs"], [])
+
+    def test_deletions_and_sparse_sheets(self):
+        cursor = self.cursor()
+        removed = self.second.pk
+        self.second.delete()
+        self.first.notes = "ferido"
+        self.first.save()
+
+        data = self.changes(cursor, fields="name,notes")
+        self.assertEqual(data["deleted"]["characters"], [removed])
+        self.assertEqual(data["characters"], [{"id": self.first.pk, "name": "pc1", "notes": "ferido"}])
+        self.assertEqual(data["skills"], [])
+
+    def test_players_never_receive_removed_sheets(self):
+        cursor = self.cursor()
+        self.second.change_status(CampaignCharacter.Status.ACTIVE, self.second.user)
+        self.second.change_status(CampaignCharacter.Status.REMOVED, self.owner)
+        self.second.set_skill_levels({self.skills[0].pk: 2})
+
+        # o mestre ainda vê a ficha removida
+        data = self.changes(cursor)
+        self.assertEqual([c["id"] for c in data["characters"]], [self.second.pk])
+        self.assertEqual(data["characters"][0]["status"], "removed")
+
+        self.client.force_authenticate(self.first.user)
+        data = self.changes(cursor)
+        self.assertEqual(data["characters"], [])
+        self.assertEqual(data["skills"], [])
+        self.assertEqual(data["deleted"]["characters"], [self.second.pk])
+
+    def test_pages_with_limit(self):
+        cursor = self.cursor()
+        for i in range(5):
+            self.campaign.log(actor=self.owner, message=f"log {i}")
+
+        first = self.changes(cursor, limit=3)
+        self.assertTrue(first["has_more"])
+        rest = self.changes(first["cursor"], limit=3)
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(
+            [log["message"] for log in first["logs"] + rest["logs"]],
+            [f"log {i}" for i in range(5)],
+        )
+
+    def test_since_zero_has_the_whole_campaign(self):
+        data = self.changes(0)
+        self.assertEqual(
+            sorted(c["id"] for c in data["characters"]), [self.first.pk, self.second.pk]
+        )
+
+    def test_invalid_cursor_and_outsiders(self):
+        self.assertEqual(self.client.get(self.url, {"since": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"since": -1}).status_code, 400)
+
+        self.client.force_authenticate(User.objects.create_user("curioso"))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_deleting_the_campaign_drops_its_feed(self):
+        self.campaign.delete()
+        self.assertFalse(CampaignChange.objects.exists())
+
+
+class GroupCheckTests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.party = [self.make_character(f"pc{i}") for i in range(3)]
+        self.party[0].dexterity = 14
+        self.party[0].save()
+        self.url = f"/api/campaigns/{self.campaign.pk}/roll/"
+
+    def roll(self, payload, user=None):
+        if user is not None:
+            self.client.force_authenticate(user)
+        return self.client.post(self.url, payload, format="json")
+
+    def test_party_skill_check_is_seeded_and_logged_once(self):
+        payload = {"skill": self.skills[1].pk, "dc": 12, "seed": 42}
+        first = self.roll(payload)
+        second = self.roll(payload)
+
+        self.assertEqual(first.status_code, 200, first.content)
+        self.assertEqual(first.data["results"], second.data["results"])
+        self.assertEqual(len(first.data["results"]), 3)
+
+        # Furtividade: destreza 14 (+2) + proficiência 2
+        result = first.data["results"][0]
+        self.assertEqual(result["modifier"], 4)
+        self.assertEqual(result["total"], result["natural"] + 4)
+        self.assertEqual(result["success"], result["total"] >= 12)
+
+        logs = CampaignLog.objects.filter(type=CampaignLog.LogType.GROUP_CHECK)
+        self.assertEqual(logs.count(), 2)
+        self.assertIn("Furtividade (CD 12", logs.first().message)
+
+    def test_saving_throw_for_thousands_of_npcs(self):
+        response = self.roll({
+            "ability": "wisdom", "dc": 13, "mode": "advantage", "seed": 7,
+            "characters": [],
+            "npcs": [{"name": "Goblin", "modifier": -1, "count": 3000},
+                     {"name": "Xamã", "modifier": 2, "count": 10}],
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+
+        results, summary = response.data["results"], response.data["summary"]
+        self.assertEqual(summary["count"], 3010)
+        self.assertEqual(summary["successes"], sum(r["success"] for r in results))
+        self.assertTrue(all(r["natural"] == max(r["rolls"]) for r in results))
+        self.assertTrue(all(1 <= d <= 20 for r in results for d in r["rolls"]))
+        self.assertEqual(CampaignLog.objects.filter(type=CampaignLog.LogType.GROUP_CHECK).count(), 1)
+
+    def test_modifiers_are_loaded_in_one_query(self):
+        characters = CampaignCharacter.objects.filter(campaign=self.campaign)
+        with self.assertNumQueries(1):
+            rows = characters.check_modifiers(skill=self.skills[0].pk)
+        self.assertEqual(len(rows), 3)
+        with self.assertNumQueries(1):
+            rows = characters.check_modifiers(ability="dexterity")
+        self.assertEqual(rows[0][2], 2)
+
+    def test_disadvantage_keeps_lowest(self):
+        kept, rolls = dice.roll_d20s(500, dice.DISADVANTAGE, random.Random(1))
+        self.assertEqual(kept, [min(pair) for pair in rolls])
+
+    def test_validation_and_permissions(self):
+        self.assertEqual(self.roll({"dc": 10}).status_code, 400)
+        self.assertEqual(
+            self.roll({"skill": self.skills[0].pk, "ability": "wisdom", "dc": 10}).status_code, 400
+        )
+        self.assertEqual(
+            self.roll({"ability": "wisdom", "dc": 10, "characters": [9999]}).status_code, 400
+        )
+        response = self.roll({"ability": "wisdom", "dc": 10}, user=self.party[0].user)
+        self.assertEqual(response.status_code, 403)
+
+
+class DiceExpressionTests(CampaignTestMixin, TestCase):
+    def brute_force(self, count, sides, keep=None, highest=True):
+        totals = Counter()
+        for faces in itertools.product(range(1, sides + 1), repeat=count):
+            kept = sorted(faces, reverse=highest)[:keep or count]
+            totals[sum(kept)] += 1
+        return {total: Fraction(ways, sides ** count) for total, ways in totals.items()}
+
+    def exact(self, expression):
+        distribution = dice.compile_expression(expression).distribution
+        return {
+            distribution.offset + i: Fraction(ways, distribution.total)
+            for i, ways in enumerate(distribution.counts) if ways
+        }
+
+    def test_distributions_match_brute_force(self):
+        self.assertEqual(self.exact("4d6kh3"), self.brute_force(4, 6, 3))
+        self.assertEqual(self.exact("5d4kl2"), self.brute_force(5, 4, 2, highest=False))
+        self.assertEqual(self.exact("3d8"), self.brute_force(3, 8))
+
+        advantage = dice.compile_expression("2d20kh1+5").distribution
+        self.assertEqual(advantage.at_least(25), Fraction(39, 400))
+        self.assertEqual(dice.compile_expression("1d8+1d6-1d4+3").distribution.mean, Fraction(17, 2))
+
+    def test_compiled_expressions_are_cached(self):
+        self.assertIs(dice.compile_expression("4d6kh3+2"), dice.compile_expression(" 4d6kh3 + 2 "))
+        self.assertEqual(str(dice.compile_expression("d20 - 2 + 1d4")), "1d20+1d4-2")
+
+    def test_rolls_stay_in_range_and_match_monte_carlo(self):
+        expression = dice.compile_expression("2d20kl1+5")
+        totals = expression.roll_many(2000, random.Random(3))
+        self.assertTrue(all(6 <= total <= 25 for total in totals))
+        self.assertEqual(totals, expression.roll_many(2000, random.Random(3)))
+
+        exact = expression.distribution.as_floats()
+        estimate = dice.monte_carlo("2d20kl1+5", 20000, seed=1)
+        self.assertLess(max(abs(exact[v] - estimate.get(v, 0)) for v in exact), 0.01)
+
+    def test_invalid_expressions(self):
+        for text in ["", "d", "4d6kh7", "1d20++2", "3 2", "0d6", "1d20x"]:
+            with self.assertRaises(dice.DiceError, msg=text):
+                dice.compile_expression(text)
+
+    def test_party_odds_endpoint(self):
+        party = [self.make_character(f"pc{i}") for i in range(2)]
+        response = self.client.post(
+            f"/api/campaigns/{self.campaign.pk}/odds/",
+            {"skill": self.skills[0].pk, "dc": 15, "mode": "advantage"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["die"], "2d20kh1")
+
+        # precisa de CD - total da skill no dado
+        total = party[0].skills.get(skill=self.skills[0]).total
+        chance = float(dice.compile_expression("2d20kh1").distribution.at_least(15 - total))
+        self.assertEqual([c["chance"] for c in response.data["characters"]], [chance, chance])
+        self.assertAlmostEqual(response.data["party"]["all"], chance ** 2)
+        self.assertEqual([c["id"] for c in response.data["characters"]], [c.pk for c in party])
+
+        response = self.client.post(
+            f"/api/campaigns/{self.campaign.pk}/odds/",
+            {"ability": "wisdom", "dc": 15, "die": "1d20 + 1d4"},
+            format="json",
+        )
+        self.assertEqual(response.data["die"], "1d20+1d4")
+
+        response = self.client.post(
+            f"/api/campaigns/{self.campaign.pk}/odds/",
+            {"ability": "wisdom", "dc": 15, "die": "1d20+"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_dice_endpoint(self):
+        response = self.client.get("/api/dice/", {"expression": "4d6kh3", "at_least": 18})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["min"], response.data["max"]), (3, 18))
+        self.assertAlmostEqual(response.data["at_least"], 21 / 1296)
+        self.assertAlmostEqual(sum(response.data["distribution"].values()), 1)
+
+        self.assertEqual(self.client.get("/api/dice/", {"expression": "x"}).status_code, 400)
+
+
+class EncounterSimulationAPITests(CampaignTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.party = [self.make_character(f"pc{i}") for i in range(3)]
+        for character in self.party:
+            character.status = CampaignCharacter.Status.ACTIVE
+            character.hp = 30
+            character.strength = 16
+            character.save()
+
+        Creature.objects.import_rows([
+            {"name": "Goblin", "type": "humanoid", "challenge": 0.25, "armor_class": 15,
+             "hit_points": 7, "dexterity": 14, "attack_bonus": 4, "damage_dice": "1d6+2"},
+        ])
+        self.goblin = Creature.objects.get()
+        self.enterContext(override_settings(BESTIARY_VERSION_TTL=3600))
+        statblocks.invalidate()
+
+        self.url = f"/api/campaigns/{self.campaign.pk}/simulate/"
+
+    def simulate(self, **payload):
+        payload.setdefault("creatures", [{"id": self.goblin.pk, "count": 4}])
+        return self.client.post(self.url, payload, format="json")
+
+    def test_party_against_creatures(self):
+        self.party[2].hp = 0
+        self.party[2].save()
+
+        response = self.simulate(fights=300, seed=3)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["fights"], 300)
+        self.assertEqual(response.data["enemies"], 4)
+        # sem PV não entra na luta
+        self.assertEqual(
+            [c["id"] for c in response.data["characters"]], [self.party[0].pk, self.party[1].pk]
+        )
+        self.assertEqual(response.data, self.simulate(fights=300, seed=3).data)
+
+    def test_streams_progress_then_result(self):
+        response = self.simulate(fights=600, seed=3, stream=True)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        body = b"".join(response.streaming_content).decode()
+        kinds = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event:")]
+        self.assertEqual(kinds[-1], "result")
+        self.assertEqual(set(kinds[:-1]), {"progress"})
+        self.assertIn('"done": 600', body)
+
+    def test_validation_and_permissions(self):
+        self.assertEqual(self.simulate(creatures=[{"id": 999, "count": 1}]).status_code, 400)
+        self.assertEqual(self.simulate(creatures=[]).status_code, 400)
+        self.assertEqual(self.simulate(characters=[999]).status_code, 400)
+        self.assertEqual(
+            self.simulate(creatures=[{"id": self.goblin.pk, "count": 500}]).status_code, 400
+        )
+
+        self.client.force_authenticate(self.party[0].user)
+        self.assertEqual(self.simulate().status_code, 403)
+
+    def test_build_encounter_feeds_the_simulation(self):
+        url = f"/api/campaigns/{self.campaign.pk}/build-encounter/"
+        response = self.client.post(url, {"difficulty": "medium", "seed": 1}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+
+        # só goblins (50 XP) e 3 personagens de nível 1: médio = 150..224 XP
+        # ajustado, e só dois goblins (100 x 1,5) cabem
+        self.assertEqual(response.data["budget"]["min"], 150)
+        [encounter] = response.data["encounters"]
+        self.assertEqual(encounter["creatures"], [
+            {"id": self.goblin.pk, "name": "Goblin", "type": "humanoid",
+             "challenge": 0.25, "xp": 50, "count": 2},
+        ])
+        self.assertEqual(encounter["adjusted_xp"], 150)
+
+        response = self.simulate(creatures=encounter["creatures"], fights=50, seed=1)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        response = self.client.post(url, {"difficulty": "mortal"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(self.party[0].user)
+        self.assertEqual(self.client.post(url, {}, format="json").status_code, 403)
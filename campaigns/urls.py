@@ -16,5 +16,7 @@ router.register(r"invites", CampaignInviteViewSet, basename="campaigninvite")
 router.register(r"campaign-logs", CampaignLogViewSet, basename="campaign-log")
 
 urlpatterns = [
+    path("campaigns/<int:pk>/events/", views.campaign_events, name="campaign-events"),
+    path("dice/", views.DiceView.as_view(), name="dice"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
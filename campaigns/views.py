@@ -1,21 +1,56 @@
+import asyncio
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, prefetch_related_objects
 from django.core.exceptions import ValidationError
+from rest_framework.views import APIView
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
-from .models import Campaign, CampaignCharacter, CampaignInvite, CharacterSkill, CampaignLog
+from creatures import builder, simulation, statblocks
+from creatures.serializers import EncounterBuildSerializer, EncounterSimulationSerializer
+from items import inventory, loot
+from items.models import InventoryItem, Item, with_inventory_totals
+from items.serializers import (
+    InventoryItemSerializer,
+    InventoryTotalsSerializer,
+    InventoryWriteSerializer,
+    LootSerializer,
+    TransferSerializer,
+)
+
+from . import conditional, dice, events, sync
+from .membership import CampaignMembership, get_membership
+from .sparse import SheetFieldset
+from .models import (
+    Campaign, CampaignCharacter, CampaignInvite, CharacterSkill, CampaignLog, CampaignChange,
+    ABILITIES, RESOURCE_FIELDS,
+)
 from .serializers import (
     CampaignSerializer,
     CampaignCharacterSerializer,
     CampaignInviteSerializer,
     CharacterSkillSerializer,
     CharacterSkillUpdateSerializer,
-    CampaignLogSerializer
+    CampaignLogSerializer,
+    BulkResourcesSerializer,
+    ResourceDeltaSerializer,
+    BulkSkillLevelSerializer,
+    GroupCheckSerializer,
+    CheckOddsSerializer,
+)
+from .pagination import (
+    CampaignCursorPagination,
+    CharacterCursorPagination,
+    CampaignLogCursorPagination,
 )
 from .permissions import IsCampaignOwner,IsCharacterOwner,IsInviteReceiver, IsCampaignOwnerForCharacter, IsCampaignCharacterPlayer, CanEditCharacterResources
 
@@ -25,12 +60,24 @@ def campaigns(request):
 class CampaignViewSet(viewsets.ModelViewSet):
     serializer_class = CampaignSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CampaignCursorPagination
 
     def get_queryset(self):
-        user = self.request.user
-        return Campaign.objects.filter(
-            Q(owner=user) | Q(players=user)
-        ).distinct()
+        membership = get_membership(self.request)
+        return Campaign.objects.filter(pk__in=membership.visible)
+
+    def retrieve(self, request, *args, **kwargs):
+        # GET condicional: o ETag sai da própria linha da campanha, sem
+        # consulta extra; 304 antes de serializar
+        campaign = self.get_object()
+
+        etag, last_modified = conditional.validators(
+            "campaign", campaign.pk, request.user, campaign.updated_at
+        )
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(campaign).data)
+        return conditional.set_validators(response, etag, last_modified)
     
     def get_permissions(self):
         if self.action in ["update", "partial_update", "destroy"]:
@@ -47,9 +94,12 @@ class CampaignViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"])
     def characters(self, request, pk=None):
         campaign = self.get_object()
-        chars = CampaignCharacter.objects.filter(campaign=campaign)
-        serializer = CampaignCharacterSerializer(chars, many=True)
-        return Response(serializer.data)
+        chars = CampaignCharacter.objects.filter(campaign=campaign).with_sheet(
+            SheetFieldset.from_request(request)
+        )
+        return self._paginated(
+            chars, CampaignCharacterSerializer, CharacterCursorPagination()
+        )
 
     # ----------------------------------------
     # LISTAR CONVITES
@@ -57,9 +107,360 @@ class CampaignViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"])
     def invites(self, request, pk=None):
         campaign = self.get_object()
-        invites = CampaignInvite.objects.filter(campaign=campaign)
-        serializer = CampaignInviteSerializer(invites, many=True)
-        return Response(serializer.data)
+        invites = CampaignInvite.objects.filter(campaign=campaign).select_related(
+            "invited_user", "invited_by"
+        )
+        return self._paginated(
+            invites, CampaignInviteSerializer, CampaignCursorPagination()
+        )
+
+    # ----------------------------------------
+    # TESTE EM GRUPO (PERÍCIA OU RESISTÊNCIA)
+    # ----------------------------------------
+    @action(detail=True, methods=["post"])
+    def roll(self, request, pk=None):
+        campaign = self.get_object()
+
+        if not get_membership(request).is_owner(campaign.pk):
+            return Response(
+                {"error": "Apenas o mestre pode pedir testes em grupo."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = GroupCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        rows = self._check_modifiers(campaign, data)
+        if rows is None:
+            return Response({"error": "Personagem não encontrado na campanha."}, status=400)
+
+        skill = data.get("skill")
+        participants = [dice.Participant(pk, name, modifier) for pk, name, modifier in rows]
+        for group in data["npcs"]:
+            participants += [
+                dice.Participant(None, group["name"], group["modifier"], npc=True)
+            ] * group["count"]
+
+        if not participants:
+            return Response({"error": "Nenhum participante no teste."}, status=400)
+
+        result = dice.group_check(participants, data["dc"], data["mode"], data.get("seed"))
+
+        summary = result["summary"]
+        label = skill.name if skill else data["ability"]
+        campaign.log(
+            actor=request.user,
+            type=CampaignLog.LogType.GROUP_CHECK,
+            message=(
+                f"Teste de {label} (CD {data['dc']}, {data['mode']}): "
+                f"{summary['successes']}/{summary['count']} sucessos [seed {result['seed']}]"
+            )
+        )
+
+        return Response(result)
+
+    # ----------------------------------------
+    # CHANCE EXATA DE UM TESTE EM GRUPO (SEM ROLAR)
+    # ----------------------------------------
+    @action(detail=True, methods=["post"])
+    def odds(self, request, pk=None):
+        campaign = self.get_object()
+
+        serializer = CheckOddsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        rows = self._check_modifiers(campaign, data)
+        if rows is None:
+            return Response({"error": "Personagem não encontrado na campanha."}, status=400)
+
+        die = data.get("die") or dice.MODE_DICE[data["mode"]]
+        odds = dice.party_odds([modifier for _, _, modifier in rows], data["dc"], die)
+
+        return Response({
+            "dc": data["dc"],
+            "die": die,
+            "characters": [
+                {"id": pk, "name": name, "modifier": modifier, "chance": chance}
+                for (pk, name, modifier), chance in zip(rows, odds.pop("each"))
+            ],
+            "party": odds,
+        })
+
+    def _check_modifiers(self, campaign, data):
+        """Modificadores do teste; None se algum personagem pedido não existe."""
+        characters = campaign.characters.all()
+        if "characters" in data:
+            characters = characters.filter(pk__in=data["characters"])
+        else:
+            characters = characters.filter(
+                status__in=[CampaignCharacter.Status.ACTIVE, CampaignCharacter.Status.DRAFT]
+            )
+
+        skill = data.get("skill")
+        rows = characters.check_modifiers(
+            skill=skill.pk if skill else None, ability=data.get("ability")
+        )
+        if "characters" in data and len(rows) != len(set(data["characters"])):
+            return None
+        return rows
+
+    # ----------------------------------------
+    # SIMULAÇÃO DE ENCONTRO (MONTE CARLO)
+    # ----------------------------------------
+    @action(detail=True, methods=["post"])
+    def simulate(self, request, pk=None):
+        """
+        Grupo da campanha contra criaturas do bestiário em `fights` lutas
+        simuladas (ver creatures.simulation). Com "stream": true, responde
+        em text/event-stream: eventos "progress" e um "result" no fim.
+        """
+        campaign = self.get_object()
+
+        if not get_membership(request).is_owner(campaign.pk):
+            return Response(
+                {"error": "Apenas o mestre pode simular encontros."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = EncounterSimulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        characters = list(
+            self._encounter_party(campaign, data).only("pk", "name", "level", "hp", *ABILITIES)
+        )
+        if "characters" in data and len(characters) != len(set(data["characters"])):
+            return Response({"error": "Personagem não encontrado na campanha."}, status=400)
+
+        party = simulation.party_from_characters(characters)
+        if not party:
+            return Response({"error": "Nenhum personagem com PV para a simulação."}, status=400)
+
+        try:
+            enemies = simulation.enemies_from_table(
+                statblocks.get_table(),
+                [(group["id"], group["count"]) for group in data["creatures"]],
+            )
+        except KeyError as e:
+            return Response({"error": f"Criatura {e.args[0]} não encontrada."}, status=400)
+
+        if not data["stream"]:
+            return Response(
+                simulation.simulate(party, enemies, data["fights"], seed=data.get("seed"))
+            )
+
+        runs = simulation.simulate_iter(party, enemies, data["fights"], seed=data.get("seed"))
+        response = StreamingHttpResponse(
+            (events.encode(kind, payload) for kind, payload in runs),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    # ----------------------------------------
+    # MONTAGEM DE ENCONTRO POR ORÇAMENTO DE XP
+    # ----------------------------------------
+    @action(detail=True, methods=["post"], url_path="build-encounter")
+    def build_encounter(self, request, pk=None):
+        """
+        Melhores encontros do bestiário para o grupo da campanha numa
+        dificuldade (ver creatures.builder). Os resultados podem ir direto
+        para `simulate`.
+        """
+        campaign = self.get_object()
+
+        if not get_membership(request).is_owner(campaign.pk):
+            return Response(
+                {"error": "Apenas o mestre pode montar encontros."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = EncounterBuildSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        levels = list(self._encounter_party(campaign, data).values_list("level", flat=True))
+        if "characters" in data and len(levels) != len(set(data["characters"])):
+            return Response({"error": "Personagem não encontrado na campanha."}, status=400)
+        if not levels:
+            return Response({"error": "Nenhum personagem para montar o encontro."}, status=400)
+
+        return Response(builder.build(
+            statblocks.get_table(),
+            levels,
+            data["difficulty"],
+            results=data["results"],
+            max_monsters=data["max_monsters"],
+            max_kinds=data["max_kinds"],
+            types=data.get("types"),
+            challenge_min=data.get("challenge_min"),
+            challenge_max=data.get("challenge_max"),
+            seed=data.get("seed"),
+        ))
+
+    def _encounter_party(self, campaign, data):
+        """Personagens pedidos ou, sem a lista, os ativos da campanha."""
+        if "characters" in data:
+            return campaign.characters.filter(pk__in=data["characters"])
+        return campaign.characters.filter(status=CampaignCharacter.Status.ACTIVE)
+
+    # ----------------------------------------
+    # SAQUE DIVIDIDO ENTRE O GRUPO
+    # ----------------------------------------
+    @action(detail=True, methods=["post"])
+    def loot(self, request, pk=None):
+        campaign = self.get_object()
+
+        if not get_membership(request).is_owner(campaign.pk):
+            return Response(
+                {"error": "Apenas o mestre pode distribuir saques."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = LootSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        characters = list(
+            self._encounter_party(campaign, data).order_by("pk").values_list("pk", "name")
+        )
+        if "characters" in data and len(characters) != len(set(data["characters"])):
+            return Response({"error": "Personagem não encontrado na campanha."}, status=400)
+
+        pile = Counter()
+        for entry in data["items"]:
+            pile[entry["item"].pk] += entry["quantity"]
+
+        seed = None
+        if data["tables"]:
+            try:
+                seed, rolled = loot.roll_tables(
+                    [(t["table"], t["rolls"]) for t in data["tables"]], data.get("seed")
+                )
+            except KeyError as e:
+                return Response({"error": f"Tabela de saque {e.args[0]} não encontrada."}, status=400)
+            pile.update(rolled)
+
+        try:
+            grants = inventory.give_loot([pk for pk, _ in characters], list(pile.items()))
+        except ValidationError as e:
+            return Response({"error": e.message}, status=400)
+
+        names = {entry["item"].pk: entry["item"].name for entry in data["items"]}
+        if pile.keys() - names.keys():
+            names.update(
+                Item.objects.filter(pk__in=pile.keys() - names.keys()).values_list("pk", "name")
+            )
+        campaign.log(
+            actor=request.user,
+            type=CampaignLog.LogType.LOOT,
+            message="Saque dividido: " + (", ".join(
+                f"{quantity}x {names[item_id]}" for item_id, quantity in pile.items()
+            ) or "nada")
+        )
+
+        shares = {pk: {"id": pk, "name": name, "items": []} for pk, name in characters}
+        for character_id, item_id, quantity in grants:
+            shares[character_id]["items"].append(
+                {"item": item_id, "name": names[item_id], "quantity": quantity}
+            )
+        return Response({"seed": seed, "characters": list(shares.values())})
+
+    # ----------------------------------------
+    # PESO, VALOR E SOBRECARGA DO GRUPO
+    # ----------------------------------------
+    @action(detail=True, methods=["get"])
+    def inventory(self, request, pk=None):
+        campaign = self.get_object()
+        characters = with_inventory_totals(
+            campaign.characters.exclude(status=CampaignCharacter.Status.REMOVED)
+        ).order_by("pk")
+        return Response(InventoryTotalsSerializer(characters, many=True).data)
+
+    # ----------------------------------------
+    # DELTA SYNC: O QUE MUDOU DEPOIS DO CURSOR
+    # ----------------------------------------
+    @action(detail=True, methods=["get"])
+    def changes(self, request, pk=None):
+        """
+        ?since=N   personagens, skills, convites e logs alterados depois
+                   do cursor N (ver campaigns.sync)
+        sem since  só o cursor atual: pegue-o antes de carregar a mesa
+        """
+        campaign = self.get_object()
+
+        since = request.query_params.get("since")
+        if since is None:
+            return Response({"cursor": sync.latest_cursor(campaign)})
+
+        try:
+            since = int(since)
+            limit = int(request.query_params.get("limit", sync.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"error": "since e limit devem ser números."}, status=400)
+        if since < 0 or limit < 1:
+            return Response({"error": "since e limit devem ser positivos."}, status=400)
+
+        return Response(sync.changes_since(
+            campaign, since,
+            limit=min(limit, sync.MAX_LIMIT),
+            context=self.get_serializer_context(),
+            fieldset=SheetFieldset.from_request(request),
+            # como em CampaignCharacterViewSet: removidos só para o mestre
+            include_removed=get_membership(request).is_owner(campaign.pk),
+        ))
+
+    # ----------------------------------------
+    # ATUALIZAR RECURSOS DE VÁRIOS PERSONAGENS (COMBATE)
+    # ----------------------------------------
+    @action(detail=True, methods=["post"])
+    def resources(self, request, pk=None):
+        campaign = self.get_object()
+
+        serializer = BulkResourcesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        changes = {
+            item.pop("id"): item
+            for item in serializer.validated_data["characters"]
+        }
+
+        # o mestre edita todos; jogadores só os próprios personagens
+        if not get_membership(request).is_owner(campaign.pk):
+            others = campaign.characters.filter(pk__in=changes).exclude(user=request.user)
+            if others.exists():
+                return Response(
+                    {"error": "Você só pode alterar seus próprios personagens."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+        try:
+            characters = campaign.update_resources(changes, actor=request.user)
+        except ValidationError as e:
+            return Response({"error": e.message}, status=400)
+
+        return Response([
+            {"id": c.pk, **{field: getattr(c, field) for field in RESOURCE_FIELDS}}
+            for c in characters
+        ])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "characters":
+            context["sheet_fieldset"] = SheetFieldset.from_request(self.request)
+        return context
+
+    def _paginated(self, queryset, serializer_class, paginator):
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(
+            page,
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
 
     # ----------------------------------------
     # ENVIAR CONVITE
@@ -83,18 +484,50 @@ class CampaignViewSet(viewsets.ModelViewSet):
 class CampaignCharacterViewSet(viewsets.ModelViewSet):
     serializer_class = CampaignCharacterSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CharacterCursorPagination
+
+    # ações que devolvem a ficha completa e usam o plano de prefetch
+    SHEET_ACTIONS = ["list", "retrieve", "update", "partial_update", "skills"]
 
     def get_queryset(self):
+        qs = self._scoped_queryset()
+
+        if self.action in self.SHEET_ACTIONS:
+            qs = qs.with_sheet(self._sheet_fieldset())
+
+        return qs
+
+    def perform_update(self, serializer):
+        before = {field: getattr(serializer.instance, field) for field in RESOURCE_FIELDS}
+        character = serializer.save()
+
+        # PATCH da ficha também é caminho de recursos: avisa quem ouve a mesa
+        if any(getattr(character, field) != before[field] for field in RESOURCE_FIELDS):
+            events.publish_resources(character.campaign_id, [character])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ["list", "retrieve"]:
+            context["sheet_fieldset"] = self._sheet_fieldset()
+        return context
+
+    def _sheet_fieldset(self):
+        # ?fields= / ?expand= só valem para leitura da ficha
+        if self.action not in ["list", "retrieve"]:
+            return None
+        return SheetFieldset.from_request(self.request)
+
+    def _scoped_queryset(self):
         user = self.request.user
+        membership = get_membership(self.request)
 
         qs = CampaignCharacter.objects.filter(
             Q(user=user) |
-            Q(campaign__owner=user) |
-            Q(campaign__players=user)
-        ).distinct()
+            Q(campaign_id__in=membership.visible)
+        )
 
         # Se o usuário NÃO é mestre de nenhuma campanha
-        if not Campaign.objects.filter(owner=user).exists():
+        if not membership.owned:
             qs = qs.exclude(status=CampaignCharacter.Status.REMOVED)
 
         # filtro opcional por status
@@ -104,18 +537,55 @@ class CampaignCharacterViewSet(viewsets.ModelViewSet):
 
         return qs
 
+    def retrieve(self, request, *args, **kwargs):
+        # GET condicional: a consulta principal da ficha já traz a versão
+        # do catálogo; os prefetches (features, opções, skills) só rodam
+        # se a resposta não for 304
+        queryset, prefetches = (
+            self.get_queryset()
+            .annotate(**conditional.catalog_annotations())
+            .split_prefetch()
+        )
+        try:
+            character = queryset.filter(pk=kwargs["pk"]).first()
+        except (TypeError, ValueError):
+            character = None
+        if character is None:
+            raise Http404
+        self.check_object_permissions(request, character)
+
+        # cada fieldset é uma representação diferente da mesma ficha
+        fieldset = self._sheet_fieldset()
+        prefix = f"character~{fieldset.key}" if fieldset else "character"
+
+        etag, last_modified = conditional.validators(
+            prefix, character.pk, request.user, character.updated_at,
+            character.catalog_version, character.catalog_updated_at,
+        )
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is None:
+            prefetch_related_objects([character], *prefetches)
+            # regras da mesma versão do catálogo que está no ETag
+            context = self.get_serializer_context()
+            context["catalog_version"] = character.catalog_version or 0
+            response = Response(self.get_serializer(character, context=context).data)
+        return conditional.set_validators(response, etag, last_modified)
 
-    
     def get_permissions(self):
         # leitura
-        if self.action in ["retrieve", "list", "skills"]:
+        if self.action in ["retrieve", "list", "skills"] or (
+            self.action == "inventory" and self.request.method == "GET"
+        ):
             return [
                 IsAuthenticated(),
                 IsCampaignCharacterPlayer()
             ]
 
         # editar ficha (atributos, skills, recursos)
-        if self.action in ["update", "partial_update", "update_skill"]:
+        if self.action in [
+            "update", "partial_update", "update_skill", "update_skills", "resources",
+            "inventory", "inventory_item", "transfer",
+        ]:
             return [
                 IsAuthenticated(),
                 CanEditCharacterResources()
@@ -175,6 +645,59 @@ class CampaignCharacterViewSet(viewsets.ModelViewSet):
 
 
 
+    # ----------------------------------------
+    # ATUALIZAR VÁRIAS SKILLS DE UMA VEZ
+    # ----------------------------------------
+    @action(detail=True, methods=["patch"])
+    def update_skills(self, request, pk=None):
+        character = self.get_object()
+
+        serializer = BulkSkillLevelSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        levels = {
+            item["skill"]: item["proficiency_level"]
+            for item in serializer.validated_data["skills"]
+        }
+
+        try:
+            skills = character.set_skill_levels(levels)
+        except ValidationError as e:
+            return Response({"error": e.message}, status=400)
+
+        return Response(CharacterSkillSerializer(skills, many=True).data)
+
+    # ----------------------------------------
+    # APLICAR DELTAS NOS RECURSOS (hp -7, mana +3)
+    # ----------------------------------------
+    @action(detail=True, methods=["post"])
+    def resources(self, request, pk=None):
+        character = self.get_object()
+
+        serializer = ResourceDeltaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deltas = dict(serializer.validated_data)
+        clamp = deltas.pop("clamp")
+
+        CampaignCharacter.objects.filter(pk=character.pk).apply_resource_deltas(
+            deltas, clamp=clamp
+        )
+        character.refresh_from_db(fields=RESOURCE_FIELDS)
+        CampaignChange.record(CampaignChange.CHARACTERS, [(character.pk, character.campaign_id)])
+        events.publish_resources(character.campaign_id, [character])
+
+        character.campaign.log(
+            actor=request.user,
+            type=CampaignLog.LogType.RESOURCE_CHANGE,
+            message=f"{character.name}: " + ", ".join(
+                f"{field} {delta:+d}" for field, delta in deltas.items()
+            )
+        )
+
+        return Response(
+            {"id": character.pk, **{field: getattr(character, field) for field in RESOURCE_FIELDS}}
+        )
+
     # ----------------------------------------
     # LISTAR AS SKILLS DO PERSONAGEM
     # ----------------------------------------
@@ -184,11 +707,76 @@ class CampaignCharacterViewSet(viewsets.ModelViewSet):
         serializer = CharacterSkillSerializer(character.skills.all(), many=True)
         return Response(serializer.data)
     
+    # ----------------------------------------
+    # INVENTÁRIO DO PERSONAGEM
+    # ----------------------------------------
+    @action(detail=True, methods=["get", "post"])
+    def inventory(self, request, pk=None):
+        """
+        GET   pilhas do inventário e os totais (peso, valor, sobrecarga)
+        POST  adiciona uma pilha ({"item", "quantity", "equipped", "container"})
+        """
+        character = self.get_object()
+
+        if request.method == "POST":
+            serializer = InventoryWriteSerializer(data=request.data, context={"character": character})
+            serializer.is_valid(raise_exception=True)
+            stack = serializer.save(character=character)
+            stack = InventoryItem.objects.with_totals().select_related("item").get(pk=stack.pk)
+            return Response(InventoryItemSerializer(stack).data, status=201)
+
+        totals = with_inventory_totals(CampaignCharacter.objects.filter(pk=character.pk)).get()
+        stacks = character.inventory.with_totals().select_related("item")
+        return Response({
+            "totals": InventoryTotalsSerializer(totals).data,
+            "items": InventoryItemSerializer(stacks, many=True).data,
+        })
+
+    @action(detail=True, methods=["patch", "delete"], url_path=r"inventory/(?P<stack_id>\d+)")
+    def inventory_item(self, request, pk=None, stack_id=None):
+        character = self.get_object()
+
+        try:
+            stack = character.inventory.select_related("item").get(pk=stack_id)
+        except InventoryItem.DoesNotExist:
+            raise Http404
+
+        if request.method == "DELETE":
+            stack.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = InventoryWriteSerializer(
+            stack, data=request.data, partial=True, context={"character": character}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        stack = InventoryItem.objects.with_totals().select_related("item").get(pk=stack.pk)
+        return Response(InventoryItemSerializer(stack).data)
+
+    @action(detail=True, methods=["post"], url_path="inventory/transfer")
+    def transfer(self, request, pk=None):
+        """Passa pilhas para outros personagens da campanha, tudo numa transação."""
+        character = self.get_object()
+
+        serializer = TransferSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        moves = [
+            (move["stack"], move["character"], move["quantity"])
+            for move in serializer.validated_data["moves"]
+        ]
+
+        try:
+            inventory.transfer(character, moves)
+        except ValidationError as e:
+            return Response({"error": e.message}, status=400)
+
+        return Response({"moved": len(moves)})
+
     #STATUS DO PERSONAGEM
 
-    def _change_status(self, request, character, status, success_message):
+    def _change_status(self, request, character, new_status, success_message):
         try:
-            character.change_status(status, request.user)
+            character.change_status(new_status, request.user)
         except ValidationError as e:
             return Response(
                 {"error": e.message},
@@ -250,25 +838,26 @@ class CampaignCharacterViewSet(viewsets.ModelViewSet):
 
 class CampaignLogViewSet(ReadOnlyModelViewSet):
     serializer_class = CampaignLogSerializer
+    pagination_class = CampaignLogCursorPagination
 
     def get_queryset(self):
-        user = self.request.user
-        
+        membership = get_membership(self.request)
+
         return CampaignLog.objects.filter(
-            Q(campaign__owner=user) |
-            Q(campaign__players=user)
-        ).distinct()
+            campaign_id__in=membership.visible
+        ).select_related("actor")
 
 
 
 class CampaignInviteViewSet(viewsets.ModelViewSet):
     serializer_class = CampaignInviteSerializer
     permission_classes = [IsAuthenticated,IsInviteReceiver]
+    pagination_class = CampaignCursorPagination
 
     def get_queryset(self):
         return CampaignInvite.objects.filter(
         invited_user=self.request.user
-        )
+        ).select_related("invited_user", "invited_by")
 
     # aceitar convite
     @action(detail=True, methods=["post"])
@@ -307,3 +896,95 @@ class CampaignInviteViewSet(viewsets.ModelViewSet):
         return Response({"status": "Convite recusado."})
 
 
+
+
+# ----------------------------------------
+# ATIVIDADE DA MESA AO VIVO (SSE, precisa de ASGI)
+# ----------------------------------------
+REPLAY_LIMIT = 100
+
+
+def _missed_logs(campaign_id, last_event_id):
+    # logs perdidos enquanto o cliente estava desconectado
+    logs = (
+        CampaignLog.objects.filter(campaign_id=campaign_id, pk__gt=last_event_id)
+        .select_related("actor")
+        .order_by("pk")[:REPLAY_LIMIT]
+    )
+    return [events.encode("log", CampaignLogSerializer(log).data, id=log.pk) for log in logs]
+
+
+async def campaign_events(request, pk):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Autenticação necessária."}, status=403)
+
+    membership = await sync_to_async(CampaignMembership.load)(user)
+    if not membership.is_member(pk):
+        raise Http404
+
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+
+    keepalive = getattr(settings, "CAMPAIGN_EVENTS_KEEPALIVE", events.DEFAULT_KEEPALIVE)
+
+    async def stream():
+        # assina antes de ler o banco para não perder nada entre os dois
+        subscription = events.hub.subscribe(pk)
+        try:
+            yield b"retry: 3000\n\n"
+            if last_event_id is not None:
+                for payload in await sync_to_async(_missed_logs)(pk, last_event_id):
+                    yield payload
+
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscription.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if payload is None:
+                    break
+                yield payload
+        finally:
+            events.hub.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class DiceView(APIView):
+    """
+    Distribuição exata de uma expressão de dados.
+
+    GET /api/dice/?expression=4d6kh3
+    &at_least=N   também a chance de tirar N ou mais
+    """
+
+    def get(self, request):
+        try:
+            expression = dice.compile_expression(request.query_params.get("expression", ""))
+            distribution = expression.distribution
+        except dice.DiceError as e:
+            return Response({"error": str(e)}, status=400)
+
+        data = {
+            "expression": str(expression),
+            "min": distribution.min,
+            "max": distribution.max,
+            "mean": float(distribution.mean),
+            "distribution": distribution.as_floats(),
+        }
+
+        at_least = request.query_params.get("at_least")
+        if at_least is not None:
+            try:
+                data["at_least"] = float(distribution.at_least(int(at_least)))
+            except ValueError:
+                return Response({"error": "at_least deve ser um número."}, status=400)
+
+        return Response(data)
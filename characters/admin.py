@@ -1,4 +1,10 @@
+from functools import reduce
+from operator import or_
+
 from django.contrib import admin
+from django.db.models import Q
+
+from . import search
 from .models import (
     CharacterBase,
     Origin, OriginLineage,
@@ -7,6 +13,33 @@ from .models import (
 )
 
 
+class RulesSearchMixin:
+    """
+    Busca do admin pelo índice de texto completo (characters.search) em
+    vez de LIKE '%...%' nos campos do próprio modelo. Os campos de outros
+    modelos em search_fields (origin__name, ...) continuam valendo e
+    somam resultados. Sem o índice, é a busca normal do admin.
+    """
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search.available() or search.match_expression(search_term) is None:
+            return super().get_search_results(request, queryset, search_term)
+
+        matches = Q(pk__in=search.matching_ids(self.search_kind, search_term))
+
+        related = [field for field in self.get_search_fields(request) if "__" in field]
+        if related:
+            # todas as palavras no nome do pai, como o admin faria
+            parent = Q()
+            for word in search.terms(search_term):
+                parent &= reduce(or_, (Q(**{f"{field}__icontains": word}) for field in related))
+            matches |= parent
+
+        # só FKs para frente: não duplica linhas
+        return queryset.filter(matches), False
+
+
 # CHARACTER BASE
 
 @admin.register(CharacterBase)
@@ -27,17 +60,19 @@ class OriginLineageInline(admin.TabularInline):
 
 
 @admin.register(Origin)
-class OriginAdmin(admin.ModelAdmin):
+class OriginAdmin(RulesSearchMixin, admin.ModelAdmin):
     list_display = ("id", "name")
     search_fields = ("name",)
+    search_kind = "origins"
     inlines = [OriginLineageInline]
 
 
 @admin.register(OriginLineage)
-class OriginLineageAdmin(admin.ModelAdmin):
+class OriginLineageAdmin(RulesSearchMixin, admin.ModelAdmin):
     list_display = ("id", "origin", "name")
     list_filter = ("origin",)
     search_fields = ("name", "origin__name")
+    search_kind = "lineages"
 
 
 # CLASSES & SUBCLASSES
@@ -48,17 +83,19 @@ class SubclassInline(admin.TabularInline):
 
 
 @admin.register(Class)
-class ClassAdmin(admin.ModelAdmin):
+class ClassAdmin(RulesSearchMixin, admin.ModelAdmin):
     list_display = ("id", "name")
     search_fields = ("name",)
+    search_kind = "classes"
     inlines = [SubclassInline]
 
 
 @admin.register(Subclass)
-class SubclassAdmin(admin.ModelAdmin):
+class SubclassAdmin(RulesSearchMixin, admin.ModelAdmin):
     list_display = ("id", "base_class", "name")
     list_filter = ("base_class",)
     search_fields = ("name", "base_class__name")
+    search_kind = "subclasses"
 
 
 
@@ -71,10 +108,11 @@ class FeatureOptionInline(admin.TabularInline):
 
 
 @admin.register(Feature)
-class FeatureAdmin(admin.ModelAdmin):
+class FeatureAdmin(RulesSearchMixin, admin.ModelAdmin):
     list_display = ("id", "name", "type", "level_required", "related_to")
     list_filter = ("type", "level_required", "base_class", "subclass")
     search_fields = ("name", "description")
+    search_kind = "features"
     inlines = [FeatureOptionInline]
 
     def related_to(self, obj):
@@ -87,7 +125,8 @@ class FeatureAdmin(admin.ModelAdmin):
 
 
 @admin.register(FeatureOption)
-class FeatureOptionAdmin(admin.ModelAdmin):
+class FeatureOptionAdmin(RulesSearchMixin, admin.ModelAdmin):
     list_display = ("id", "feature", "name")
     search_fields = ("name", "feature__name")
+    search_kind = "options"
 
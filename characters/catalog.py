@@ -0,0 +1,193 @@
+"""
+Cache por processo do catálogo de regras.
+
+Origens, linhagens, classes, subclasses, features e opções mudam quase
+nunca, mas aparecem em toda ficha. O catálogo inteiro é carregado uma
+vez, já serializado pelos serializers de characters.serializers, e
+reaproveitado até a CatalogVersion mudar.
+
+Os fragmentos devolvidos são compartilhados: não modifique.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import (
+    CatalogVersion, CatalogChange,
+    Origin, OriginLineage,
+    Class, Subclass,
+    Feature, FeatureOption,
+)
+from .serializers import (
+    OriginSerializer, OriginLineageSerializer,
+    ClassSerializer, SubclassSerializer,
+    FeatureSerializer, FeatureOptionSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+# Acima disso o catálogo não é mantido em memória e as fichas voltam a
+# serializar as regras direto do banco.
+DEFAULT_MAX_ENTRIES = 20000
+
+# De quantos em quantos segundos conferir a versão no banco (escritas
+# feitas no próprio processo invalidam na hora).
+DEFAULT_VERSION_TTL = 2.0
+
+
+# Modelo -> nome da coleção no catálogo (e na API)
+CATALOG_KINDS = {
+    Origin: "origins",
+    OriginLineage: "lineages",
+    Class: "classes",
+    Subclass: "subclasses",
+    Feature: "features",
+    FeatureOption: "options",
+}
+KINDS = tuple(CATALOG_KINDS.values())
+
+
+@dataclass(frozen=True)
+class Catalog:
+    version: int
+    origins: MappingProxyType
+    lineages: MappingProxyType
+    classes: MappingProxyType
+    subclasses: MappingProxyType
+    features: MappingProxyType
+    options: MappingProxyType
+
+    def __len__(self):
+        return sum(len(getattr(self, kind)) for kind in KINDS)
+
+
+_lock = threading.Lock()
+_catalog = None
+_version = None      # versão carregada (o catálogo pode ser None se desligado)
+_checked_at = 0.0
+
+
+def _max_entries():
+    return getattr(settings, "CATALOG_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+
+
+def _version_ttl():
+    return getattr(settings, "CATALOG_VERSION_TTL", DEFAULT_VERSION_TTL)
+
+
+def _by_id(serializer_class, queryset):
+    return MappingProxyType({
+        item["id"]: item
+        for item in serializer_class(queryset, many=True).data
+    })
+
+
+def load(version, max_entries=None):
+    """
+    Lê o catálogo inteiro do banco. Com `max_entries`, devolve None se
+    ele tiver mais entradas que isso.
+    """
+    if max_entries is not None:
+        counts = sum(model.objects.count() for model in CATALOG_KINDS)
+        if counts > max_entries:
+            logger.warning("Catálogo com %s entradas excede o limite do cache.", counts)
+            return None
+
+    origins = Origin.objects.prefetch_related("lineages")
+    classes = Class.objects.prefetch_related("subclasses")
+    features = Feature.objects.select_related("base_class", "subclass").prefetch_related("options")
+
+    return Catalog(
+        version=version,
+        origins=_by_id(OriginSerializer, origins),
+        lineages=_by_id(OriginLineageSerializer, OriginLineage.objects.all()),
+        classes=_by_id(ClassSerializer, classes),
+        subclasses=_by_id(SubclassSerializer, Subclass.objects.all()),
+        features=_by_id(FeatureSerializer, features),
+        options=_by_id(FeatureOptionSerializer, FeatureOption.objects.all()),
+    )
+
+
+def get_catalog(version=None):
+    """
+    Catálogo atual, recarregado se a versão mudou. None quando o cache
+    está desligado por tamanho.
+
+    Quem já leu a versão do banco pode passá-la em `version` para pular
+    o TTL e garantir um catálogo dessa versão.
+    """
+    global _catalog, _version, _checked_at
+
+    now = time.monotonic()
+    if version is None and _version is not None and now - _checked_at < _version_ttl():
+        return _catalog
+    if version is not None and version == _version:
+        return _catalog
+
+    with _lock:
+        if version is None:
+            version = CatalogVersion.current()
+        if version != _version:
+            _catalog = load(version, _max_entries())
+            _version = version
+        _checked_at = now
+        return _catalog
+
+
+def invalidate():
+    """Descarta o catálogo deste processo (chamado após escritas)."""
+    global _catalog, _version, _checked_at
+    with _lock:
+        _catalog = None
+        _version = None
+        _checked_at = 0.0
+
+
+def current_catalog(version):
+    """Catálogo da versão informada, lido do banco se o cache estiver desligado."""
+    return get_catalog(version) or load(version)
+
+
+def changes_since(cached, since, kinds=KINDS):
+    """
+    O que mudou em `kinds` entre a versão `since` e a do catálogo:
+    {kind: {"added": [...], "updated": [...], "deleted": [ids]}}.
+
+    Entradas criadas e removidas dentro do intervalo não aparecem.
+    """
+    history = {}
+    rows = CatalogChange.objects.filter(
+        version__gt=since, version__lte=cached.version, kind__in=kinds
+    ).values_list("kind", "object_id", "action")
+
+    for kind, object_id, action in rows:
+        first, _ = history.get((kind, object_id), (action, action))
+        history[kind, object_id] = (first, action)
+
+    result = {kind: {"added": [], "updated": [], "deleted": []} for kind in kinds}
+    for (kind, object_id), (first, last) in sorted(history.items()):
+        fragment = getattr(cached, kind).get(object_id)
+        created = first == CatalogChange.CREATED
+
+        if last == CatalogChange.DELETED or fragment is None:
+            if not created:
+                result[kind]["deleted"].append(object_id)
+        elif created:
+            result[kind]["added"].append(fragment)
+        else:
+            result[kind]["updated"].append(fragment)
+
+    return result
+
+
+def warm():
+    """Carrega o catálogo no início do processo; falhas de banco só viram log."""
+    try:
+        get_catalog()
+    except DatabaseError:
+        logger.warning("Não foi possível aquecer o catálogo.", exc_info=True)
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:44
+
+from django.db import migrations, models
+
+
+KINDS = {
+    "Origin": "origins",
+    "OriginLineage": "lineages",
+    "Class": "classes",
+    "Subclass": "subclasses",
+    "Feature": "features",
+    "FeatureOption": "options",
+}
+
+
+def seed_changes(apps, schema_editor):
+    # o catálogo que já existia entra no histórico como criado numa nova versão
+    CatalogVersion = apps.get_model("characters", "CatalogVersion")
+    CatalogChange = apps.get_model("characters", "CatalogChange")
+
+    current = CatalogVersion.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+    version = current + 1
+    CatalogVersion.objects.update_or_create(pk=1, defaults={"version": version})
+
+    for model_name, kind in KINDS.items():
+        model = apps.get_model("characters", model_name)
+        CatalogChange.objects.bulk_create(
+            (
+                CatalogChange(version=version, kind=kind, object_id=pk, action="created")
+                for pk in model.objects.values_list("pk", flat=True)
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('characters', '0002_catalogversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(db_index=True)),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Criado'), ('updated', 'Alterado'), ('deleted', 'Removido')], max_length=10)),
+            ],
+            options={
+                'ordering': ['version', 'id'],
+            },
+        ),
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
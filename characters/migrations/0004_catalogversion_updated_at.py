@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('characters', '0003_catalogchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogversion',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# Índice de texto completo das regras (characters.search). Só existe no
+# SQLite: é uma tabela virtual FTS5 com uma linha por entrada do
+# catálogo, rowid = id * SLOTS + código do tipo, mantida por triggers em
+# cada tabela de origem (pegam também update()/bulk_create/SQL direto).
+# Os códigos aqui são os de characters.search.KIND_CODES.
+INDEX = "characters_rules_search"
+SLOTS = 8
+SOURCES = [
+    ("characters_origin", 1),
+    ("characters_originlineage", 2),
+    ("characters_class", 3),
+    ("characters_subclass", 4),
+    ("characters_feature", 5),
+    ("characters_featureoption", 6),
+]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    statements = [
+        # sem acentos e sem caixa ("critico" acha "Crítico"); prefixos de
+        # 2 e 3 letras indexados para a busca por prefixo
+        f"""CREATE VIRTUAL TABLE {INDEX} USING fts5(
+            name, description,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )""",
+    ]
+    for table, code in SOURCES:
+        rowid = f"{{row}}.id * {SLOTS} + {code}"
+        insert = (
+            f"INSERT INTO {INDEX}(rowid, name, description) "
+            f"VALUES ({rowid.format(row='new')}, new.name, new.description);"
+        )
+        delete = f"DELETE FROM {INDEX} WHERE rowid = {rowid.format(row='old')};"
+        statements += [
+            f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF name, description ON {table} "
+            f"BEGIN {delete} {insert} END",
+            f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END",
+            f"INSERT INTO {INDEX}(rowid, name, description) "
+            f"SELECT id * {SLOTS} + {code}, name, description FROM {table}",
+        ]
+
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for table, _ in SOURCES:
+            for event in ("insert", "update", "delete"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+        cursor.execute(f"DROP TABLE IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('characters', '0004_catalogversion_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
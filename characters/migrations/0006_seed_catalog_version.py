@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def seed_version(apps, schema_editor):
+    # linha única da versão do catálogo: CatalogVersion.bump só faz UPDATE
+    CatalogVersion = apps.get_model("characters", "CatalogVersion")
+    CatalogVersion.objects.get_or_create(pk=1, defaults={"version": 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('characters', '0005_rules_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_version, migrations.RunPython.noop),
+    ]
@@ -107,4 +107,67 @@ class FeatureOption(models.Model):
     description = models.TextField()
 
     def __str__(self):
-        return f"{self.feature.name} - {self.name}"
\ No newline at end of file
+        return f"{self.feature.name} - {self.name}"
+
+# ===========================================================
+# VERSÃO DO CATÁLOGO
+# ===========================================================
+
+class CatalogVersion(models.Model):
+    """
+    Linha única com a versão do catálogo de regras (origens, classes,
+    features...). Incrementada a cada escrita; os caches por processo
+    (characters.catalog) comparam com ela para saber se estão velhos.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        """
+        Incrementa a versão num único UPDATE atômico. A linha nasce na
+        migração 0006; se tiver sumido (flush do banco), é recriada com
+        INSERT ... ON CONFLICT DO NOTHING, sem corrida entre escritores.
+        """
+        from django.db.models import F
+        from django.db.models.functions import Now
+
+        rows = cls.objects.filter(pk=1)
+        if not rows.update(version=F("version") + 1, updated_at=Now()):
+            cls.objects.bulk_create([cls(pk=1, version=0)], ignore_conflicts=True)
+            rows.update(version=F("version") + 1, updated_at=Now())
+        return cls.current()
+
+    def __str__(self):
+        return f"Catálogo v{self.version}"
+
+
+class CatalogChange(models.Model):
+    """
+    Histórico de alterações do catálogo, uma linha por entrada alterada
+    em cada versão. Permite responder "o que mudou desde a versão N".
+    """
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+    ACTION_CHOICES = [
+        (CREATED, "Criado"),
+        (UPDATED, "Alterado"),
+        (DELETED, "Removido"),
+    ]
+
+    version = models.PositiveBigIntegerField(db_index=True)
+    kind = models.CharField(max_length=20)  # origins, lineages, classes...
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+
+    class Meta:
+        ordering = ["version", "id"]
+
+    def __str__(self):
+        return f"v{self.version} {self.kind}#{self.object_id} {self.action}"
@@ -0,0 +1,123 @@
+"""
+Busca de texto completo nas regras.
+
+Nomes e descrições de origens, linhagens, classes, subclasses, features
+e opções ficam numa tabela virtual FTS5 (characters_rules_search, criada
+na migração 0005) que triggers no banco mantêm em dia a cada escrita.
+Cada palavra da busca vira um prefixo ("seg fol" acha "Segundo Fôlego"),
+todas precisam aparecer e o resultado sai ordenado por bm25, com o nome
+pesando mais que a descrição.
+
+Fora do SQLite não há índice: a busca cai num icontains sem ranking.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .catalog import CATALOG_KINDS, KINDS
+
+INDEX = "characters_rules_search"
+
+# rowid no índice = id * SLOTS + código do tipo (ver a migração 0005)
+SLOTS = 8
+KIND_CODES = {
+    "origins": 1,
+    "lineages": 2,
+    "classes": 3,
+    "subclasses": 4,
+    "features": 5,
+    "options": 6,
+}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+MODELS = {kind: model for model, kind in CATALOG_KINDS.items()}
+
+# peso do nome e da descrição no bm25
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MAX_TERMS = 10
+
+# marcadores do trecho destacado
+HIGHLIGHT = ("<mark>", "</mark>")
+SNIPPET_TOKENS = 16
+
+
+def available():
+    return connection.vendor == "sqlite"
+
+
+def terms(text):
+    return re.findall(r"\w+", text)[:MAX_TERMS]
+
+
+def match_expression(text):
+    """
+    Consulta FTS5 com cada palavra como prefixo entre aspas (nada do que
+    o usuário digita vira operador). None se não sobrar palavra nenhuma.
+    """
+    words = terms(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search(text, kinds=KINDS, limit=DEFAULT_LIMIT):
+    """[{kind, id, name, snippet, rank}] das entradas que casam com `text`."""
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    if not available():
+        return _search_without_index(text, kinds, limit)
+
+    codes = ", ".join(str(KIND_CODES[kind]) for kind in kinds)
+    sql = f"""
+        SELECT rowid, name,
+               snippet({INDEX}, 1, %s, %s, '…', {SNIPPET_TOKENS}),
+               bm25({INDEX}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score
+        FROM {INDEX}
+        WHERE {INDEX} MATCH %s AND rowid %% {SLOTS} IN ({codes})
+        ORDER BY score
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*HIGHLIGHT, expression, limit])
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "kind": KIND_NAMES[rowid % SLOTS],
+            "id": rowid // SLOTS,
+            "name": name,
+            "snippet": snippet,
+            # bm25 é negativo (menor = melhor); a API mostra positivo
+            "rank": round(-score, 4),
+        }
+        for rowid, name, snippet, score in rows
+    ]
+
+
+def matching_ids(kind, text):
+    """Ids de `kind` que casam com `text` (para filtrar um queryset)."""
+    expression = match_expression(text)
+    if expression is None:
+        return []
+
+    sql = f"SELECT rowid / {SLOTS} FROM {INDEX} WHERE {INDEX} MATCH %s AND rowid %% {SLOTS} = %s"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [expression, KIND_CODES[kind]])
+        return [pk for pk, in cursor.fetchall()]
+
+
+def _search_without_index(text, kinds, limit):
+    condition = Q()
+    for word in terms(text):
+        condition &= Q(name__icontains=word) | Q(description__icontains=word)
+
+    results = []
+    for kind in kinds:
+        for pk, name in MODELS[kind].objects.filter(condition).values_list("pk", "name")[:limit]:
+            results.append({"kind": kind, "id": pk, "name": name, "snippet": "", "rank": 0})
+    return results[:limit]
@@ -1,3 +1,5 @@
+from collections import ChainMap
+
 from rest_framework import serializers
 from .models import (
     CharacterBase,
@@ -78,3 +80,78 @@ class FeatureSerializer(serializers.ModelSerializer):
         if obj.type == Feature.SUBCLASS:
             return {"subclass": obj.subclass.name}
         return None
+
+
+
+# CATÁLOGO EM CACHE
+
+
+class CatalogField(serializers.Field):
+    """
+    Campo somente leitura que devolve o fragmento já serializado do
+    catálogo em memória (characters.catalog) para uma FK ou M2M de regras.
+
+    Se o cache estiver desligado, serializa o objeto com `serializer_class`.
+    """
+
+    def __init__(self, kind, serializer_class, many=False, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.kind = kind
+        self.serializer_class = serializer_class
+        self.many = many
+
+    def get_attribute(self, instance):
+        return instance
+
+    def to_representation(self, instance):
+        from .catalog import get_catalog
+
+        # quem já leu a versão do banco (ETag da ficha) passa no contexto
+        catalog = get_catalog(self.context.get("catalog_version"))
+        if catalog is None:
+            value = getattr(instance, self.source)
+            if self.many:
+                value = value.all()
+            elif value is None:
+                return None
+            return self.serializer_class(value, many=self.many).data
+
+        if self.many:
+            pks = [obj.pk for obj in getattr(instance, self.source).all()]
+        else:
+            pk = getattr(instance, f"{self.source}_id")
+            if pk is None:
+                return None
+            pks = [pk]
+
+        fragments = self._fragments(catalog, pks)
+        if self.many:
+            return [fragments[pk] for pk in pks]
+        return fragments[pks[0]]
+
+    def _fragments(self, catalog, pks):
+        """
+        Fragmentos do catálogo com todos os `pks`. Uma entrada criada por
+        outro processo ainda dentro do CATALOG_VERSION_TTL não está no
+        cache: relê o catálogo na versão do banco e, se ainda faltar
+        (cache desligado, versão não incrementada), serializa do banco.
+        """
+        from .catalog import get_catalog
+        from .models import CatalogVersion
+
+        fragments = getattr(catalog, self.kind)
+        if all(pk in fragments for pk in pks):
+            return fragments
+
+        catalog = get_catalog(CatalogVersion.current())
+        fragments = getattr(catalog, self.kind) if catalog is not None else {}
+        missing = [pk for pk in pks if pk not in fragments]
+        if not missing:
+            return fragments
+
+        rows = self.serializer_class.Meta.model.objects.filter(pk__in=missing)
+        return ChainMap(
+            {item["id"]: item for item in self.serializer_class(rows, many=True).data},
+            fragments,
+        )
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import catalog
+from .models import (
+    CatalogVersion, CatalogChange,
+    Origin, OriginLineage,
+    Class, Subclass,
+    Feature, FeatureOption,
+)
+
+
+def _dependents(instance):
+    """
+    Entradas cujo fragmento serializado inclui `instance` e portanto
+    também mudam: a origem de uma linhagem, a classe de uma subclasse,
+    a feature de uma opção e as features que citam a classe/subclasse.
+    """
+    if isinstance(instance, OriginLineage):
+        return [("origins", instance.origin_id)]
+    if isinstance(instance, Subclass):
+        return [("classes", instance.base_class_id)] + [
+            ("features", pk)
+            for pk in Feature.objects.filter(subclass_id=instance.pk).values_list("pk", flat=True)
+        ]
+    if isinstance(instance, Class):
+        return [
+            ("features", pk)
+            for pk in Feature.objects.filter(base_class_id=instance.pk).values_list("pk", flat=True)
+        ]
+    if isinstance(instance, FeatureOption):
+        return [("features", instance.feature_id)]
+    return []
+
+
+def _record(instance, action):
+    version = CatalogVersion.bump()
+
+    changes = [CatalogChange(
+        version=version,
+        kind=catalog.CATALOG_KINDS[type(instance)],
+        object_id=instance.pk,
+        action=action,
+    )]
+    changes += [
+        CatalogChange(version=version, kind=kind, object_id=pk, action=CatalogChange.UPDATED)
+        for kind, pk in _dependents(instance)
+        if pk is not None
+    ]
+    CatalogChange.objects.bulk_create(changes)
+
+    catalog.invalidate()
+    transaction.on_commit(catalog.invalidate)
+
+
+def record_catalog_save(sender, instance, created, raw=False, **kwargs):
+    # qualquer escrita no catálogo (admin, shell, fixtures) gera nova versão
+    if not raw:
+        _record(instance, CatalogChange.CREATED if created else CatalogChange.UPDATED)
+
+
+def record_catalog_delete(sender, instance, **kwargs):
+    _record(instance, CatalogChange.DELETED)
+
+
+for model in (Origin, OriginLineage, Class, Subclass, Feature, FeatureOption):
+    post_save.connect(record_catalog_save, sender=model, dispatch_uid=f"catalog-save-{model.__name__}")
+    post_delete.connect(record_catalog_delete, sender=model, dispatch_uid=f"catalog-delete-{model.__name__}")
@@ -1,3 +1,294 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from . import catalog, search
+from .models import (
+    CatalogVersion,
+    Origin, OriginLineage,
+    Class, Subclass,
+    Feature, FeatureOption,
+)
+from .serializers import OriginSerializer, FeatureSerializer
+
+User = get_user_model()
+
+
+@override_settings(CATALOG_VERSION_TTL=3600)
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+
+        self.origin = Origin.objects.create(name="Humano", description="")
+        OriginLineage.objects.create(origin=self.origin, name="Nortista", description="")
+
+        self.char_class = Class.objects.create(name="Guerreiro", description="")
+        self.subclass = Subclass.objects.create(
+            base_class=self.char_class, name="Campeão", description=""
+        )
+        self.feature = Feature.objects.create(
+            type=Feature.SUBCLASS, subclass=self.subclass,
+            name="Crítico Aprimorado", description=""
+        )
+        FeatureOption.objects.create(feature=self.feature, name="Lâmina", description="")
+
+    def test_fragments_match_serializers(self):
+        cached = catalog.get_catalog()
+
+        self.assertEqual(cached.origins[self.origin.pk], OriginSerializer(self.origin).data)
+        self.assertEqual(cached.features[self.feature.pk], FeatureSerializer(self.feature).data)
+        self.assertEqual(len(cached), 6)
+
+    def test_loaded_once_per_version(self):
+        first = catalog.get_catalog()
+
+        with self.assertNumQueries(0):
+            self.assertIs(catalog.get_catalog(), first)
+
+    def test_writes_bump_version_and_invalidate(self):
+        version = catalog.get_catalog().version
+
+        self.origin.name = "Humana"
+        self.origin.save()
+
+        cached = catalog.get_catalog()
+        self.assertGreater(cached.version, version)
+        self.assertEqual(cached.version, CatalogVersion.current())
+        self.assertEqual(cached.origins[self.origin.pk]["name"], "Humana")
+
+    def test_version_change_from_other_process_is_seen_after_ttl(self):
+        first = catalog.get_catalog()
+        CatalogVersion.bump()
+
+        with override_settings(CATALOG_VERSION_TTL=0):
+            self.assertIsNot(catalog.get_catalog(), first)
+
+    def test_entries_written_by_another_process_are_never_missing(self):
+        from .serializers import CatalogField
+
+        class Sheet:
+            def __init__(self, features):
+                self.chosen_features = Feature.objects.filter(pk__in=[f.pk for f in features])
+
+        field = CatalogField("features", FeatureSerializer, many=True)
+        field.bind("chosen_features", serializers.Serializer())
+        catalog.get_catalog()
+
+        # outro processo cria a feature e incrementa a versão; aqui o
+        # cache continua velho até o TTL
+        feature, = Feature.objects.bulk_create([Feature(
+            type=Feature.SUBCLASS, subclass=self.subclass, name="Atleta Notável", description=""
+        )])
+        CatalogVersion.bump()
+        data = field.to_representation(Sheet([self.feature, feature]))
+        self.assertEqual([f["name"] for f in data], ["Crítico Aprimorado", "Atleta Notável"])
+        self.assertEqual(catalog.get_catalog().version, CatalogVersion.current())
+
+        # sem incrementar a versão: serializa a linha que falta do banco
+        late, = Feature.objects.bulk_create([Feature(
+            type=Feature.SUBCLASS, subclass=self.subclass, name="Sobrevivente", description=""
+        )])
+        data = field.to_representation(Sheet([late]))
+        self.assertEqual(data, [FeatureSerializer(late).data])
+
+    @override_settings(CATALOG_CACHE_MAX_ENTRIES=3)
+    def test_disabled_above_size_limit(self):
+        self.assertIsNone(catalog.get_catalog())
+
+
+class CatalogVersionTests(TestCase):
+    def test_bump_is_a_single_update_on_the_seeded_row(self):
+        version = CatalogVersion.current()
+        with self.assertNumQueries(2):  # UPDATE + leitura da versão
+            self.assertEqual(CatalogVersion.bump(), version + 1)
+
+    def test_recreating_the_row_never_collides_with_another_writer(self):
+        CatalogVersion.objects.all().delete()
+        create = CatalogVersion.objects.bulk_create
+
+        def other_writer_first(*args, **kwargs):
+            # outro processo cria a linha entre o UPDATE vazio e o INSERT
+            create([CatalogVersion(pk=1, version=5)])
+            return create(*args, **kwargs)
+
+        with mock.patch.object(CatalogVersion.objects, "bulk_create", side_effect=other_writer_first):
+            self.assertEqual(CatalogVersion.bump(), 6)
+        self.assertEqual(CatalogVersion.objects.count(), 1)
+
+
+@override_settings(CATALOG_VERSION_TTL=3600)
+class CatalogAPITests(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("jogador"))
+
+        self.origin = Origin.objects.create(name="Humano", description="")
+        self.lineage = OriginLineage.objects.create(origin=self.origin, name="Nortista", description="")
+        self.char_class = Class.objects.create(name="Guerreiro", description="")
+        self.feature = Feature.objects.create(
+            type=Feature.CLASS, base_class=self.char_class, name="Segundo Fôlego", description=""
+        )
+
+    def test_full_catalog_and_304(self):
+        response = self.client.get("/api/catalog/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["version"], CatalogVersion.current())
+        self.assertEqual([o["name"] for o in response.data["origins"]], ["Humano"])
+        etag = response["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/catalog/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.origin.name = "Humana"
+        self.origin.save()
+
+        response = self.client.get("/api/catalog/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_kind_and_entry(self):
+        response = self.client.get("/api/catalog/classes/")
+        self.assertEqual(set(response.data) - {"version"}, {"classes"})
+
+        response = self.client.get(f"/api/catalog/features/{self.feature.pk}/")
+        self.assertEqual(response.data["related"], {"class": "Guerreiro"})
+
+        self.assertEqual(self.client.get("/api/catalog/spells/").status_code, 404)
+        self.assertEqual(self.client.get("/api/catalog/features/9999/").status_code, 404)
+
+    def test_changes_since(self):
+        since = CatalogVersion.current()
+
+        new_class = Class.objects.create(name="Mago", description="")
+        self.char_class.name = "Lutador"
+        self.char_class.save()
+        lineage_pk = self.lineage.pk
+        self.lineage.delete()
+        temp = Origin.objects.create(name="Temporária", description="")
+        temp.delete()
+
+        response = self.client.get("/api/catalog/", {"since": since})
+        data = response.data
+
+        self.assertEqual(data["since"], since)
+        self.assertEqual([c["id"] for c in data["classes"]["added"]], [new_class.pk])
+        self.assertEqual([c["name"] for c in data["classes"]["updated"]], ["Lutador"])
+        # o nome da classe aparece no "related" da feature
+        self.assertEqual(data["features"]["updated"][0]["related"], {"class": "Lutador"})
+        self.assertEqual(data["lineages"]["deleted"], [lineage_pk])
+        self.assertEqual(data["origins"]["updated"][0]["lineages"], [])
+        self.assertEqual(data["origins"]["deleted"], [])
+        self.assertEqual(data["origins"]["added"], [])
+
+        response = self.client.get("/api/catalog/", {"since": data["version"]})
+        self.assertEqual(response.data["classes"], {"added": [], "updated": [], "deleted": []})
+
+    def test_invalid_since(self):
+        response = self.client.get("/api/catalog/", {"since": "ontem"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class RulesSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("jogador"))
+
+        self.fighter = Class.objects.create(
+            name="Guerreiro", description="Mestre de armas e armaduras."
+        )
+        self.champion = Subclass.objects.create(
+            base_class=self.fighter, name="Campeão", description="Golpes críticos mais frequentes."
+        )
+        self.second_wind = Feature.objects.create(
+            type=Feature.CLASS, base_class=self.fighter, name="Segundo Fôlego",
+            description="Recupera pontos de vida com uma ação bônus.",
+        )
+        self.critical = Feature.objects.create(
+            type=Feature.SUBCLASS, subclass=self.champion, name="Crítico Aprimorado",
+            description="Ataques com arma conseguem um acerto crítico com 19 ou 20.",
+        )
+        self.option = FeatureOption.objects.create(
+            feature=self.critical, name="Lâmina", description="Só com armas cortantes."
+        )
+
+    def found(self, query, **params):
+        response = self.client.get("/api/catalog/search/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(r["kind"], r["id"]) for r in response.data["results"]]
+
+    def test_prefix_accents_and_ranking(self):
+        self.assertEqual(self.found("seg fol"), [("features", self.second_wind.pk)])
+        # sem acento e em qualquer caixa; o nome pesa mais que a descrição
+        self.assertEqual(self.found("CRITICO")[0], ("features", self.critical.pk))
+        self.assertEqual(
+            set(self.found("critico")),
+            {("features", self.critical.pk), ("subclasses", self.champion.pk)},
+        )
+        self.assertEqual(
+            set(self.found("arma", kinds="classes,options")),
+            {("classes", self.fighter.pk), ("options", self.option.pk)},
+        )
+
+        result = self.client.get("/api/catalog/search/", {"q": "acao bonus"}).data["results"][0]
+        self.assertIn("<mark>ação</mark> <mark>bônus</mark>", result["snippet"])
+        self.assertGreater(result["rank"], 0)
+
+    def test_user_input_is_never_an_operator(self):
+        for query in ['"seg', "seg* fol-", "(seg) ^fol:", "seg + fôl'"]:
+            self.assertEqual(self.found(query), [("features", self.second_wind.pk)], query)
+
+        self.assertEqual(self.client.get("/api/catalog/search/", {"q": " !? "}).status_code, 400)
+        self.assertEqual(
+            self.client.get("/api/catalog/search/", {"q": "seg", "kinds": "spells"}).status_code, 400
+        )
+
+    def test_index_follows_every_kind_of_write(self):
+        self.second_wind.name = "Fôlego Renovado"
+        self.second_wind.save()
+        self.assertEqual(self.found("segundo"), [])
+        self.assertEqual(self.found("renovado"), [("features", self.second_wind.pk)])
+
+        # sem sinais: update() e bulk_create também passam pelos triggers
+        Feature.objects.filter(pk=self.second_wind.pk).update(description="Cura rápida.")
+        self.assertEqual(self.found("rapida"), [("features", self.second_wind.pk)])
+        Origin.objects.bulk_create([Origin(name="Anão", description="Resistente a venenos.")])
+        self.assertEqual([kind for kind, _ in self.found("veneno")], ["origins"])
+
+        # apagar a classe leva subclasse, features e opção junto (cascade)
+        self.fighter.delete()
+        self.assertEqual(self.found("critico lamina guerreiro arma"), [])
+        self.assertEqual(self.found("arma"), [])
+
+    def test_admin_search_uses_the_index(self):
+        admin = User.objects.create_superuser("admin", password="x")
+        client = APIClient()
+        client.force_login(admin)
+
+        response = client.get("/admin/characters/feature/", {"q": "aprim"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cl"].queryset), [self.critical])
+
+        response = client.get("/admin/characters/featureoption/", {"q": "cortante"})
+        self.assertEqual(list(response.context["cl"].queryset), [self.option])
+
+        # o nome do pai (feature__name, base_class__name) continua achando
+        response = client.get("/admin/characters/featureoption/", {"q": "Crítico"})
+        self.assertEqual(list(response.context["cl"].queryset), [self.option])
+        response = client.get("/admin/characters/subclass/", {"q": "guerreiro"})
+        self.assertEqual(list(response.context["cl"].queryset), [self.champion])
+
+        # sem o índice: a busca normal, só nos search_fields de antes
+        with mock.patch.object(search, "available", return_value=False):
+            response = client.get("/admin/characters/subclass/", {"q": "Guerreiro"})
+            self.assertEqual(list(response.context["cl"].queryset), [self.champion])
+            response = client.get("/admin/characters/subclass/", {"q": "frequentes"})
+            self.assertEqual(list(response.context["cl"].queryset), [])
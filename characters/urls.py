@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import CatalogView, RulesSearchView
+
+urlpatterns = [
+    path("", CatalogView.as_view(), name="catalog"),
+    path("search/", RulesSearchView.as_view(), name="catalog-search"),
+    path("<str:kind>/", CatalogView.as_view(), name="catalog-kind"),
+    path("<str:kind>/<int:pk>/", CatalogView.as_view(), name="catalog-entry"),
+]
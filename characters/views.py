@@ -1,3 +1,111 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from . import search
+from .catalog import KINDS, changes_since, current_catalog
+from .models import CatalogVersion
+
+
+class CatalogView(APIView):
+    """
+    Catálogo de regras, somente leitura.
+
+    GET /api/catalog/                  todas as coleções
+    GET /api/catalog/<kind>/           uma coleção (origins, classes, ...)
+    GET /api/catalog/<kind>/<id>/      uma entrada
+    ?since=N                           só o que mudou depois da versão N
+
+    As respostas têm ETag forte ligado à versão do catálogo; com
+    If-None-Match igual, a resposta é 304 depois de uma única consulta.
+    """
+
+    def get(self, request, kind=None, pk=None):
+        if kind is not None and kind not in KINDS:
+            raise NotFound("Coleção de catálogo inexistente.")
+        kinds = KINDS if kind is None else (kind,)
+
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                raise ValidationError({"since": "Informe um número de versão."})
+            if since < 0:
+                raise ValidationError({"since": "Informe um número de versão."})
+
+        version = CatalogVersion.current()
+        etag = self._etag(version, kind, pk, since)
+        if self._matches(request, etag):
+            return self._with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        cached = current_catalog(version)
+
+        if pk is not None:
+            fragment = getattr(cached, kind).get(pk)
+            if fragment is None:
+                raise NotFound()
+            return self._with_etag(Response(fragment), etag)
+
+        data = {"version": cached.version}
+        if since is None:
+            data.update({k: list(getattr(cached, k).values()) for k in kinds})
+        else:
+            data["since"] = since
+            data.update(changes_since(cached, since, kinds))
+
+        return self._with_etag(Response(data), etag)
+
+    def _etag(self, version, kind, pk, since):
+        parts = ["catalog", kind or "all"]
+        if pk is not None:
+            parts.append(str(pk))
+        parts.append(f"v{version}")
+        if since is not None:
+            parts.append(f"since{since}")
+        return '"' + "-".join(parts) + '"'
+
+    def _matches(self, request, etag):
+        header = request.headers.get("If-None-Match")
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(",")]
+        return "*" in tags or etag in tags
+
+    def _with_etag(self, response, etag):
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class RulesSearchView(APIView):
+    """
+    Busca nas regras, ordenada por relevância.
+
+    GET /api/catalog/search/?q=seg fol     cada palavra vale como prefixo
+    &kinds=features,options                 só essas coleções
+    &limit=N                                até search.MAX_LIMIT resultados
+    """
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not search.terms(query):
+            raise ValidationError({"q": "Informe o que buscar."})
+
+        kinds = request.query_params.get("kinds")
+        if kinds:
+            kinds = [kind.strip() for kind in kinds.split(",") if kind.strip()]
+            unknown = set(kinds) - set(KINDS)
+            if unknown:
+                raise ValidationError({"kinds": f"Coleções inexistentes: {', '.join(sorted(unknown))}."})
+        else:
+            kinds = KINDS
+
+        try:
+            limit = int(request.query_params.get("limit", search.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Informe um número."})
+        limit = min(max(limit, 1), search.MAX_LIMIT)
+
+        return Response({"query": query, "results": search.search(query, kinds, limit)})
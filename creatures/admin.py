@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import Creature
 
-# Register your models here.
+
+@admin.register(Creature)
+class CreatureAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "type", "size", "challenge", "xp", "armor_class", "hit_points")
+    search_fields = ("name",)
+    list_filter = ("type", "size", "challenge")
+    ordering = ("search_name",)
+    readonly_fields = ("xp", "proficiency_bonus")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CreaturesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'creatures'
+
+    def ready(self):
+        import creatures.signals
@@ -0,0 +1,316 @@
+"""
+Montagem de encontros por orçamento de XP.
+
+O orçamento vem dos limiares de XP por nível de cada personagem (fácil,
+médio, difícil, mortal) e o XP de um encontro é ajustado pelo
+multiplicador da quantidade de monstros, como no Guia do Mestre.
+
+A busca não olha criatura por criatura: o bestiário compacto
+(creatures.statblocks) é agrupado uma vez numa tabela de custos
+{xp: linhas}, com poucas dezenas de valores distintos de XP seja qual
+for o tamanho do bestiário. Um knapsack de múltipla escolha sobre esses
+valores (quantos monstros de cada XP, até `max_kinds` tipos e
+`max_monsters` monstros) marca, em bitsets, as somas de XP alcançáveis;
+as mais próximas do alvo são reconstruídas camada a camada e viram
+encontros com criaturas sorteadas da tabela de custos.
+"""
+import math
+import random
+import threading
+from collections import OrderedDict, defaultdict
+
+from campaigns import dice
+
+EASY, MEDIUM, HARD, DEADLY = "easy", "medium", "hard", "deadly"
+DIFFICULTIES = [
+    (EASY, "Fácil"),
+    (MEDIUM, "Médio"),
+    (HARD, "Difícil"),
+    (DEADLY, "Mortal"),
+]
+
+# nível -> (fácil, médio, difícil, mortal)
+XP_THRESHOLDS = {
+    1: (25, 50, 75, 100),
+    2: (50, 100, 150, 200),
+    3: (75, 150, 225, 400),
+    4: (125, 250, 375, 500),
+    5: (250, 500, 750, 1100),
+    6: (300, 600, 900, 1400),
+    7: (350, 750, 1100, 1700),
+    8: (450, 900, 1400, 2100),
+    9: (550, 1100, 1600, 2400),
+    10: (600, 1200, 1900, 2800),
+    11: (800, 1600, 2400, 3600),
+    12: (1000, 2000, 3000, 4500),
+    13: (1100, 2200, 3400, 5100),
+    14: (1250, 2500, 3800, 5700),
+    15: (1400, 2800, 4300, 6400),
+    16: (1600, 3200, 4800, 7200),
+    17: (2000, 3900, 5900, 8800),
+    18: (2100, 4200, 6300, 9500),
+    19: (2400, 4900, 7300, 10900),
+    20: (2800, 5700, 8500, 12700),
+}
+
+# (monstros a partir de, multiplicador); grupos pequenos/grandes andam um passo
+MULTIPLIERS = [(1, 1), (2, 1.5), (3, 2), (7, 2.5), (11, 3), (15, 4)]
+SMALL_PARTY_STEP = 5
+LARGE_PARTY_STEP = 0.5
+
+# faixa acima do limiar de mortal que ainda conta como mortal
+DEADLY_CEILING = 1.5
+
+DEFAULT_RESULTS = 5
+MAX_RESULTS = 50
+DEFAULT_MAX_MONSTERS = 8
+MAX_MONSTERS = 20
+DEFAULT_MAX_KINDS = 3
+MAX_KINDS = 4
+
+
+def party_thresholds(levels):
+    """Limiares somados do grupo: {dificuldade: xp}."""
+    totals = [0, 0, 0, 0]
+    for level in levels:
+        for i, xp in enumerate(XP_THRESHOLDS[min(max(level, 1), 20)]):
+            totals[i] += xp
+    return dict(zip((EASY, MEDIUM, HARD, DEADLY), totals))
+
+
+def multiplier_table(party_size, max_monsters):
+    """multiplicadores[n] para n = 0..max_monsters, já ajustados ao grupo."""
+    steps = [m for _, m in MULTIPLIERS]
+    shift = 0
+    if party_size < 3:
+        steps.append(SMALL_PARTY_STEP)
+        shift = 1
+    elif party_size >= 6:
+        steps.insert(0, LARGE_PARTY_STEP)
+
+    table = [0]
+    for monsters in range(1, max_monsters + 1):
+        step = sum(1 for start, _ in MULTIPLIERS if monsters >= start) - 1
+        table.append(steps[step + shift])
+    return table
+
+
+def budget(thresholds, difficulty):
+    """Faixa [mínimo, máximo] de XP ajustado da dificuldade e o alvo (meio da faixa)."""
+    order = [EASY, MEDIUM, HARD, DEADLY]
+    i = order.index(difficulty)
+    low = thresholds[difficulty]
+    high = thresholds[order[i + 1]] - 1 if i + 1 < len(order) else int(low * DEADLY_CEILING)
+    return low, high, (low + high) / 2
+
+
+def classify(adjusted, thresholds):
+    """Dificuldade de um XP ajustado (None: abaixo de fácil)."""
+    result = None
+    for difficulty in (EASY, MEDIUM, HARD, DEADLY):
+        if adjusted >= thresholds[difficulty]:
+            result = difficulty
+    return result
+
+
+# ===========================================================
+# TABELA DE CUSTOS
+# ===========================================================
+
+class CostTable:
+    """Linhas do bestiário compacto agrupadas por XP (só as que passam nos filtros)."""
+
+    def __init__(self, table, types=None, challenge_min=None, challenge_max=None):
+        self.table = table
+        rows = defaultdict(list)
+        xp = table.columns["xp"]
+        for index in table.select(types, challenge_min, challenge_max):
+            if xp[index]:
+                rows[xp[index]].append(index)
+        self.rows = dict(sorted(rows.items()))
+
+    @property
+    def values(self):
+        return list(self.rows)
+
+
+# tabelas filtradas guardadas por versão do bestiário (as menos usadas saem)
+COST_TABLE_CACHE_SIZE = 32
+
+_lock = threading.Lock()
+_cost_tables = OrderedDict()
+_cost_tables_for = None
+
+
+def cost_table(table, types=None, challenge_min=None, challenge_max=None):
+    """CostTable reaproveitada enquanto a tabela do bestiário for a mesma (LRU)."""
+    global _cost_tables_for
+
+    key = (frozenset(types) if types else None, challenge_min, challenge_max)
+    with _lock:
+        if _cost_tables_for is not table:
+            _cost_tables.clear()
+            _cost_tables_for = table
+        if key in _cost_tables:
+            _cost_tables.move_to_end(key)
+        else:
+            _cost_tables[key] = CostTable(table, types, challenge_min, challenge_max)
+            if len(_cost_tables) > COST_TABLE_CACHE_SIZE:
+                _cost_tables.popitem(last=False)
+        return _cost_tables[key]
+
+
+# ===========================================================
+# BUSCA
+# ===========================================================
+
+def reachability(values, limits, max_kinds):
+    """
+    Knapsack de múltipla escolha sobre os valores de XP (já divididos pela
+    unidade comum), com bitsets em inteiros do Python.
+
+    layers[i][k][m] tem o bit `raw` ligado se dá para somar `raw` com
+    exatamente `k` valores distintos de values[i:] e `m` monstros. Somas
+    acima de limits[m] (o teto do orçamento para m monstros) são cortadas.
+    """
+    max_monsters = len(limits) - 1
+    masks = [(1 << (limit + 1)) - 1 for limit in limits]
+
+    empty = [[0] * (max_monsters + 1) for _ in range(max_kinds + 1)]
+    empty[0][0] = 1
+    layers = [empty]
+    for value in reversed(values):
+        following = layers[-1]
+        current = [row[:] for row in following]
+        for kinds in range(1, max_kinds + 1):
+            for monsters in range(1, max_monsters + 1):
+                reach = current[kinds][monsters]
+                for count in range(1, monsters + 1):
+                    before = following[kinds - 1][monsters - count]
+                    if before:
+                        reach |= before << (value * count)
+                current[kinds][monsters] = reach & masks[monsters]
+        layers.append(current)
+    layers.reverse()
+    return layers
+
+
+def _shapes(layers, values, i, kinds, monsters, raw):
+    """Composições ((índice do valor, quantidade), ...) que chegam exatamente ao estado."""
+    if i == len(values):
+        if kinds == monsters == raw == 0:
+            yield ()
+        return
+
+    following = layers[i + 1]
+    if kinds:
+        for count in range(monsters, 0, -1):
+            rest = raw - values[i] * count
+            if rest >= 0 and following[kinds - 1][monsters - count] >> rest & 1:
+                for shape in _shapes(layers, values, i + 1, kinds - 1, monsters - count, rest):
+                    yield ((i, count),) + shape
+    if following[kinds][monsters] >> raw & 1:
+        yield from _shapes(layers, values, i + 1, kinds, monsters, raw)
+
+
+def _nearest_bits(reach, low, high, target, n):
+    """Até `n` bits ligados de cada lado de `target`, dentro de [low, high]."""
+    if high < low:
+        return []
+    bits = bin(reach)[:1:-1]  # bits[i] == "1" se o bit i está ligado
+    found = []
+    position = min(max(int(target), low), high)
+    right = position
+    for _ in range(n):
+        right = bits.find("1", right, high + 1)
+        if right < 0:
+            break
+        found.append(right)
+        right += 1
+    left = position
+    for _ in range(n):
+        left = bits.rfind("1", low, left)
+        if left < 0:
+            break
+        found.append(left)
+    return found
+
+
+def build(table, levels, difficulty=MEDIUM, results=DEFAULT_RESULTS,
+          max_monsters=DEFAULT_MAX_MONSTERS, max_kinds=DEFAULT_MAX_KINDS,
+          types=None, challenge_min=None, challenge_max=None, seed=None):
+    """
+    Os `results` encontros mais próximos do alvo da dificuldade para um
+    grupo com os níveis `levels`, com criaturas do bestiário compacto.
+    """
+    if not levels:
+        raise ValueError("O grupo precisa de pelo menos um personagem.")
+    seed = dice.new_seed() if seed is None else seed
+
+    thresholds = party_thresholds(levels)
+    low, high, target = budget(thresholds, difficulty)
+    multipliers = multiplier_table(len(levels), max_monsters)
+    costs = cost_table(table, types, challenge_min, challenge_max)
+
+    # XP em unidades do maior divisor comum (5 no bestiário padrão): bitsets menores
+    unit = math.gcd(*costs.values) if costs.values else 1
+    values = [value // unit for value in costs.values]
+    limits = [0] + [int(high / (multipliers[m] * unit)) for m in range(1, max_monsters + 1)]
+    layers = reachability(values, limits, max_kinds)
+
+    candidates = []
+    for monsters in range(1, max_monsters + 1):
+        scale = multipliers[monsters] * unit
+        reach = 0
+        for kinds in range(1, max_kinds + 1):
+            reach |= layers[0][kinds][monsters]
+        for raw in _nearest_bits(reach, math.ceil(low / scale), limits[monsters], target / scale, results):
+            candidates.append((abs(raw * scale - target), monsters, raw))
+    candidates.sort()
+
+    rng = random.Random(seed)
+    encounters = []
+    for _, monsters, raw in candidates:
+        for kinds in range(1, max_kinds + 1):
+            if not layers[0][kinds][monsters] >> raw & 1:
+                continue
+            for shape in _shapes(layers, values, 0, kinds, monsters, raw):
+                if len(encounters) == results:
+                    break
+                encounters.append(_encounter(
+                    costs, [(costs.values[i], count) for i, count in shape],
+                    monsters, raw * unit, multipliers, thresholds, rng,
+                ))
+        if len(encounters) == results:
+            break
+
+    return {
+        "seed": seed,
+        "difficulty": difficulty,
+        "thresholds": thresholds,
+        "budget": {"min": low, "max": high, "target": target},
+        "encounters": encounters,
+    }
+
+
+def _encounter(costs, shape, monsters, raw, multipliers, thresholds, rng):
+    table = costs.table
+    creatures = []
+    for xp, count in shape:
+        block = table.row(rng.choice(costs.rows[xp]))
+        creatures.append({
+            "id": block.id,
+            "name": block.name,
+            "type": block.type,
+            "challenge": block.challenge,
+            "xp": xp,
+            "count": count,
+        })
+    adjusted = raw * multipliers[monsters]
+    return {
+        "creatures": creatures,
+        "monsters": monsters,
+        "xp": raw,
+        "adjusted_xp": adjusted,
+        "difficulty": classify(adjusted, thresholds),
+    }
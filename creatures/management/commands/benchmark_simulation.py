@@ -0,0 +1,58 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from creatures import simulation
+
+
+def synthetic_encounter(party_size, enemy_count):
+    """Grupo de nível 5 contra um bando de goblins, sem tocar no banco."""
+    damage, critical = simulation.damage_tables("1d8+3")
+    party = [
+        simulation.Combatant(i, f"Aventureiro {i}", 40, 16, 6, 2, 2, damage, critical)
+        for i in range(1, party_size + 1)
+    ]
+    damage, critical = simulation.damage_tables("1d6+2")
+    enemies = [
+        simulation.Combatant(None, f"Goblin {i}", 7, 15, 4, 1, 2, damage, critical)
+        for i in range(1, enemy_count + 1)
+    ]
+    return party, enemies
+
+
+class Command(BaseCommand):
+    help = (
+        "Roda a mesma simulação de encontro com diferentes números de "
+        "workers e mostra a aceleração (e se o resultado foi idêntico)."
+    )
+
+    def add_arguments(self, parser):
+        cpus = os.cpu_count() or 1
+        parser.add_argument("--fights", type=int, default=20_000)
+        parser.add_argument("--workers", type=int, nargs="+",
+                            default=sorted({1, 2, 4, cpus}),
+                            help="Números de workers a comparar.")
+        parser.add_argument("--party", type=int, default=4, help="Tamanho do grupo.")
+        parser.add_argument("--enemies", type=int, default=8, help="Quantidade de goblins.")
+        parser.add_argument("--chunk-size", type=int, default=simulation.DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["fights"] < 1 or min(options["workers"]) < 1:
+            raise CommandError("Use pelo menos uma luta e um worker.")
+
+        party, enemies = synthetic_encounter(options["party"], options["enemies"])
+        results = simulation.benchmark(
+            party, enemies, options["fights"], options["workers"],
+            seed=options["seed"], chunk_size=options["chunk_size"],
+        )
+
+        self.stdout.write(f"{options['fights']} lutas, {os.cpu_count()} CPUs")
+        header = f"{'workers':>8}{'segundos':>10}{'lutas/s':>10}{'aceleração':>12}{'eficiência':>12}{'idêntico':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in results:
+            self.stdout.write(
+                f"{r['workers']:>8}{r['seconds']:>10}{r['fights_per_second']:>10}"
+                f"{r['speedup']:>12}{r['efficiency']:>12}{'sim' if r['identical'] else 'NÃO':>10}"
+            )
@@ -0,0 +1,59 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from creatures.models import Creature
+from creatures.serializers import CreatureImportSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa criaturas de um arquivo JSON (lista de fichas) ou CSV "
+        "(uma ficha por linha), criando ou atualizando pelo nome."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Criaturas validadas e gravadas por INSERT.")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"Arquivo não encontrado: {path}")
+
+        rows = iter(self._read(path))
+        imported, offset = 0, 0
+        with transaction.atomic():
+            while chunk := list(islice(rows, options["batch_size"])):
+                serializer = CreatureImportSerializer(data=chunk, many=True)
+                if not serializer.is_valid():
+                    errors = [
+                        f"linha {offset + i + 1}: {error}"
+                        for i, error in enumerate(serializer.errors) if error
+                    ]
+                    raise CommandError("Fichas inválidas:\n  " + "\n  ".join(errors[:20]))
+                imported += Creature.objects.import_rows(
+                    serializer.validated_data, batch_size=options["batch_size"]
+                )
+                offset += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"{imported} criaturas importadas."))
+
+    def _read(self, path):
+        if path.suffix.lower() == ".csv":
+            with path.open(newline="", encoding="utf-8") as f:
+                # células vazias ficam com o default do model
+                for row in csv.DictReader(f):
+                    yield {key: value for key, value in row.items() if value != ""}
+            return
+
+        with path.open(encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("creatures", [])
+        yield from data
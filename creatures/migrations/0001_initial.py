@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Creature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150, unique=True)),
+                ('search_name', models.CharField(db_index=True, editable=False, max_length=150)),
+                ('type', models.CharField(choices=[('aberration', 'Aberração'), ('beast', 'Fera'), ('celestial', 'Celestial'), ('construct', 'Constructo'), ('dragon', 'Dragão'), ('elemental', 'Elemental'), ('fey', 'Fada'), ('fiend', 'Ínfero'), ('giant', 'Gigante'), ('humanoid', 'Humanoide'), ('monstrosity', 'Monstruosidade'), ('ooze', 'Limo'), ('plant', 'Planta'), ('undead', 'Morto-vivo')], max_length=20)),
+                ('size', models.CharField(choices=[('tiny', 'Miúdo'), ('small', 'Pequeno'), ('medium', 'Médio'), ('large', 'Grande'), ('huge', 'Enorme'), ('gargantuan', 'Colossal')], default='medium', max_length=20)),
+                ('challenge', models.FloatField(db_index=True)),
+                ('xp', models.PositiveIntegerField(default=0, editable=False)),
+                ('proficiency_bonus', models.PositiveSmallIntegerField(default=2, editable=False)),
+                ('armor_class', models.PositiveSmallIntegerField(default=10)),
+                ('hit_points', models.PositiveIntegerField(default=1)),
+                ('hit_dice', models.CharField(blank=True, max_length=30)),
+                ('speed', models.PositiveSmallIntegerField(default=30)),
+                ('strength', models.PositiveSmallIntegerField(default=10)),
+                ('dexterity', models.PositiveSmallIntegerField(default=10)),
+                ('constitution', models.PositiveSmallIntegerField(default=10)),
+                ('intelligence', models.PositiveSmallIntegerField(default=10)),
+                ('wisdom', models.PositiveSmallIntegerField(default=10)),
+                ('charisma', models.PositiveSmallIntegerField(default=10)),
+                ('attack_bonus', models.SmallIntegerField(default=0)),
+                ('attacks_per_round', models.PositiveSmallIntegerField(default=1)),
+                ('damage_dice', models.CharField(blank=True, max_length=30)),
+                ('description', models.TextField(blank=True)),
+                ('source', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['search_name', 'id'],
+                'indexes': [models.Index(fields=['type', 'challenge'], name='creatures_c_type_966fa5_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,193 @@
+import math
+import unicodedata
+from fractions import Fraction
+from itertools import islice
+
+from django.core.exceptions import ValidationError
 from django.db import models
 
-# Create your models here.
+# ===========================================================
+# NÍVEL DE DESAFIO (ND) E XP
+# ===========================================================
+
+CHALLENGE_XP = {
+    0: 10, 0.125: 25, 0.25: 50, 0.5: 100,
+    1: 200, 2: 450, 3: 700, 4: 1100, 5: 1800,
+    6: 2300, 7: 2900, 8: 3900, 9: 5000, 10: 5900,
+    11: 7200, 12: 8400, 13: 10000, 14: 11500, 15: 13000,
+    16: 15000, 17: 18000, 18: 20000, 19: 22000, 20: 25000,
+    21: 33000, 22: 41000, 23: 50000, 24: 62000, 25: 75000,
+    26: 90000, 27: 105000, 28: 120000, 29: 135000, 30: 155000,
+}
+
+ABILITIES = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+
+
+def parse_challenge(value):
+    """ND como número: aceita 2, "2", 0.25 e "1/4"."""
+    try:
+        challenge = float(Fraction(str(value).strip()))
+    except (ValueError, ZeroDivisionError):
+        raise ValidationError(f"Nível de desafio inválido: {value}")
+    if challenge not in CHALLENGE_XP:
+        raise ValidationError(f"Nível de desafio inválido: {value}")
+    return challenge
+
+
+def normalize_dice(expression):
+    """Expressão de dados validada e normalizada ("1d6 + 2" -> "1d6+2")."""
+    from campaigns import dice
+
+    if not expression:
+        return ""
+    try:
+        return str(dice.compile_expression(expression))
+    except dice.DiceError as e:
+        raise ValidationError(str(e))
+
+
+def challenge_proficiency(challenge):
+    return 2 + max(0, (math.ceil(challenge) - 1) // 4)
+
+
+def search_key(name):
+    """Nome normalizado para busca por prefixo (minúsculo, sem acento)."""
+    decomposed = unicodedata.normalize("NFKD", name.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+# ===========================================================
+# CRIATURAS
+# ===========================================================
+
+class CreatureQuerySet(models.QuerySet):
+    def search(self, prefix):
+        """
+        Nome começando com `prefix`, sem diferenciar maiúsculas/acentos.
+
+        Usa intervalo (>= prefixo e < prefixo + maior caractere) em vez
+        de LIKE, para o índice de search_name valer em qualquer banco.
+        """
+        key = search_key(prefix)
+        if not key:
+            return self
+        return self.filter(search_name__gte=key, search_name__lt=key + "\U0010ffff")
+
+    def import_rows(self, rows, batch_size=1000):
+        """
+        Cria ou atualiza (pelo nome) criaturas já validadas, em blocos de
+        um INSERT ... ON CONFLICT cada. Devolve quantas linhas gravou.
+        """
+        from . import statblocks
+
+        fields = [
+            f.name for f in Creature._meta.concrete_fields
+            if not f.primary_key and f.name not in ("name", "created_at")
+        ]
+        rows = iter(rows)
+        imported = 0
+        while chunk := list(islice(rows, batch_size)):
+            creatures = []
+            for row in chunk:
+                creature = Creature(**row)
+                creature.fill_derived()
+                creatures.append(creature)
+            self.bulk_create(
+                creatures,
+                update_conflicts=True,
+                unique_fields=["name"],
+                update_fields=fields,
+            )
+            imported += len(creatures)
+
+        statblocks.invalidate()
+        return imported
+
+
+class Creature(models.Model):
+    objects = CreatureQuerySet.as_manager()
+
+    class Type(models.TextChoices):
+        ABERRATION = "aberration", "Aberração"
+        BEAST = "beast", "Fera"
+        CELESTIAL = "celestial", "Celestial"
+        CONSTRUCT = "construct", "Constructo"
+        DRAGON = "dragon", "Dragão"
+        ELEMENTAL = "elemental", "Elemental"
+        FEY = "fey", "Fada"
+        FIEND = "fiend", "Ínfero"
+        GIANT = "giant", "Gigante"
+        HUMANOID = "humanoid", "Humanoide"
+        MONSTROSITY = "monstrosity", "Monstruosidade"
+        OOZE = "ooze", "Limo"
+        PLANT = "plant", "Planta"
+        UNDEAD = "undead", "Morto-vivo"
+
+    class Size(models.TextChoices):
+        TINY = "tiny", "Miúdo"
+        SMALL = "small", "Pequeno"
+        MEDIUM = "medium", "Médio"
+        LARGE = "large", "Grande"
+        HUGE = "huge", "Enorme"
+        GARGANTUAN = "gargantuan", "Colossal"
+
+    name = models.CharField(max_length=150, unique=True)
+    # preenchido a partir de name (ver search_key)
+    search_name = models.CharField(max_length=150, editable=False, db_index=True)
+
+    type = models.CharField(max_length=20, choices=Type.choices)
+    size = models.CharField(max_length=20, choices=Size.choices, default=Size.MEDIUM)
+
+    # ND: 0, 1/8, 1/4, 1/2, 1..30; xp e bônus de proficiência derivam dele
+    challenge = models.FloatField(db_index=True)
+    xp = models.PositiveIntegerField(editable=False, default=0)
+    proficiency_bonus = models.PositiveSmallIntegerField(editable=False, default=2)
+
+    armor_class = models.PositiveSmallIntegerField(default=10)
+    hit_points = models.PositiveIntegerField(default=1)
+    hit_dice = models.CharField(max_length=30, blank=True)  # ex.: "7d8+14"
+    speed = models.PositiveSmallIntegerField(default=30)
+
+    strength = models.PositiveSmallIntegerField(default=10)
+    dexterity = models.PositiveSmallIntegerField(default=10)
+    constitution = models.PositiveSmallIntegerField(default=10)
+    intelligence = models.PositiveSmallIntegerField(default=10)
+    wisdom = models.PositiveSmallIntegerField(default=10)
+    charisma = models.PositiveSmallIntegerField(default=10)
+
+    # ataque principal, resumido para simulação
+    attack_bonus = models.SmallIntegerField(default=0)
+    attacks_per_round = models.PositiveSmallIntegerField(default=1)
+    damage_dice = models.CharField(max_length=30, blank=True)  # ex.: "1d6+2"
+
+    description = models.TextField(blank=True)
+    source = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["search_name", "id"]
+        indexes = [
+            models.Index(fields=["type", "challenge"]),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        self.challenge = parse_challenge(self.challenge)
+        for field in ("hit_dice", "damage_dice"):
+            try:
+                setattr(self, field, normalize_dice(getattr(self, field)))
+            except ValidationError as e:
+                raise ValidationError({field: e.messages})
+
+    def fill_derived(self):
+        self.search_name = search_key(self.name)
+        self.xp = CHALLENGE_XP.get(self.challenge, 0)
+        self.proficiency_bonus = challenge_proficiency(self.challenge)
+
+    def save(self, *args, **kwargs):
+        self.fill_derived()
+        super().save(*args, **kwargs)
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatureCursorPagination(CursorPagination):
+    """Paginação por cursor na ordem alfabética (índice de search_name)."""
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("search_name", "id")
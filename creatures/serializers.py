@@ -0,0 +1,114 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+from . import builder, simulation
+from .models import Creature, normalize_dice, parse_challenge
+
+
+class ChallengeField(serializers.Field):
+    """ND como número ou fração ("1/4")."""
+
+    def to_internal_value(self, data):
+        try:
+            return parse_challenge(data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+    def to_representation(self, value):
+        return value
+
+
+class CreatureListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Creature
+        fields = [
+            "id", "name", "type", "size",
+            "challenge", "xp",
+            "armor_class", "hit_points",
+        ]
+
+
+class CreatureSerializer(serializers.ModelSerializer):
+    challenge = ChallengeField()
+
+    class Meta:
+        model = Creature
+        fields = [
+            "id", "name", "type", "size",
+            "challenge", "xp", "proficiency_bonus",
+            "armor_class", "hit_points", "hit_dice", "speed",
+            "strength", "dexterity", "constitution",
+            "intelligence", "wisdom", "charisma",
+            "attack_bonus", "attacks_per_round", "damage_dice",
+            "description", "source",
+        ]
+
+    def _validate_dice(self, value):
+        try:
+            return normalize_dice(value)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+    validate_hit_dice = validate_damage_dice = _validate_dice
+
+
+class CreatureImportSerializer(CreatureSerializer):
+    # importação atualiza pelo nome: sem a validação de nome único
+    name = serializers.CharField(max_length=150)
+
+
+class BulkCreatureImportSerializer(serializers.Serializer):
+    creatures = CreatureImportSerializer(many=True, allow_empty=False)
+
+    def validate_creatures(self, value):
+        names = [item["name"] for item in value]
+        if len(names) != len(set(names)):
+            raise serializers.ValidationError("Criatura repetida na lista.")
+        return value
+
+
+# ENCONTROS
+
+class EncounterGroupSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    count = serializers.IntegerField(min_value=1, max_value=simulation.MAX_SIDE)
+
+
+class EncounterSimulationSerializer(serializers.Serializer):
+    creatures = EncounterGroupSerializer(many=True, allow_empty=False)
+    # sem a lista: todos os personagens ativos da campanha
+    characters = serializers.ListField(child=serializers.IntegerField(), required=False)
+    fights = serializers.IntegerField(
+        min_value=1, max_value=simulation.MAX_FIGHTS, default=simulation.DEFAULT_FIGHTS
+    )
+    seed = serializers.IntegerField(min_value=0, max_value=2**63 - 1, required=False)
+    # progresso em text/event-stream em vez de uma resposta só no fim
+    stream = serializers.BooleanField(default=False)
+
+    def validate_creatures(self, value):
+        if sum(group["count"] for group in value) > simulation.MAX_SIDE:
+            raise serializers.ValidationError(
+                f"No máximo {simulation.MAX_SIDE} criaturas por encontro."
+            )
+        return value
+
+
+class EncounterBuildSerializer(serializers.Serializer):
+    difficulty = serializers.ChoiceField(choices=builder.DIFFICULTIES, default=builder.MEDIUM)
+    results = serializers.IntegerField(
+        min_value=1, max_value=builder.MAX_RESULTS, default=builder.DEFAULT_RESULTS
+    )
+    max_monsters = serializers.IntegerField(
+        min_value=1, max_value=builder.MAX_MONSTERS, default=builder.DEFAULT_MAX_MONSTERS
+    )
+    max_kinds = serializers.IntegerField(
+        min_value=1, max_value=builder.MAX_KINDS, default=builder.DEFAULT_MAX_KINDS
+    )
+    types = serializers.ListField(
+        child=serializers.ChoiceField(choices=Creature.Type.choices), required=False
+    )
+    challenge_min = ChallengeField(required=False)
+    challenge_max = ChallengeField(required=False)
+    # sem a lista: todos os personagens ativos da campanha
+    characters = serializers.ListField(child=serializers.IntegerField(), required=False)
+    seed = serializers.IntegerField(min_value=0, max_value=2**63 - 1, required=False)
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import statblocks
+from .models import Creature
+
+
+@receiver(post_save, sender=Creature)
+@receiver(post_delete, sender=Creature)
+def invalidate_statblocks(sender, raw=False, **kwargs):
+    # a tabela compacta do processo deixa de valer (ver creatures.statblocks)
+    statblocks.invalidate()
+    transaction.on_commit(statblocks.invalidate)
@@ -0,0 +1,413 @@
+"""
+Simulação de encontros por Monte Carlo.
+
+Cada luta é jogada de forma resumida: iniciativa (d20 + Destreza), cada
+combatente faz seus ataques contra o inimigo vivo com menos PV, 1
+natural erra, 20 natural é crítico (dados de dano em dobro), até um dos
+lados cair ou MAX_ROUNDS rodadas (empate).
+
+Milhares de lutas são divididas em blocos rodados num pool de processos
+compartilhado pelo processo inteiro (criado no primeiro uso, com
+ENCOUNTER_SIMULATION_WORKERS processos): pedidos simultâneos dividem os
+mesmos workers em vez de cada um abrir o seu.
+Cada bloco tem seu próprio gerador, semeado com (seed, número do bloco),
+e as estatísticas dos blocos são somas: o resultado é exatamente o mesmo
+com qualquer número de workers.
+
+Os combatentes viajam para os workers como dataclasses simples, com o
+dano já convertido em pesos cumulativos da distribuição exata
+(campaigns.dice): sortear um dano é um `choices` só.
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+
+from campaigns import dice
+from campaigns.models import ability_mod
+
+DEFAULT_FIGHTS = 1000
+MAX_FIGHTS = 100_000
+DEFAULT_CHUNK_SIZE = 250
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# combatentes por lado
+MAX_SIDE = 200
+# rodadas até a luta contar como empate
+MAX_ROUNDS = 100
+# vezes que o pool compartilhado é recriado numa simulação se um worker morrer
+MAX_POOL_RETRIES = 1
+
+PARTY, ENEMIES = 0, 1
+
+
+@dataclass(frozen=True)
+class Combatant:
+    id: int | None
+    name: str
+    hp: int
+    armor_class: int
+    attack_bonus: int
+    attacks: int
+    initiative: int
+    # (valores, pesos cumulativos) do dano normal e do crítico
+    damage: tuple
+    critical: tuple
+
+
+@lru_cache(maxsize=256)
+def damage_tables(expression):
+    """Tabelas de sorteio do dano normal e do crítico de uma expressão."""
+    compiled = dice.compile_expression(expression)
+    normal = compiled.distribution
+    critical = normal.convolve(normal.shift(-compiled.modifier))
+    return _cumulative(normal), _cumulative(critical)
+
+
+def _cumulative(distribution):
+    values, weights, running = [], [], 0
+    for i, ways in enumerate(distribution.counts):
+        if ways:
+            running += ways
+            values.append(max(0, distribution.offset + i))
+            weights.append(running)
+    return tuple(values), tuple(weights)
+
+
+def party_from_characters(characters):
+    """
+    Combatentes a partir das fichas: ataque com o melhor entre Força e
+    Destreza mais proficiência, CA 10 + Destreza, dano 1d8 + modificador
+    e os PV atuais. Personagens sem PV ficam de fora.
+    """
+    party = []
+    for character in characters:
+        if character.hp <= 0:
+            continue
+        dexterity = ability_mod(character.dexterity)
+        modifier = max(ability_mod(character.strength), dexterity)
+        damage, critical = damage_tables(f"1d8{modifier:+d}")
+        party.append(Combatant(
+            id=character.pk,
+            name=character.name,
+            hp=character.hp,
+            armor_class=10 + dexterity,
+            attack_bonus=character.proficiency_bonus + modifier,
+            attacks=1,
+            initiative=dexterity,
+            damage=damage,
+            critical=critical,
+        ))
+    return party
+
+
+def enemies_from_table(table, groups):
+    """
+    Combatentes a partir do bestiário compacto (creatures.statblocks).
+    `groups`: [(id da criatura, quantidade)]; KeyError se alguma não existe.
+    """
+    enemies = []
+    for creature_id, count in groups:
+        block = table.get(creature_id)
+        if block is None:
+            raise KeyError(creature_id)
+        damage = block.damage_dice or f"1d6{block.modifier('strength'):+d}"
+        damage, critical = damage_tables(damage)
+        for n in range(1, count + 1):
+            enemies.append(Combatant(
+                id=block.id,
+                name=block.name if count == 1 else f"{block.name} {n}",
+                hp=block.hit_points,
+                armor_class=block.armor_class,
+                attack_bonus=block.attack_bonus,
+                attacks=block.attacks_per_round,
+                initiative=block.modifier("dexterity"),
+                damage=damage,
+                critical=critical,
+            ))
+    return enemies
+
+
+# ===========================================================
+# UMA LUTA
+# ===========================================================
+
+def fight(party, enemies, rng):
+    """Joga uma luta. Devolve (lado vencedor ou None, rodadas, PV finais do grupo)."""
+    sides = (party, enemies)
+    hp = ([c.hp for c in party], [c.hp for c in enemies])
+    standing = [len(party), len(enemies)]
+
+    # maior iniciativa primeiro; empates pelo modificador e depois o grupo
+    rolls = sorted(
+        (
+            (-(rng.randint(1, 20) + c.initiative), -c.initiative, side, i)
+            for side, group in enumerate(sides)
+            for i, c in enumerate(group)
+        )
+    )
+    order = [(side, i) for _, _, side, i in rolls]
+
+    choices, uniform = rng.choices, rng.random
+    for round_ in range(1, MAX_ROUNDS + 1):
+        for side, i in order:
+            if hp[side][i] <= 0:
+                continue
+            attacker = sides[side][i]
+            foe = 1 - side
+            targets = hp[foe]
+            for _ in range(attacker.attacks):
+                target = min(
+                    (j for j, left in enumerate(targets) if left > 0),
+                    key=targets.__getitem__,
+                )
+                roll = int(uniform() * 20) + 1
+                if roll == 1:
+                    continue
+                if roll == 20:
+                    values, weights = attacker.critical
+                elif roll + attacker.attack_bonus >= sides[foe][target].armor_class:
+                    values, weights = attacker.damage
+                else:
+                    continue
+
+                targets[target] -= choices(values, cum_weights=weights)[0]
+                if targets[target] <= 0:
+                    standing[foe] -= 1
+                    if not standing[foe]:
+                        return side, round_, hp[PARTY]
+    return None, MAX_ROUNDS, hp[PARTY]
+
+
+# ===========================================================
+# BLOCOS E AGREGAÇÃO
+# ===========================================================
+
+def _empty_stats(party_size):
+    return {
+        "fights": 0,
+        "wins": [0, 0],
+        "draws": 0,
+        "rounds": Counter(),
+        # perda de PV do grupo em faixas de 10% (0, 10, ..., 100)
+        "hp_loss": Counter(),
+        "hp_lost": [0] * party_size,
+        "deaths": [0] * party_size,
+    }
+
+
+def run_chunk(chunk):
+    """Roda um bloco de lutas (executado nos workers)."""
+    party, enemies, seed, index, fights = chunk
+    rng = random.Random(f"{seed}:{index}")
+    stats = _empty_stats(len(party))
+    party_hp = sum(c.hp for c in party)
+
+    for _ in range(fights):
+        winner, rounds, remaining = fight(party, enemies, rng)
+        stats["fights"] += 1
+        if winner is None:
+            stats["draws"] += 1
+        else:
+            stats["wins"][winner] += 1
+        stats["rounds"][rounds] += 1
+
+        lost_total = 0
+        for i, (combatant, left) in enumerate(zip(party, remaining)):
+            lost = combatant.hp - max(left, 0)
+            lost_total += lost
+            stats["hp_lost"][i] += lost
+            if left <= 0:
+                stats["deaths"][i] += 1
+        stats["hp_loss"][min(lost_total * 10 // party_hp, 10) * 10] += 1
+    return stats
+
+
+def _merge(total, stats):
+    total["fights"] += stats["fights"]
+    total["draws"] += stats["draws"]
+    for key in ("wins", "hp_lost", "deaths"):
+        total[key] = [a + b for a, b in zip(total[key], stats[key])]
+    total["rounds"].update(stats["rounds"])
+    total["hp_loss"].update(stats["hp_loss"])
+    return total
+
+
+def summarize(stats, party, enemies, seed):
+    fights = stats["fights"]
+    party_hp = sum(c.hp for c in party)
+    return {
+        "seed": seed,
+        "fights": fights,
+        "party_win_rate": stats["wins"][PARTY] / fights,
+        "enemy_win_rate": stats["wins"][ENEMIES] / fights,
+        "draw_rate": stats["draws"] / fights,
+        "expected_rounds": sum(r * n for r, n in stats["rounds"].items()) / fights,
+        "rounds": {r: n / fights for r, n in sorted(stats["rounds"].items())},
+        "expected_hp_loss": sum(stats["hp_lost"]) / fights / party_hp,
+        "hp_loss": {bucket: stats["hp_loss"][bucket] / fights for bucket in range(0, 101, 10)},
+        "characters": [
+            {
+                "id": c.id,
+                "name": c.name,
+                "hp": c.hp,
+                "expected_hp_lost": lost / fights,
+                "death_rate": deaths / fights,
+            }
+            for c, lost, deaths in zip(party, stats["hp_lost"], stats["deaths"])
+        ],
+        "enemies": len(enemies),
+    }
+
+
+def _workers():
+    return getattr(settings, "ENCOUNTER_SIMULATION_WORKERS", DEFAULT_WORKERS)
+
+
+_executor_lock = threading.Lock()
+_executor = None
+
+
+def get_executor():
+    """Pool de processos compartilhado, criado no primeiro uso (None se 1 worker)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None and _workers() > 1:
+            _executor = ProcessPoolExecutor(max_workers=_workers())
+        return _executor
+
+
+def discard_executor(broken):
+    """
+    Tira do uso um pool quebrado (um worker morreu: OOM, kill) para o
+    próximo get_executor criar outro. Só descarta se ainda for o atual.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_executor():
+    """Encerra o pool compartilhado; o próximo uso cria outro."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def simulate_iter(party, enemies, fights=DEFAULT_FIGHTS, seed=None, workers=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Roda `fights` lutas e gera ("progress", {"done", "total"}) a cada bloco
+    concluído e, por último, ("result", resumo).
+
+    Sem `workers`, usa o pool compartilhado; com `workers`, abre um pool
+    só para esta chamada (comparação de desempenho em `benchmark`).
+    """
+    if not party or not enemies:
+        raise ValueError("Os dois lados precisam de combatentes.")
+    seed = dice.new_seed() if seed is None else seed
+
+    chunks = [
+        (party, enemies, seed, index, min(chunk_size, fights - start))
+        for index, start in enumerate(range(0, fights, chunk_size))
+    ]
+    total = _empty_stats(len(party))
+    done = 0
+
+    own_pool = None
+    if len(chunks) == 1:
+        pool = None
+    elif workers is None:
+        pool = get_executor()
+    elif workers > 1:
+        pool = own_pool = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+    else:
+        pool = None
+
+    if pool is None:
+        for chunk in chunks:
+            _merge(total, run_chunk(chunk))
+            done += chunk[-1]
+            yield "progress", {"done": done, "total": fights}
+    else:
+        try:
+            # blocos ainda sem resultado, por índice
+            pending = {chunk[3]: chunk for chunk in chunks}
+            retries = 0
+            while pending:
+                futures = {}
+                try:
+                    for index, chunk in pending.items():
+                        futures[pool.submit(run_chunk, chunk)] = index
+                    for future in as_completed(futures):
+                        stats = future.result()
+                        chunk = pending.pop(futures[future])
+                        _merge(total, stats)
+                        done += chunk[-1]
+                        yield "progress", {"done": done, "total": fights}
+                except BrokenProcessPool:
+                    # o pool compartilhado quebrado sai de uso (os próximos
+                    # pedidos ganham outro) e os blocos que faltam rodam de
+                    # novo num pool novo: cada um tem o próprio gerador
+                    if own_pool is not None:
+                        raise
+                    discard_executor(pool)
+                    if retries >= MAX_POOL_RETRIES:
+                        raise
+                    retries += 1
+                    pool = get_executor()
+                finally:
+                    # cliente desistiu no meio: os blocos que nem começaram são descartados
+                    for future in futures:
+                        future.cancel()
+        finally:
+            if own_pool is not None:
+                own_pool.shutdown()
+
+    yield "result", summarize(total, party, enemies, seed)
+
+
+def simulate(party, enemies, fights=DEFAULT_FIGHTS, seed=None, workers=None,
+             chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Como simulate_iter, chamando `progress(done, total)` e devolvendo o resumo."""
+    for kind, payload in simulate_iter(party, enemies, fights, seed, workers, chunk_size):
+        if kind == "result":
+            return payload
+        if progress is not None:
+            progress(payload["done"], payload["total"])
+
+
+def benchmark(party, enemies, fights, worker_counts, seed=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Tempo das mesmas `fights` lutas com cada número de workers, a
+    aceleração em relação ao primeiro e se o resultado foi idêntico.
+    """
+    results, baseline, reference = [], None, None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        summary = simulate(party, enemies, fights, seed, workers, chunk_size)
+        seconds = time.perf_counter() - start
+
+        if baseline is None:
+            baseline, reference = seconds, summary
+        speedup = baseline / seconds
+        results.append({
+            "workers": workers,
+            "seconds": round(seconds, 3),
+            "fights_per_second": round(fights / seconds),
+            "speedup": round(speedup, 2),
+            "efficiency": round(speedup / workers * worker_counts[0], 2),
+            "identical": summary == reference,
+        })
+    return results
@@ -0,0 +1,189 @@
+"""
+Bestiário compacto em memória para simulação e montagem de encontros.
+
+Cada coluna numérica das fichas é um `array.array` (2 a 4 bytes por
+criatura), e tipo/tamanho viram códigos de 1 byte. Dezenas de milhares
+de criaturas ocupam poucos MB, contra vários KB por instância de model.
+
+A tabela é carregada com uma única consulta e reaproveitada pelo
+processo até o bestiário mudar (escritas no próprio processo invalidam
+na hora; nos outros, a conferência acontece a cada
+BESTIARY_VERSION_TTL segundos).
+"""
+import threading
+import time
+from array import array
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import ABILITIES, Creature
+
+DEFAULT_VERSION_TTL = 2.0
+
+TYPES = tuple(Creature.Type.values)
+SIZES = tuple(Creature.Size.values)
+
+# coluna -> typecode do array
+COLUMNS = {
+    "id": "q",
+    "challenge": "f",
+    "xp": "i",
+    "proficiency_bonus": "b",
+    "armor_class": "h",
+    "hit_points": "i",
+    "speed": "h",
+    **{ability: "h" for ability in ABILITIES},
+    "attack_bonus": "h",
+    "attacks_per_round": "h",
+}
+
+
+class StatBlock(NamedTuple):
+    """Uma linha da tabela (só para leitura)."""
+    id: int
+    name: str
+    type: str
+    size: str
+    challenge: float
+    xp: int
+    proficiency_bonus: int
+    armor_class: int
+    hit_points: int
+    speed: int
+    strength: int
+    dexterity: int
+    constitution: int
+    intelligence: int
+    wisdom: int
+    charisma: int
+    attack_bonus: int
+    attacks_per_round: int
+    damage_dice: str
+
+    def modifier(self, ability):
+        return (getattr(self, ability) - 10) // 2
+
+
+class StatBlockTable:
+    def __init__(self, version=None):
+        self.version = version
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        self.names = []
+        self.types = array("b")
+        self.sizes = array("b")
+        # poucas expressões distintas: cada uma guardada uma vez
+        self.damage_dice = array("i")
+        self._dice = []
+        self._dice_index = {}
+        self._row_by_id = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, values):
+        row = len(self.names)
+        for name, column in self.columns.items():
+            column.append(values[name])
+        self.names.append(values["name"])
+        self.types.append(TYPES.index(values["type"]))
+        self.sizes.append(SIZES.index(values["size"]))
+
+        expression = values["damage_dice"]
+        if expression not in self._dice_index:
+            self._dice_index[expression] = len(self._dice)
+            self._dice.append(expression)
+        self.damage_dice.append(self._dice_index[expression])
+
+        self._row_by_id[values["id"]] = row
+
+    @classmethod
+    def from_queryset(cls, queryset, version=None):
+        table = cls(version)
+        fields = [*COLUMNS, "name", "type", "size", "damage_dice"]
+        for values in queryset.order_by("pk").values(*fields).iterator(chunk_size=2000):
+            table.append(values)
+        return table
+
+    def row(self, index):
+        c = self.columns
+        return StatBlock(
+            id=c["id"][index],
+            name=self.names[index],
+            type=TYPES[self.types[index]],
+            size=SIZES[self.sizes[index]],
+            challenge=c["challenge"][index],
+            xp=c["xp"][index],
+            proficiency_bonus=c["proficiency_bonus"][index],
+            armor_class=c["armor_class"][index],
+            hit_points=c["hit_points"][index],
+            speed=c["speed"][index],
+            **{ability: c[ability][index] for ability in ABILITIES},
+            attack_bonus=c["attack_bonus"][index],
+            attacks_per_round=c["attacks_per_round"][index],
+            damage_dice=self._dice[self.damage_dice[index]],
+        )
+
+    def get(self, creature_id):
+        """StatBlock da criatura, ou None."""
+        index = self._row_by_id.get(creature_id)
+        return None if index is None else self.row(index)
+
+    def index_of(self, creature_id):
+        return self._row_by_id[creature_id]
+
+    def select(self, types=None, challenge_min=None, challenge_max=None):
+        """Índices das linhas que passam nos filtros (varredura das colunas)."""
+        type_codes = None if types is None else {TYPES.index(t) for t in types}
+        low = float("-inf") if challenge_min is None else challenge_min
+        high = float("inf") if challenge_max is None else challenge_max
+
+        challenges = self.columns["challenge"]
+        return [
+            i for i in range(len(self.names))
+            if low <= challenges[i] <= high
+            and (type_codes is None or self.types[i] in type_codes)
+        ]
+
+    def nbytes(self):
+        """Memória dos arrays numéricos (sem nomes e expressões)."""
+        arrays = [*self.columns.values(), self.types, self.sizes, self.damage_dice]
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+_lock = threading.Lock()
+_table = None
+_checked_at = 0.0
+
+
+def _version_ttl():
+    return getattr(settings, "BESTIARY_VERSION_TTL", DEFAULT_VERSION_TTL)
+
+
+def current_version():
+    """(quantidade, última alteração): muda com qualquer escrita ou remoção."""
+    stats = Creature.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+    return stats["count"], stats["updated"]
+
+
+def get_table():
+    """Tabela atual do bestiário, recarregada se ele mudou."""
+    global _table, _checked_at
+
+    with _lock:
+        now = time.monotonic()
+        if _table is not None and now - _checked_at < _version_ttl():
+            return _table
+
+        version = current_version()
+        if _table is None or _table.version != version:
+            _table = StatBlockTable.from_queryset(Creature.objects.all(), version)
+        _checked_at = now
+        return _table
+
+
+def invalidate():
+    global _table
+    with _lock:
+        _table = None
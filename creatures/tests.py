@@ -1,3 +1,410 @@
-from django.test import TestCase
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from . import builder, simulation, statblocks
+from .models import CHALLENGE_XP, Creature
+
+User = get_user_model()
+
+
+def creature_rows(count, prefix="Criatura"):
+    types = Creature.Type.values
+    challenges = [0.125, 0.25, 0.5, 1, 2, 3, 5, 8]
+    return [
+        {
+            "name": f"{prefix} {i:05d}",
+            "type": types[i % len(types)],
+            "challenge": challenges[i % len(challenges)],
+            "armor_class": 10 + i % 8,
+            "hit_points": 5 + i % 50,
+            "attack_bonus": 2 + i % 5,
+            "damage_dice": "1d6+2",
+        }
+        for i in range(count)
+    ]
+
+
+class BestiaryTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user("mestre")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        Creature.objects.import_rows([
+            {"name": "Goblin", "type": "humanoid", "size": "small", "challenge": 0.25,
+             "armor_class": 15, "hit_points": 7, "dexterity": 14,
+             "attack_bonus": 4, "damage_dice": "1d6+2"},
+            {"name": "Gárgula", "type": "elemental", "challenge": 2,
+             "armor_class": 15, "hit_points": 52, "attack_bonus": 4, "damage_dice": "1d6+2"},
+            {"name": "Dragão Vermelho Jovem", "type": "dragon", "size": "large", "challenge": 10,
+             "armor_class": 18, "hit_points": 178, "attack_bonus": 10,
+             "attacks_per_round": 3, "damage_dice": "2d10+6"},
+            {"name": "Lobo", "type": "beast", "challenge": 0.25,
+             "armor_class": 13, "hit_points": 11, "attack_bonus": 4, "damage_dice": "2d4+2"},
+        ])
+
+        self.enterContext(override_settings(BESTIARY_VERSION_TTL=3600))
+        statblocks.invalidate()
+
+
+class CreatureImportTests(BestiaryTestMixin, TestCase):
+    def test_bulk_import_is_one_insert_per_batch_and_upserts_by_name(self):
+        rows = creature_rows(2500)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(Creature.objects.import_rows(rows, batch_size=1000), 2500)
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        # o banco pode partir o bloco pelo limite de parâmetros, mas nunca uma consulta por linha
+        self.assertLess(len(inserts), 100)
+
+        rows[0]["hit_points"] = 99
+        rows[0]["challenge"] = 5
+        Creature.objects.import_rows(rows[:1])
+
+        creature = Creature.objects.get(name=rows[0]["name"])
+        self.assertEqual((creature.hit_points, creature.xp, creature.proficiency_bonus), (99, 1800, 3))
+        self.assertEqual(Creature.objects.count(), 2504)
+
+    def test_derived_fields(self):
+        goblin = Creature.objects.get(name="Goblin")
+        self.assertEqual((goblin.xp, goblin.proficiency_bonus, goblin.search_name), (50, 2, "goblin"))
+        self.assertEqual(Creature.objects.get(name="Gárgula").search_name, "gargula")
+
+    def test_api_import_is_staff_only_and_validated(self):
+        payload = {"creatures": [
+            {"name": "Kobold", "type": "humanoid", "challenge": "1/8", "damage_dice": "1d4 + 2"},
+        ]}
+        self.assertEqual(self.client.post("/api/creatures/import/", payload, format="json").status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post("/api/creatures/import/", payload, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+
+        kobold = Creature.objects.get(name="Kobold")
+        self.assertEqual((kobold.challenge, kobold.xp, kobold.damage_dice), (0.125, 25, "1d4+2"))
+
+        bad = {"creatures": [{"name": "X", "type": "humanoid", "challenge": "1/3"},
+                             {"name": "Y", "type": "humanoid", "challenge": 1, "damage_dice": "d"}]}
+        response = self.client.post("/api/creatures/import/", bad, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Creature.objects.filter(name__in=["X", "Y"]).exists())
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", encoding="utf-8") as f:
+            json.dump(creature_rows(30, "Esqueleto"), f)
+            f.flush()
+            call_command("import_creatures", f.name, "--batch-size", "10", stdout=StringIO())
+        self.assertEqual(Creature.objects.filter(search_name__startswith="esqueleto").count(), 30)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8") as f:
+            f.write("name,type,challenge,hit_points\nZumbi,undead,1/4,22\n")
+            f.flush()
+            call_command("import_creatures", f.name, stdout=StringIO())
+        self.assertEqual(Creature.objects.get(name="Zumbi").hit_points, 22)
+
+
+class CreatureAPITests(BestiaryTestMixin, TestCase):
+    def names(self, params):
+        response = self.client.get("/api/creatures/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [c["name"] for c in response.data["results"]]
+
+    def test_router_does_not_claim_the_api_root(self):
+        # /api/ é a raiz do router de campaigns, montado depois deste
+        from . import urls
+
+        self.assertNotIn("api-root", [pattern.name for pattern in urls.router.urls])
+
+    def test_filters(self):
+        self.assertEqual(self.names({"type": "beast,dragon"}), ["Dragão Vermelho Jovem", "Lobo"])
+        self.assertEqual(self.names({"challenge": "1/4"}), ["Goblin", "Lobo"])
+        self.assertEqual(self.names({"challenge_min": 1, "challenge_max": 10}), ["Dragão Vermelho Jovem", "Gárgula"])
+        self.assertEqual(self.names({"size": "small"}), ["Goblin"])
+
+    def test_prefix_search_ignores_case_and_accents(self):
+        self.assertEqual(self.names({"search": "GAR"}), ["Gárgula"])
+        self.assertEqual(self.names({"search": "dragão v"}), ["Dragão Vermelho Jovem"])
+        self.assertEqual(self.names({"search": "g", "type": "humanoid"}), ["Goblin"])
+
+    def test_prefix_search_uses_the_index(self):
+        sql, params = Creature.objects.search("gob").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn("search_name", plan)
+        self.assertNotIn("SCAN creatures_creature ", plan + " ")
+
+    def test_list_query_count_is_constant(self):
+        Creature.objects.import_rows(creature_rows(200))
+        with self.assertNumQueries(1):
+            self.names({"type": "beast"})
+
+    def test_invalid_filters(self):
+        for params in [{"type": "robot"}, {"size": "xl"}, {"challenge_min": "muito"}]:
+            self.assertEqual(self.client.get("/api/creatures/", params).status_code, 400)
+
+    def test_detail_and_write_permissions(self):
+        goblin = Creature.objects.get(name="Goblin")
+        response = self.client.get(f"/api/creatures/{goblin.pk}/")
+        self.assertEqual(response.data["damage_dice"], "1d6+2")
+
+        response = self.client.patch(f"/api/creatures/{goblin.pk}/", {"hit_points": 9}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+
+class StatBlockTableTests(BestiaryTestMixin, TestCase):
+    def test_loaded_in_one_query_and_cached(self):
+        with self.assertNumQueries(2):  # versão + linhas
+            table = statblocks.get_table()
+        with self.assertNumQueries(0):
+            self.assertIs(statblocks.get_table(), table)
+
+        goblin = table.get(Creature.objects.get(name="Goblin").pk)
+        self.assertEqual((goblin.type, goblin.size, goblin.challenge, goblin.xp), ("humanoid", "small", 0.25, 50))
+        self.assertEqual(goblin.modifier("dexterity"), 2)
+        self.assertEqual(goblin.damage_dice, "1d6+2")
+
+    def test_select_and_invalidation(self):
+        table = statblocks.get_table()
+        rows = table.select(types=["beast", "humanoid"], challenge_max=1)
+        self.assertEqual(sorted(table.row(i).name for i in rows), ["Goblin", "Lobo"])
+
+        Creature.objects.filter(name="Lobo").get().delete()
+        table = statblocks.get_table()
+        self.assertEqual(len(table), 3)
+
+    def test_tens_of_thousands_fit_in_a_few_megabytes(self):
+        Creature.objects.import_rows(creature_rows(20000))
+        table = statblocks.get_table()
+        self.assertEqual(len(table), 20004)
+        self.assertLess(table.nbytes(), 20004 * 64)
+        self.assertEqual(len(table._dice), 3)  # expressões guardadas uma vez só
+
+
+def encounter(party_size=4, goblins=6):
+    damage, critical = simulation.damage_tables("1d8+3")
+    party = [
+        simulation.Combatant(i, f"PJ {i}", 30, 16, 6, 1, 2, damage, critical)
+        for i in range(party_size)
+    ]
+    damage, critical = simulation.damage_tables("1d6+2")
+    enemies = [
+        simulation.Combatant(None, f"Goblin {i}", 7, 15, 4, 1, 2, damage, critical)
+        for i in range(goblins)
+    ]
+    return party, enemies
+
+
+class EncounterSimulationTests(TestCase):
+    def test_damage_tables_follow_the_exact_distribution(self):
+        (values, weights), (crit_values, crit_weights) = simulation.damage_tables("1d6+2")
+        self.assertEqual(values, (3, 4, 5, 6, 7, 8))
+        self.assertEqual(weights, (1, 2, 3, 4, 5, 6))
+        # crítico: 2d6+2
+        self.assertEqual((crit_values[0], crit_values[-1], crit_weights[-1]), (4, 14, 36))
+
+    def test_same_seed_same_result_with_any_number_of_workers(self):
+        party, enemies = encounter()
+        serial = simulation.simulate(party, enemies, 600, seed=5, workers=1, chunk_size=100)
+        pooled = simulation.simulate(party, enemies, 600, seed=5, workers=2, chunk_size=100)
+        self.assertEqual(serial, pooled)
+        self.assertNotEqual(
+            serial, simulation.simulate(party, enemies, 600, seed=6, workers=1, chunk_size=100)
+        )
+
+    @override_settings(ENCOUNTER_SIMULATION_WORKERS=2)
+    def test_requests_share_one_process_pool(self):
+        party, enemies = encounter()
+        self.addCleanup(simulation.shutdown_executor)
+
+        first = simulation.simulate(party, enemies, 600, seed=5, chunk_size=100)
+        pool = simulation.get_executor()
+        second = simulation.simulate(party, enemies, 600, seed=5, chunk_size=100)
+
+        self.assertIs(simulation.get_executor(), pool)
+        self.assertEqual(pool._max_workers, 2)
+        self.assertEqual(first, second)
+        self.assertEqual(first, simulation.simulate(party, enemies, 600, seed=5, workers=1, chunk_size=100))
+
+        # desistir no meio não derruba o pool dos outros pedidos
+        runs = simulation.simulate_iter(party, enemies, 600, seed=5, chunk_size=100)
+        next(runs)
+        runs.close()
+        self.assertEqual(first, simulation.simulate(party, enemies, 600, seed=5, chunk_size=100))
+
+    @override_settings(ENCOUNTER_SIMULATION_WORKERS=2)
+    def test_a_dead_worker_does_not_break_later_simulations(self):
+        party, enemies = encounter()
+        self.addCleanup(simulation.shutdown_executor)
+        expected = simulation.simulate(party, enemies, 600, seed=5, workers=1, chunk_size=100)
+
+        # um worker morre (como num OOM): o pool compartilhado quebra
+        broken = simulation.get_executor()
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        self.assertEqual(simulation.simulate(party, enemies, 600, seed=5, chunk_size=100), expected)
+        self.assertIsNot(simulation.get_executor(), broken)
+        self.assertEqual(simulation.simulate(party, enemies, 600, seed=5, chunk_size=100), expected)
+
+    def test_summary(self):
+        party, enemies = encounter()
+        progress = []
+        result = simulation.simulate(
+            party, enemies, 500, seed=1, workers=1, chunk_size=200,
+            progress=lambda done, total: progress.append((done, total)),
+        )
+        self.assertEqual(progress, [(200, 500), (400, 500), (500, 500)])
+
+        self.assertEqual(result["fights"], 500)
+        self.assertAlmostEqual(
+            result["party_win_rate"] + result["enemy_win_rate"] + result["draw_rate"], 1
+        )
+        self.assertGreater(result["party_win_rate"], 0.9)
+        self.assertAlmostEqual(sum(result["rounds"].values()), 1)
+        self.assertAlmostEqual(sum(result["hp_loss"].values()), 1)
+        self.assertAlmostEqual(
+            result["expected_rounds"], sum(r * p for r, p in result["rounds"].items())
+        )
+        self.assertEqual(len(result["characters"]), 4)
+        self.assertTrue(all(0 <= c["death_rate"] <= 1 for c in result["characters"]))
+
+        # um grupo solitário contra um bando grande quase sempre perde
+        party, enemies = encounter(party_size=1, goblins=40)
+        result = simulation.simulate(party, enemies, 200, seed=1, workers=1)
+        self.assertGreater(result["enemy_win_rate"], 0.9)
+        self.assertEqual(result["hp_loss"][100], result["characters"][0]["death_rate"])
+
+    def test_needs_both_sides(self):
+        party, _ = encounter()
+        with self.assertRaises(ValueError):
+            simulation.simulate(party, [], 10)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            "benchmark_simulation", "--fights", "300", "--workers", "1", "2",
+            "--chunk-size", "50", stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(all(line.rstrip().endswith("sim") for line in lines[3:]))
+
+
+def synthetic_table(count, challenges=None, seed=0):
+    """Bestiário compacto montado direto em memória (sem banco)."""
+    rng = random.Random(seed)
+    challenges = challenges or list(CHALLENGE_XP)
+    table = statblocks.StatBlockTable(version=("sintético", count))
+    for i in range(1, count + 1):
+        challenge = rng.choice(challenges)
+        table.append({
+            "id": i, "name": f"Criatura {i}",
+            "type": rng.choice(statblocks.TYPES), "size": "medium",
+            "challenge": challenge, "xp": CHALLENGE_XP[challenge],
+            "proficiency_bonus": 2, "armor_class": 12, "hit_points": 10, "speed": 30,
+            "strength": 10, "dexterity": 10, "constitution": 10,
+            "intelligence": 10, "wisdom": 10, "charisma": 10,
+            "attack_bonus": 3, "attacks_per_round": 1, "damage_dice": "1d6",
+        })
+    return table
+
+
+class EncounterBuilderTests(TestCase):
+    def test_thresholds_and_multipliers(self):
+        self.assertEqual(
+            builder.party_thresholds([5, 5, 5, 5]),
+            {"easy": 1000, "medium": 2000, "hard": 3000, "deadly": 4400},
+        )
+        self.assertEqual(builder.multiplier_table(4, 7), [0, 1, 1.5, 2, 2, 2, 2, 2.5])
+        # grupo pequeno anda um passo para cima, grande um para baixo
+        self.assertEqual(builder.multiplier_table(2, 3), [0, 1.5, 2, 2.5])
+        self.assertEqual(builder.multiplier_table(6, 3), [0, 0.5, 1, 1.5])
+        self.assertEqual(builder.multiplier_table(1, 15)[15], 5)
+
+    def test_matches_brute_force(self):
+        table = synthetic_table(40, challenges=[0.125, 0.25, 0.5, 1, 2, 3])
+        levels, max_monsters, max_kinds = [3, 3, 4], 6, 2
+        result = builder.build(table, levels, builder.HARD, results=8,
+                               max_monsters=max_monsters, max_kinds=max_kinds, seed=1)
+
+        thresholds = builder.party_thresholds(levels)
+        low, high, target = builder.budget(thresholds, builder.HARD)
+        multipliers = builder.multiplier_table(len(levels), max_monsters)
+        values = sorted({CHALLENGE_XP[c] for c in [0.125, 0.25, 0.5, 1, 2, 3]})
+
+        distances = []
+        for kinds in range(1, max_kinds + 1):
+            for chosen in itertools.combinations(values, kinds):
+                for counts in itertools.product(range(1, max_monsters + 1), repeat=kinds):
+                    monsters = sum(counts)
+                    if monsters > max_monsters:
+                        continue
+                    adjusted = sum(v * c for v, c in zip(chosen, counts)) * multipliers[monsters]
+                    if low <= adjusted <= high:
+                        distances.append(abs(adjusted - target))
+        distances.sort()
+
+        encounters = result["encounters"]
+        self.assertEqual(
+            [abs(e["adjusted_xp"] - target) for e in encounters], distances[:8]
+        )
+        for encounter in encounters:
+            self.assertEqual(encounter["difficulty"], builder.HARD)
+            self.assertLessEqual(encounter["monsters"], max_monsters)
+            self.assertLessEqual(len(encounter["creatures"]), max_kinds)
+            self.assertEqual(encounter["xp"], sum(c["xp"] * c["count"] for c in encounter["creatures"]))
+            for creature in encounter["creatures"]:
+                self.assertEqual(table.get(creature["id"]).xp, creature["xp"])
+
+    def test_filters_and_seed(self):
+        table = synthetic_table(500)
+        kwargs = dict(types=["undead", "fiend"], challenge_max=5, results=10, seed=3)
+        result = builder.build(table, [5, 5, 6, 6], builder.DEADLY, **kwargs)
+        self.assertEqual(result, builder.build(table, [5, 5, 6, 6], builder.DEADLY, **kwargs))
+        self.assertEqual(len(result["encounters"]), 10)
+
+        for encounter in result["encounters"]:
+            for creature in encounter["creatures"]:
+                self.assertIn(creature["type"], {"undead", "fiend"})
+                self.assertLessEqual(creature["challenge"], 5)
+
+    def test_impossible_budget_returns_nothing(self):
+        table = synthetic_table(30, challenges=[30])
+        result = builder.build(table, [1], builder.EASY)
+        self.assertEqual(result["encounters"], [])
+
+    def test_filtered_cost_tables_are_bounded(self):
+        table = synthetic_table(30)
+        first = builder.cost_table(table)
+        for challenge in range(builder.COST_TABLE_CACHE_SIZE * 2):
+            builder.cost_table(table, challenge_min=challenge)
+            self.assertIs(builder.cost_table(table), first)  # a mais usada fica
+
+        self.assertEqual(len(builder._cost_tables), builder.COST_TABLE_CACHE_SIZE)
+        self.assertNotIn((None, 0, None), builder._cost_tables)
+
+    def test_large_bestiary_is_fast(self):
+        table = synthetic_table(50_000)
+        builder.cost_table(table)  # agrupamento por XP: uma vez por versão do bestiário
+
+        start = time.perf_counter()
+        for difficulty, levels in [(builder.MEDIUM, [5] * 4), (builder.DEADLY, [20] * 6)]:
+            result = builder.build(table, levels, difficulty, results=20,
+                                   max_monsters=builder.MAX_MONSTERS, max_kinds=builder.MAX_KINDS)
+            self.assertEqual(len(result["encounters"]), 20)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertIs(builder.cost_table(table), builder.cost_table(table))
@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+
+from .views import CreatureViewSet
+
+router = SimpleRouter()
+router.register(r"creatures", CreatureViewSet, basename="creature")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -1,3 +1,87 @@
-from django.shortcuts import render
+from fractions import Fraction
 
-# Create your views here.
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from .models import Creature
+from .pagination import CreatureCursorPagination
+from .serializers import (
+    CreatureSerializer,
+    CreatureListSerializer,
+    BulkCreatureImportSerializer,
+)
+
+
+class CreatureViewSet(viewsets.ModelViewSet):
+    """
+    Bestiário. Leitura para qualquer usuário logado; escrita e
+    importação só para a equipe (staff).
+
+    ?type=beast,dragon      um ou mais tipos
+    ?size=large
+    ?challenge=1/4          ND exato
+    ?challenge_min=1&challenge_max=5
+    ?search=gob             prefixo do nome (sem acento/maiúsculas)
+    """
+    pagination_class = CreatureCursorPagination
+
+    def get_permissions(self):
+        if self.action in ["list", "retrieve"]:
+            return [IsAuthenticated()]
+        return [IsAuthenticated(), IsAdminUser()]
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return CreatureListSerializer
+        return CreatureSerializer
+
+    def get_queryset(self):
+        qs = Creature.objects.all()
+        if self.action == "list":
+            qs = qs.only(*CreatureListSerializer.Meta.fields, "search_name")
+            qs = self._filter(qs, self.request.query_params)
+        return qs
+
+    def _filter(self, qs, params):
+        if "type" in params:
+            types = [t for t in params["type"].split(",") if t]
+            unknown = set(types) - set(Creature.Type.values)
+            if unknown:
+                raise ValidationError({"type": f"Tipos desconhecidos: {', '.join(sorted(unknown))}"})
+            qs = qs.filter(type__in=types)
+
+        if "size" in params:
+            if params["size"] not in Creature.Size.values:
+                raise ValidationError({"size": "Tamanho desconhecido."})
+            qs = qs.filter(size=params["size"])
+
+        for param, lookup in [
+            ("challenge", "challenge"),
+            ("challenge_min", "challenge__gte"),
+            ("challenge_max", "challenge__lte"),
+        ]:
+            if param in params:
+                try:
+                    value = float(Fraction(params[param]))
+                except (ValueError, ZeroDivisionError):
+                    raise ValidationError({param: "Informe um número ou fração (1/4)."})
+                qs = qs.filter(**{lookup: value})
+
+        if "search" in params:
+            qs = qs.search(params["search"])
+
+        return qs
+
+    # ----------------------------------------
+    # IMPORTAÇÃO EM LOTE (CRIA OU ATUALIZA PELO NOME)
+    # ----------------------------------------
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_creatures(self, request):
+        serializer = BulkCreatureImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        imported = Creature.objects.import_rows(serializer.validated_data["creatures"])
+        return Response({"imported": imported})
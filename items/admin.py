@@ -1,3 +1,30 @@
 from django.contrib import admin
+from .models import InventoryItem, Item, LootTable, LootTableEntry
 
-# Register your models here.
+
+@admin.register(Item)
+class ItemAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "category", "weight", "value", "capacity")
+    search_fields = ("name",)
+    list_filter = ("category",)
+
+
+@admin.register(InventoryItem)
+class InventoryItemAdmin(admin.ModelAdmin):
+    list_display = ("id", "character", "item", "quantity", "equipped", "container")
+    list_filter = ("equipped",)
+    list_select_related = ("character__campaign", "item", "container__item")
+    raw_id_fields = ("character", "item", "container")
+
+
+class LootTableEntryInline(admin.TabularInline):
+    model = LootTableEntry
+    raw_id_fields = ("item",)
+    extra = 0
+
+
+@admin.register(LootTable)
+class LootTableAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "updated_at")
+    search_fields = ("name",)
+    inlines = [LootTableEntryInline]
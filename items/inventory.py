@@ -0,0 +1,87 @@
+"""
+Movimentações em lote de inventário.
+
+`split_loot` reparte um monte de itens entre o grupo; `transfer` passa
+pilhas de um personagem para outro. As duas gravam tudo numa transação,
+com bulk_update/bulk_create (ver InventoryItemQuerySet.grant), em vez
+de um save() por pilha.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import InventoryItem
+
+
+def split_loot(character_ids, loot):
+    """
+    Divide [(item, quantidade)] igualmente entre os personagens. O que
+    sobra da divisão vai um a um, continuando de onde o item anterior
+    parou, para as sobras não caírem sempre no mesmo personagem.
+    Devolve [(personagem, item, quantidade)].
+    """
+    if not character_ids:
+        raise ValidationError("Ninguém para receber o saque.")
+
+    grants, turn = [], 0
+    for item_id, quantity in loot:
+        share, remainder = divmod(quantity, len(character_ids))
+        for i, character_id in enumerate(character_ids):
+            extra = 1 if (i - turn) % len(character_ids) < remainder else 0
+            if share + extra:
+                grants.append((character_id, item_id, share + extra))
+        turn = (turn + remainder) % len(character_ids)
+    return grants
+
+
+def give_loot(character_ids, loot):
+    """Reparte e grava o saque; devolve as partes de cada personagem."""
+    grants = split_loot(character_ids, loot)
+    InventoryItem.objects.grant(grants)
+    return grants
+
+
+def transfer(character, moves):
+    """
+    Passa pilhas de `character` para outros personagens da mesma
+    campanha. `moves`: [(pilha, personagem de destino, quantidade)].
+    Tudo ou nada: qualquer movimento inválido cancela todos.
+    """
+    from campaigns.models import CampaignCharacter
+
+    stack_ids = {stack_id for stack_id, _, _ in moves}
+    target_ids = {target_id for _, target_id, _ in moves}
+
+    with transaction.atomic():
+        stacks = {
+            s.pk: s for s in
+            InventoryItem.objects.select_for_update().filter(character=character, pk__in=stack_ids)
+        }
+        if len(stacks) != len(stack_ids):
+            raise ValidationError("Item não encontrado no inventário.")
+
+        targets = set(
+            CampaignCharacter.objects.filter(campaign_id=character.campaign_id, pk__in=target_ids)
+            .values_list("pk", flat=True)
+        )
+        if targets != target_ids:
+            raise ValidationError("Personagem de destino não está na campanha.")
+
+        if InventoryItem.objects.filter(container_id__in=stack_ids).exists():
+            raise ValidationError("Esvazie o container antes de passá-lo adiante.")
+
+        grants = []
+        for stack_id, target_id, quantity in moves:
+            stack = stacks[stack_id]
+            if quantity > stack.quantity:
+                raise ValidationError(f"Só há {stack.quantity} de {stack_id} para passar.")
+            stack.quantity -= quantity
+            grants.append((target_id, stack.item_id, quantity))
+
+        emptied = [s.pk for s in stacks.values() if s.quantity == 0]
+        InventoryItem.objects.bulk_update(
+            [s for s in stacks.values() if s.quantity], ["quantity"]
+        )
+        InventoryItem.objects.filter(pk__in=emptied).delete()
+        InventoryItem.objects.grant(grants)
+
+    return grants
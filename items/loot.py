@@ -0,0 +1,141 @@
+"""
+Sorteio em tabelas de saque.
+
+Cada tabela é compilada uma vez para o método de alias (Vose): duas
+listas de tamanho n (probabilidade e alias) e cada sorteio é um número
+aleatório, um índice e uma comparação, O(1) seja qual for o número de
+entradas. `draw` sorteia k entradas de uma vez numa compreensão de
+lista, e as quantidades de cada entrada saem de um único roll_many da
+sua expressão de dados (campaigns.dice).
+
+As tabelas compiladas ficam em cache no processo, indexadas pelo
+updated_at da tabela (que as entradas atualizam ao mudar, ver
+items.signals): conferir a versão é uma consulta pequena e só as
+tabelas que mudaram são recarregadas. Tabelas apagadas saem do cache
+na próxima recarga.
+"""
+import random
+import threading
+from collections import Counter
+
+from campaigns import dice
+
+from .models import LootTable, LootTableEntry
+
+MAX_ROLLS = 100_000
+
+
+class CompiledTable:
+    def __init__(self, version, entries):
+        """`entries`: [(item ou None, peso, expressão da quantidade)]."""
+        self.version = version
+        self.items = [item_id for item_id, _, _ in entries]
+        self.quantities = [dice.compile_expression(quantity) for _, _, quantity in entries]
+        self.probability, self.alias = build_alias([weight for _, weight, _ in entries])
+
+    def __len__(self):
+        return len(self.items)
+
+    def draw(self, k, rng):
+        """Índices de `k` entradas sorteadas pelo peso."""
+        n = len(self.items)
+        if not n:
+            return []
+        probability, alias, uniform = self.probability, self.alias, rng.random
+        draws = []
+        for _ in range(k):
+            u = uniform() * n
+            i = int(u)
+            draws.append(i if u - i < probability[i] else alias[i])
+        return draws
+
+    def roll(self, rolls, rng):
+        """{item: quantidade} de `rolls` sorteios (entradas "nada" ficam de fora)."""
+        totals = Counter()
+        for index, count in sorted(Counter(self.draw(rolls, rng)).items()):
+            item_id = self.items[index]
+            if item_id is None:
+                continue
+            quantity = sum(max(0, q) for q in self.quantities[index].roll_many(count, rng))
+            if quantity:
+                totals[item_id] += quantity
+        return totals
+
+
+def build_alias(weights):
+    """Tabelas (probabilidade, alias) do método de alias para pesos inteiros."""
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    probability, alias = [1.0] * n, list(range(n))
+
+    small = [i for i, p in enumerate(scaled) if p < 1]
+    large = [i for i, p in enumerate(scaled) if p >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probability[less], alias[less] = scaled[less], more
+        scaled[more] -= 1 - scaled[less]
+        (small if scaled[more] < 1 else large).append(more)
+    # o que sobra (erro de arredondamento) fica com probabilidade 1
+    return probability, alias
+
+
+_lock = threading.Lock()
+_compiled = {}
+
+
+def get_tables(table_ids):
+    """
+    {id: CompiledTable} das tabelas pedidas, recompilando só as que
+    mudaram desde a última vez. KeyError se alguma não existe.
+    """
+    table_ids = set(table_ids)
+    versions = dict(LootTable.objects.filter(pk__in=table_ids).values_list("pk", "updated_at"))
+    missing = table_ids - versions.keys()
+    if missing:
+        with _lock:
+            for pk in missing:
+                _compiled.pop(pk, None)
+        raise KeyError(min(missing))
+
+    with _lock:
+        stale = [pk for pk, version in versions.items()
+                 if pk not in _compiled or _compiled[pk].version != version]
+        if stale:
+            # aproveita a recarga para soltar tabelas apagadas
+            others = _compiled.keys() - versions.keys()
+            if others:
+                alive = set(LootTable.objects.filter(pk__in=others).values_list("pk", flat=True))
+                for pk in others - alive:
+                    del _compiled[pk]
+
+            entries = {pk: [] for pk in stale}
+            for table_id, item_id, weight, quantity in (
+                LootTableEntry.objects.filter(table_id__in=stale)
+                .order_by("table_id", "id")
+                .values_list("table_id", "item_id", "weight", "quantity")
+            ):
+                entries[table_id].append((item_id, weight, quantity))
+            for pk in stale:
+                _compiled[pk] = CompiledTable(versions[pk], entries[pk])
+        return {pk: _compiled[pk] for pk in table_ids}
+
+
+def invalidate():
+    with _lock:
+        _compiled.clear()
+
+
+def roll_tables(requests, seed=None):
+    """
+    Rola [(tabela, quantidade de sorteios)] em ordem com um único gerador
+    semeado. Devolve (seed, {item: quantidade}).
+    """
+    seed = dice.new_seed() if seed is None else seed
+    tables = get_tables(table_id for table_id, _ in requests)
+
+    rng = random.Random(seed)
+    totals = Counter()
+    for table_id, rolls in requests:
+        totals.update(tables[table_id].roll(rolls, rng))
+    return seed, totals
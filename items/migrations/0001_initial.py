@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('campaigns', '0013_alter_campaignlog_type_group_check'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Item',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150, unique=True)),
+                ('category', models.CharField(choices=[('weapon', 'Arma'), ('armor', 'Armadura'), ('gear', 'Equipamento'), ('tool', 'Ferramenta'), ('consumable', 'Consumível'), ('treasure', 'Tesouro'), ('container', 'Container')], default='gear', max_length=20)),
+                ('weight', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('value', models.PositiveIntegerField(default=0)),
+                ('capacity', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['category', 'name'], name='items_item_categor_166b5f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventoryItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('equipped', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('character', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='campaigns.campaigncharacter')),
+                ('container', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='contents', to='items.inventoryitem')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stacks', to='items.item')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['character', 'item'], name='items_inven_charact_8ed731_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('quantity__gte', 1)), name='inventory_quantity_positive')],
+            },
+        ),
+    ]
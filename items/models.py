@@ -1,3 +1,290 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
 
-# Create your models here.
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import (
+    Case, DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Capacidade de carga (regra variante de sobrecarga): Força x 5 deixa o
+# personagem sobrecarregado, x 10 muito sobrecarregado e x 15 é o máximo
+ENCUMBERED_PER_STRENGTH = 5
+HEAVILY_ENCUMBERED_PER_STRENGTH = 10
+CAPACITY_PER_STRENGTH = 15
+
+# containers dentro de containers
+MAX_CONTAINER_DEPTH = 3
+
+WEIGHT = DecimalField(max_digits=12, decimal_places=2)
+
+
+# ===========================================================
+# CATÁLOGO
+# ===========================================================
+
+class Item(models.Model):
+    class Category(models.TextChoices):
+        WEAPON = "weapon", "Arma"
+        ARMOR = "armor", "Armadura"
+        GEAR = "gear", "Equipamento"
+        TOOL = "tool", "Ferramenta"
+        CONSUMABLE = "consumable", "Consumível"
+        TREASURE = "treasure", "Tesouro"
+        CONTAINER = "container", "Container"
+
+    name = models.CharField(max_length=150, unique=True)
+    category = models.CharField(max_length=20, choices=Category.choices, default=Category.GEAR)
+
+    weight = models.DecimalField(max_digits=8, decimal_places=2, default=0)  # em libras
+    value = models.PositiveIntegerField(default=0)  # em peças de cobre
+    # peso máximo do conteúdo; só containers têm
+    capacity = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+
+    description = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+        indexes = [
+            models.Index(fields=["category", "name"]),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def is_container(self):
+        return self.capacity is not None
+
+    def clean(self):
+        if (self.category == self.Category.CONTAINER) != self.is_container:
+            raise ValidationError("Só containers (e todos eles) têm capacidade.")
+
+
+# ===========================================================
+# INVENTÁRIO
+# ===========================================================
+
+def stack_weight():
+    return F("quantity") * F("item__weight")
+
+
+def stack_value():
+    return F("quantity") * F("item__value")
+
+
+class Encumbrance(models.TextChoices):
+    NONE = "none", "Normal"
+    ENCUMBERED = "encumbered", "Sobrecarregado"
+    HEAVILY_ENCUMBERED = "heavily_encumbered", "Muito sobrecarregado"
+    OVER_CAPACITY = "over_capacity", "Acima da capacidade"
+
+
+def with_inventory_totals(characters):
+    """
+    Anota num queryset de CampaignCharacter, pelo banco, o peso carregado,
+    o valor total, o peso equipado, a capacidade e o nível de sobrecarga.
+    Subconsultas por personagem: não multiplica linhas de outros joins.
+    """
+    stacks = InventoryItem.objects.filter(character=OuterRef("pk")).order_by().values("character")
+
+    def total(expression, **filters):
+        rows = stacks.filter(**filters) if filters else stacks
+        return Coalesce(
+            Subquery(rows.annotate(total=Sum(expression, output_field=WEIGHT)).values("total")),
+            Value(Decimal(0)),
+            output_field=WEIGHT,
+        )
+
+    return characters.annotate(
+        carried_weight=total(stack_weight()),
+        equipped_weight=total(stack_weight(), equipped=True),
+        inventory_value=Coalesce(
+            Subquery(stacks.annotate(total=Sum(stack_value())).values("total")),
+            Value(0),
+        ),
+        carrying_capacity=F("strength") * CAPACITY_PER_STRENGTH,
+    ).annotate(
+        encumbrance=Case(
+            When(carried_weight__gt=F("strength") * CAPACITY_PER_STRENGTH,
+                 then=Value(Encumbrance.OVER_CAPACITY)),
+            When(carried_weight__gt=F("strength") * HEAVILY_ENCUMBERED_PER_STRENGTH,
+                 then=Value(Encumbrance.HEAVILY_ENCUMBERED)),
+            When(carried_weight__gt=F("strength") * ENCUMBERED_PER_STRENGTH,
+                 then=Value(Encumbrance.ENCUMBERED)),
+            default=Value(Encumbrance.NONE),
+        ),
+    )
+
+
+class InventoryItemQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Peso e valor de cada pilha e, nos containers, o peso do conteúdo."""
+        contents = (
+            InventoryItem.objects.filter(container=OuterRef("pk")).order_by().values("container")
+            .annotate(total=Sum(stack_weight(), output_field=WEIGHT)).values("total")
+        )
+        return self.annotate(
+            total_weight=ExpressionWrapper(stack_weight(), output_field=WEIGHT),
+            total_value=stack_value(),
+            contents_weight=Coalesce(Subquery(contents), Value(Decimal(0)), output_field=WEIGHT),
+        )
+
+    def grant(self, grants):
+        """
+        Adiciona [(personagem, item, quantidade)] aos inventários numa
+        transação: soma nas pilhas soltas (fora de container e não
+        equipadas) que já existem com um bulk_update e cria as que faltam
+        com um bulk_create. Devolve quantas pilhas foram tocadas.
+        """
+        wanted = defaultdict(int)
+        for character_id, item_id, quantity in grants:
+            if quantity > 0:
+                wanted[(character_id, item_id)] += quantity
+        if not wanted:
+            return 0
+
+        with transaction.atomic():
+            loose = (
+                InventoryItem.objects.select_for_update()
+                .filter(
+                    character_id__in={c for c, _ in wanted},
+                    item_id__in={i for _, i in wanted},
+                    container__isnull=True,
+                    equipped=False,
+                )
+                .order_by("-pk")
+            )
+            # havendo mais de uma pilha solta, soma na mais antiga
+            existing = {(s.character_id, s.item_id): s for s in loose}
+
+            now = timezone.now()
+            updated, created = [], []
+            for key, quantity in wanted.items():
+                stack = existing.get(key)
+                if stack is None:
+                    created.append(InventoryItem(character_id=key[0], item_id=key[1], quantity=quantity))
+                else:
+                    stack.quantity += quantity
+                    stack.updated_at = now
+                    updated.append(stack)
+
+            InventoryItem.objects.bulk_update(updated, ["quantity", "updated_at"])
+            InventoryItem.objects.bulk_create(created)
+        return len(updated) + len(created)
+
+
+class InventoryItem(models.Model):
+    """Uma pilha de um item no inventário de um personagem."""
+    objects = InventoryItemQuerySet.as_manager()
+
+    character = models.ForeignKey(
+        "campaigns.CampaignCharacter", on_delete=models.CASCADE, related_name="inventory"
+    )
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name="stacks")
+    quantity = models.PositiveIntegerField(default=1)
+    equipped = models.BooleanField(default=False)
+
+    # dentro de outra pilha do mesmo personagem (mochila, bolsa...);
+    # se o container sai do inventário o conteúdo fica solto
+    container = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="contents"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["character", "item"]),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=Q(quantity__gte=1), name="inventory_quantity_positive"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity}x {self.item} ({self.character})"
+
+    def clean(self):
+        if self.container_id is None:
+            return
+        if self.equipped:
+            raise ValidationError("Item equipado não pode ficar dentro de um container.")
+
+        container = self.container
+        if container.character_id != self.character_id:
+            raise ValidationError("O container é de outro personagem.")
+        if not container.item.is_container:
+            raise ValidationError(f"{container.item} não é um container.")
+        if container.quantity != 1:
+            raise ValidationError("Separe o container da pilha antes de guardar itens nele.")
+
+        # sobe a cadeia de containers: sem ciclos e sem passar da profundidade
+        depth, parent = 1, container
+        while parent.container_id is not None:
+            if parent.container_id == self.pk or depth >= MAX_CONTAINER_DEPTH:
+                raise ValidationError("Containers aninhados demais (ou em ciclo).")
+            parent = parent.container
+            depth += 1
+        if container.pk == self.pk:
+            raise ValidationError("Um container não pode ficar dentro dele mesmo.")
+
+        # capacidade: conteúdo atual (sem esta pilha) + esta pilha
+        stored = (
+            InventoryItem.objects.filter(container=container).exclude(pk=self.pk)
+            .aggregate(total=Sum(stack_weight(), output_field=WEIGHT))["total"]
+        ) or Decimal(0)
+        if stored + self.quantity * self.item.weight > container.item.capacity:
+            raise ValidationError(f"Não cabe em {container.item}.")
+
+
+# ===========================================================
+# TABELAS DE SAQUE
+# ===========================================================
+
+class LootTable(models.Model):
+    """Tabela de saque com entradas sorteadas pelo peso (ver items.loot)."""
+    name = models.CharField(max_length=150, unique=True)
+    description = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # versão da tabela compilada: muda também quando as entradas mudam
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class LootTableEntry(models.Model):
+    table = models.ForeignKey(LootTable, on_delete=models.CASCADE, related_name="entries")
+    # sem item: a entrada "nada" (o sorteio não dá nada)
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, null=True, blank=True, related_name="+")
+    weight = models.PositiveIntegerField(default=1)
+    # expressão de dados da quantidade (ex.: "2d6", "1")
+    quantity = models.CharField(max_length=30, default="1")
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.CheckConstraint(condition=Q(weight__gte=1), name="loot_entry_weight_positive"),
+        ]
+
+    def __str__(self):
+        return f"{self.table}: {self.item or '—'} ({self.weight})"
+
+    def clean(self):
+        from campaigns import dice
+
+        try:
+            self.quantity = str(dice.compile_expression(self.quantity))
+        except dice.DiceError as e:
+            raise ValidationError({"quantity": str(e)})
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ItemCursorPagination(CursorPagination):
+    """Paginação por cursor na ordem alfabética do catálogo."""
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("name", "id")
@@ -0,0 +1,171 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers
+
+from . import loot
+from .models import InventoryItem, Item, LootTable, LootTableEntry
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["id", "name", "category", "weight", "value", "capacity", "description"]
+
+    def validate(self, attrs):
+        item = Item(**{**self._current(), **attrs})
+        try:
+            item.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return attrs
+
+    def _current(self):
+        if self.instance is None:
+            return {}
+        return {field: getattr(self.instance, field) for field in ("category", "capacity")}
+
+
+class InventoryItemSerializer(serializers.ModelSerializer):
+    """Pilha do inventário, com peso/valor já calculados pelo banco (with_totals)."""
+    name = serializers.CharField(source="item.name", read_only=True)
+    category = serializers.CharField(source="item.category", read_only=True)
+    weight = serializers.DecimalField(source="item.weight", max_digits=8, decimal_places=2, read_only=True)
+    total_weight = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    total_value = serializers.IntegerField(read_only=True)
+    contents_weight = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = InventoryItem
+        fields = [
+            "id", "item", "name", "category", "weight",
+            "quantity", "equipped", "container",
+            "total_weight", "total_value", "contents_weight",
+        ]
+
+
+class InventoryWriteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InventoryItem
+        fields = ["item", "quantity", "equipped", "container"]
+
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Quantidade deve ser pelo menos 1.")
+        return value
+
+    def validate(self, attrs):
+        # clean() confere container (dono, capacidade, ciclos) e equipamento
+        stack = self.instance or InventoryItem(character=self.context["character"])
+        for field, value in attrs.items():
+            setattr(stack, field, value)
+        try:
+            stack.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return attrs
+
+
+class InventoryTotalsSerializer(serializers.Serializer):
+    """Totais anotados por with_inventory_totals."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    carried_weight = serializers.DecimalField(max_digits=12, decimal_places=2)
+    equipped_weight = serializers.DecimalField(max_digits=12, decimal_places=2)
+    inventory_value = serializers.IntegerField()
+    carrying_capacity = serializers.IntegerField()
+    encumbrance = serializers.CharField()
+
+
+class LootEntrySerializer(serializers.Serializer):
+    item = serializers.PrimaryKeyRelatedField(queryset=Item.objects.all())
+    quantity = serializers.IntegerField(min_value=1, max_value=1_000_000)
+
+
+class TableRollSerializer(serializers.Serializer):
+    table = serializers.IntegerField()
+    rolls = serializers.IntegerField(min_value=1, max_value=loot.MAX_ROLLS)
+
+
+class LootSerializer(serializers.Serializer):
+    items = LootEntrySerializer(many=True, default=list)
+    # sorteados das tabelas de saque e somados aos itens
+    tables = TableRollSerializer(many=True, default=list)
+    seed = serializers.IntegerField(min_value=0, max_value=2**63 - 1, required=False)
+    # sem a lista: todos os personagens ativos da campanha
+    characters = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        if not attrs["items"] and not attrs["tables"]:
+            raise serializers.ValidationError("Informe itens ou tabelas de saque.")
+        if sum(t["rolls"] for t in attrs["tables"]) > loot.MAX_ROLLS:
+            raise serializers.ValidationError(f"No máximo {loot.MAX_ROLLS} sorteios por vez.")
+        return attrs
+
+
+class MoveSerializer(serializers.Serializer):
+    stack = serializers.IntegerField()
+    character = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class TransferSerializer(serializers.Serializer):
+    moves = MoveSerializer(many=True, allow_empty=False)
+
+
+# TABELAS DE SAQUE
+
+class LootTableEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LootTableEntry
+        fields = ["id", "item", "weight", "quantity"]
+        read_only_fields = ["id"]
+
+    def validate_weight(self, value):
+        if value < 1:
+            raise serializers.ValidationError("O peso deve ser pelo menos 1.")
+        return value
+
+    def validate_quantity(self, value):
+        entry = LootTableEntry(quantity=value)
+        try:
+            entry.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict["quantity"])
+        return entry.quantity
+
+
+class LootTableSerializer(serializers.ModelSerializer):
+    # escrever `entries` substitui todas as entradas da tabela
+    entries = LootTableEntrySerializer(many=True, required=False)
+
+    class Meta:
+        model = LootTable
+        fields = ["id", "name", "description", "entries", "updated_at"]
+        read_only_fields = ["updated_at"]
+
+    @transaction.atomic
+    def create(self, validated_data):
+        entries = validated_data.pop("entries", [])
+        table = super().create(validated_data)
+        self._replace_entries(table, entries)
+        return table
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        entries = validated_data.pop("entries", None)
+        table = super().update(instance, validated_data)
+        if entries is not None:
+            self._replace_entries(table, entries)
+        return table
+
+    def _replace_entries(self, table, entries):
+        # bulk_create não dispara sinais: o save() da tabela acima já trocou a versão
+        table.entries.all().delete()
+        LootTableEntry.objects.bulk_create(
+            LootTableEntry(table=table, **entry) for entry in entries
+        )
+
+
+class LootRollSerializer(serializers.Serializer):
+    rolls = serializers.IntegerField(min_value=1, max_value=loot.MAX_ROLLS, default=1)
+    seed = serializers.IntegerField(min_value=0, max_value=2**63 - 1, required=False)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import LootTable, LootTableEntry
+
+
+@receiver(post_save, sender=LootTableEntry)
+@receiver(post_delete, sender=LootTableEntry)
+def touch_loot_table(sender, instance, **kwargs):
+    # nova versão da tabela: a compilada em cache deixa de valer
+    LootTable.objects.filter(pk=instance.table_id).update(updated_at=timezone.now())
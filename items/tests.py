@@ -1,3 +1,377 @@
+import time
+from collections import Counter
+from decimal import Decimal
+from fractions import Fraction
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from campaigns.models import Campaign, CampaignCharacter, CampaignLog
+from . import inventory, loot
+from .models import (
+    Encumbrance, InventoryItem, Item, LootTable, LootTableEntry, with_inventory_totals,
+)
+
+User = get_user_model()
+
+
+class InventoryTestMixin:
+    def setUp(self):
+        self.gm = User.objects.create_user("mestre")
+        self.campaign = Campaign.objects.create(name="Mesa", owner=self.gm)
+        self.players = [User.objects.create_user(f"player{i}") for i in range(3)]
+        self.campaign.players.add(*self.players)
+        self.party = [
+            CampaignCharacter.objects.create(
+                campaign=self.campaign, user=user, name=f"PJ {i}",
+                strength=10, status=CampaignCharacter.Status.ACTIVE,
+            )
+            for i, user in enumerate(self.players)
+        ]
+
+        self.sword = Item.objects.create(name="Espada longa", category="weapon", weight=3, value=1500)
+        self.arrows = Item.objects.create(name="Flecha", category="gear", weight=Decimal("0.05"), value=5)
+        self.gold = Item.objects.create(name="Peça de ouro", category="treasure", weight=Decimal("0.02"), value=100)
+        self.backpack = Item.objects.create(
+            name="Mochila", category="container", weight=5, value=200, capacity=30
+        )
+        self.anvil = Item.objects.create(name="Bigorna", category="tool", weight=120, value=500)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.gm)
+
+
+class InventoryModelTests(InventoryTestMixin, TestCase):
+    def test_totals_are_computed_by_the_database(self):
+        hero = self.party[0]
+        InventoryItem.objects.create(character=hero, item=self.sword, equipped=True)
+        InventoryItem.objects.create(character=hero, item=self.arrows, quantity=40)
+        InventoryItem.objects.create(character=self.party[1], item=self.anvil)
+
+        with self.assertNumQueries(1):
+            totals = {c.pk: c for c in with_inventory_totals(CampaignCharacter.objects.all())}
+
+        hero = totals[hero.pk]
+        self.assertEqual(hero.carried_weight, Decimal("5.00"))
+        self.assertEqual(hero.equipped_weight, Decimal("3.00"))
+        self.assertEqual(hero.inventory_value, 1700)
+        self.assertEqual(hero.carrying_capacity, 150)
+        self.assertEqual(hero.encumbrance, Encumbrance.NONE)
+
+        # 120 lb com Força 10: acima de 10 x 10, abaixo de 15 x 10
+        self.assertEqual(totals[self.party[1].pk].encumbrance, Encumbrance.HEAVILY_ENCUMBERED)
+        self.assertEqual(totals[self.party[2].pk].carried_weight, 0)
+        self.assertEqual(totals[self.party[2].pk].inventory_value, 0)
+
+    def test_grant_merges_into_loose_stacks_in_bulk(self):
+        hero = self.party[0]
+        loose = InventoryItem.objects.create(character=hero, item=self.arrows, quantity=10)
+        equipped = InventoryItem.objects.create(character=hero, item=self.sword, equipped=True)
+
+        grants = [(c.pk, self.arrows.pk, 20) for c in self.party] + [(hero.pk, self.sword.pk, 1)]
+        # select + bulk_update + bulk_create (+ savepoint da transação)
+        with self.assertNumQueries(5):
+            InventoryItem.objects.grant(grants)
+
+        loose.refresh_from_db()
+        equipped.refresh_from_db()
+        self.assertEqual((loose.quantity, equipped.quantity), (30, 1))
+        # a espada equipada não recebe a nova: vira outra pilha
+        self.assertEqual(hero.inventory.filter(item=self.sword).count(), 2)
+        self.assertEqual(InventoryItem.objects.filter(item=self.arrows).count(), 3)
+
+    def test_split_loot_spreads_remainders(self):
+        ids = [1, 2, 3]
+        grants = inventory.split_loot(ids, [(10, 4), (20, 2), (30, 3)])
+        received = {pk: sum(q for c, _, q in grants if c == pk) for pk in ids}
+        self.assertEqual(received, {1: 3, 2: 3, 3: 3})
+        self.assertEqual(sum(q for _, item, q in grants if item == 10), 4)
+
+        with self.assertRaises(ValidationError):
+            inventory.split_loot([], [(10, 1)])
+
+    def test_container_rules(self):
+        hero, other = self.party[0], self.party[1]
+        bag = InventoryItem.objects.create(character=hero, item=self.backpack)
+
+        InventoryItem(character=hero, item=self.arrows, quantity=100, container=bag).clean()
+
+        for stack in [
+            InventoryItem(character=hero, item=self.anvil, container=bag),            # não cabe
+            InventoryItem(character=other, item=self.arrows, container=bag),          # outro dono
+            InventoryItem(character=hero, item=self.sword, container=bag, equipped=True),
+        ]:
+            with self.assertRaises(ValidationError):
+                stack.clean()
+
+        sword = InventoryItem.objects.create(character=hero, item=self.sword)
+        with self.assertRaises(ValidationError):  # espada não é container
+            InventoryItem(character=hero, item=self.arrows, container=sword).clean()
+
+        # container dentro dele mesmo
+        bag.container = bag
+        with self.assertRaises(ValidationError):
+            bag.clean()
+
+    def test_transfer_is_all_or_nothing(self):
+        hero, friend = self.party[0], self.party[1]
+        arrows = InventoryItem.objects.create(character=hero, item=self.arrows, quantity=10)
+        sword = InventoryItem.objects.create(character=hero, item=self.sword)
+
+        inventory.transfer(hero, [(arrows.pk, friend.pk, 4), (sword.pk, friend.pk, 1)])
+        arrows.refresh_from_db()
+        self.assertEqual(arrows.quantity, 6)
+        self.assertFalse(InventoryItem.objects.filter(pk=sword.pk).exists())
+        self.assertEqual(
+            sorted(friend.inventory.values_list("item__name", "quantity")),
+            [("Espada longa", 1), ("Flecha", 4)],
+        )
+
+        outsider = CampaignCharacter.objects.create(
+            campaign=Campaign.objects.create(name="Outra", owner=self.gm),
+            user=self.gm, name="Forasteiro",
+        )
+        for moves in [
+            [(arrows.pk, friend.pk, 1), (arrows.pk, outsider.pk, 1)],
+            [(arrows.pk, friend.pk, 7)],
+        ]:
+            with self.assertRaises(ValidationError):
+                inventory.transfer(hero, moves)
+        arrows.refresh_from_db()
+        self.assertEqual(arrows.quantity, 6)
+
+
+class InventoryAPITests(InventoryTestMixin, TestCase):
+    def test_api_root_is_the_campaigns_one(self):
+        response = self.client.get("/api/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.data), {"campaigns", "characters", "invites", "campaign-logs"}
+        )
+
+    def test_catalog(self):
+        response = self.client.get("/api/items/", {"category": "weapon,tool"})
+        self.assertEqual([i["name"] for i in response.data["results"]], ["Bigorna", "Espada longa"])
+        self.assertEqual(self.client.get("/api/items/", {"category": "x"}).status_code, 400)
+        self.assertEqual(
+            [i["name"] for i in self.client.get("/api/items/", {"search": "fle"}).data["results"]],
+            ["Flecha"],
+        )
+
+        response = self.client.post("/api/items/", {"name": "Adaga", "weight": 1}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+        self.gm.is_staff = True
+        self.gm.save()
+        response = self.client.post(
+            "/api/items/", {"name": "Baú", "category": "gear", "capacity": 100}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_character_inventory(self):
+        hero = self.party[0]
+        url = f"/api/characters/{hero.pk}/inventory/"
+        self.client.force_authenticate(hero.user)
+
+        bag = self.client.post(url, {"item": self.backpack.pk}, format="json").data
+        response = self.client.post(
+            url, {"item": self.arrows.pk, "quantity": 20, "container": bag["id"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["total_weight"], "1.00")
+
+        response = self.client.post(url, {"item": self.anvil.pk, "container": bag["id"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        with self.assertNumQueries(4):  # membership + personagem + totais + pilhas
+            response = self.client.get(url)
+        self.assertEqual(response.data["totals"]["carried_weight"], "6.00")
+        self.assertEqual(response.data["totals"]["encumbrance"], "none")
+        bag_row = next(s for s in response.data["items"] if s["id"] == bag["id"])
+        self.assertEqual(bag_row["contents_weight"], "1.00")
+
+        arrows = response.data["items"][1]["id"]
+        response = self.client.patch(f"{url}{arrows}/", {"quantity": 50}, format="json")
+        self.assertEqual(response.data["total_weight"], "2.50")
+        self.assertEqual(self.client.delete(f"{url}{arrows}/").status_code, 204)
+
+        # outro jogador vê, mas não mexe
+        self.client.force_authenticate(self.party[1].user)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.post(url, {"item": self.sword.pk}, format="json").status_code, 403)
+
+    def test_loot_split_and_party_totals(self):
+        url = f"/api/campaigns/{self.campaign.pk}/loot/"
+        payload = {"items": [
+            {"item": self.gold.pk, "quantity": 100},
+            {"item": self.sword.pk, "quantity": 2},
+        ]}
+
+        with self.assertNumQueries(11):
+            response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [sum(i["quantity"] for i in share["items"]) for share in response.data["characters"]],
+            [34, 34, 34],
+        )
+        self.assertEqual(InventoryItem.objects.filter(item=self.gold).count(), 3)
+        self.assertTrue(CampaignLog.objects.filter(type=CampaignLog.LogType.LOOT).exists())
+
+        self.client.post(url, payload, format="json")
+        self.assertEqual(
+            sorted(InventoryItem.objects.filter(item=self.gold).values_list("quantity", flat=True)),
+            [66, 66, 68],
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/campaigns/{self.campaign.pk}/inventory/")
+        self.assertEqual(len(response.data), 3)
+        # o primeiro ficou com a sobra do ouro; as espadas, com os outros dois
+        self.assertEqual(
+            [c["inventory_value"] for c in response.data], [6800, 6600 + 2 * 1500, 6600 + 2 * 1500]
+        )
+
+        self.client.force_authenticate(self.party[0].user)
+        self.assertEqual(self.client.post(url, payload, format="json").status_code, 403)
+
+    def test_transfer_endpoint(self):
+        hero = self.party[0]
+        stack = InventoryItem.objects.create(character=hero, item=self.arrows, quantity=10)
+        self.client.force_authenticate(hero.user)
+
+        url = f"/api/characters/{hero.pk}/inventory/transfer/"
+        response = self.client.post(
+            url, {"moves": [{"stack": stack.pk, "character": self.party[1].pk, "quantity": 10}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.party[1].inventory.get().quantity, 10)
+
+        response = self.client.post(
+            url, {"moves": [{"stack": stack.pk, "character": self.party[1].pk, "quantity": 1}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class LootTableTests(InventoryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.table = LootTable.objects.create(name="Covil de goblins")
+        LootTableEntry.objects.bulk_create([
+            LootTableEntry(table=self.table, item=self.gold, weight=6, quantity="2d6"),
+            LootTableEntry(table=self.table, item=self.arrows, weight=3, quantity="1d4+1"),
+            LootTableEntry(table=self.table, item=self.sword, weight=1),
+            LootTableEntry(table=self.table, item=None, weight=10),
+        ])
+        loot.invalidate()
+
+    def test_alias_tables_are_exact(self):
+        weights = [6, 3, 1, 10, 7]
+        probability, alias = loot.build_alias(weights)
+
+        n = len(weights)
+        chance = [Fraction(0)] * n
+        for i in range(n):
+            kept = Fraction(probability[i]).limit_denominator(10**9)
+            chance[i] += kept / n
+            chance[alias[i]] += (1 - kept) / n
+        self.assertEqual(chance, [Fraction(w, sum(weights)) for w in weights])
+
+    def test_draws_follow_the_weights_and_are_seeded(self):
+        compiled = loot.get_tables([self.table.pk])[self.table.pk]
+        draws = Counter(compiled.draw(100_000, loot.random.Random(1)))
+        for index, weight in enumerate([6, 3, 1, 10]):
+            self.assertAlmostEqual(draws[index] / 100_000, weight / 20, delta=0.01)
+
+        first = loot.roll_tables([(self.table.pk, 500)], seed=9)
+        self.assertEqual(first, loot.roll_tables([(self.table.pk, 500)], seed=9))
+        seed, totals = first
+        # "nada" não vira item; ouro em 2d6 por sorteio
+        self.assertEqual(set(totals), {self.gold.pk, self.arrows.pk, self.sword.pk})
+        self.assertGreater(totals[self.gold.pk], totals[self.sword.pk])
+
+    def test_compiled_tables_are_cached_per_version(self):
+        loot.get_tables([self.table.pk])
+        with self.assertNumQueries(1):  # só a versão
+            loot.get_tables([self.table.pk])
+
+        entry = self.table.entries.get(item=self.sword)
+        entry.weight = 100
+        entry.save()
+        with self.assertNumQueries(2):  # versão + entradas
+            compiled = loot.get_tables([self.table.pk])[self.table.pk]
+        self.assertEqual(len(compiled), 4)
+
+        with self.assertRaises(KeyError):
+            loot.get_tables([self.table.pk, 999])
+
+    def test_deleted_tables_leave_the_cache(self):
+        other = LootTable.objects.create(name="Cripta")
+        LootTableEntry.objects.create(table=other, item=self.gold, weight=1)
+        loot.get_tables([self.table.pk, other.pk])
+        other_pk = other.pk
+        other.delete()
+
+        self.table.entries.first().delete()  # nova versão: recarrega
+        with self.assertNumQueries(3):  # versão, tabelas ainda vivas, entradas
+            loot.get_tables([self.table.pk])
+        self.assertEqual(set(loot._compiled), {self.table.pk})
+
+        with self.assertRaises(KeyError):
+            loot.get_tables([other_pk])
+
+    def test_dungeon_loot_goes_straight_into_inventories(self):
+        url = f"/api/campaigns/{self.campaign.pk}/loot/"
+        payload = {"tables": [{"table": self.table.pk, "rolls": 20_000}], "seed": 4}
+
+        start = time.perf_counter()
+        with self.assertNumQueries(12):
+            response = self.client.post(url, payload, format="json")
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["seed"], 4)
+
+        _, totals = loot.roll_tables([(self.table.pk, 20_000)], seed=4)
+        granted = Counter()
+        for item_id, quantity in InventoryItem.objects.values_list("item_id", "quantity"):
+            granted[item_id] += quantity
+        self.assertEqual(granted, totals)
+
+        response = self.client.post(url, {"tables": [{"table": 999, "rolls": 1}]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post(url, {}, format="json").status_code, 400)
+
+    def test_roll_endpoint_and_table_editing(self):
+        response = self.client.post(
+            f"/api/loot-tables/{self.table.pk}/roll/", {"rolls": 50, "seed": 2}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["seed"], 2)
+        self.assertEqual(InventoryItem.objects.count(), 0)  # só sorteia
+        self.assertEqual(
+            self.client.post("/api/loot-tables/999/roll/", {}, format="json").status_code, 404
+        )
+
+        payload = {"name": "Baú do dragão", "entries": [
+            {"item": self.gold.pk, "weight": 1, "quantity": "10d10 * 2"},
+        ]}
+        self.assertEqual(self.client.post("/api/loot-tables/", payload, format="json").status_code, 403)
+
+        self.gm.is_staff = True
+        self.gm.save()
+        self.assertEqual(self.client.post("/api/loot-tables/", payload, format="json").status_code, 400)
+
+        payload["entries"][0]["quantity"] = "10d10 + 5"
+        response = self.client.post("/api/loot-tables/", payload, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["entries"][0]["quantity"], "10d10+5")
 
-# Create your tests here.
+        url = f"/api/loot-tables/{response.data['id']}/"
+        response = self.client.patch(url, {"entries": [
+            {"item": self.sword.pk, "weight": 2}, {"item": None, "weight": 5},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(len(response.data["entries"]), 2)
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+
+from .views import ItemViewSet, LootTableViewSet
+
+router = SimpleRouter()
+router.register(r"items", ItemViewSet, basename="item")
+router.register(r"loot-tables", LootTableViewSet, basename="loot-table")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
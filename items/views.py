@@ -1,3 +1,91 @@
-from django.shortcuts import render
+from django.http import Http404
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from . import loot
+from .models import Item, LootTable
+from .pagination import ItemCursorPagination
+from .serializers import ItemSerializer, LootRollSerializer, LootTableSerializer
+
+
+class ItemViewSet(viewsets.ModelViewSet):
+    """
+    Catálogo de itens. Leitura para qualquer usuário logado; escrita só
+    para a equipe (staff).
+
+    ?category=weapon,armor
+    ?search=esp             prefixo do nome
+    """
+    serializer_class = ItemSerializer
+    pagination_class = ItemCursorPagination
+
+    def get_permissions(self):
+        if self.action in ["list", "retrieve"]:
+            return [IsAuthenticated()]
+        return [IsAuthenticated(), IsAdminUser()]
+
+    def get_queryset(self):
+        qs = Item.objects.all()
+        params = self.request.query_params
+
+        if "category" in params:
+            categories = [c for c in params["category"].split(",") if c]
+            unknown = set(categories) - set(Item.Category.values)
+            if unknown:
+                raise ValidationError(
+                    {"category": f"Categorias desconhecidas: {', '.join(sorted(unknown))}"}
+                )
+            qs = qs.filter(category__in=categories)
+
+        if "search" in params:
+            qs = qs.filter(name__istartswith=params["search"].strip())
+
+        return qs
+
+
+class LootTableViewSet(viewsets.ModelViewSet):
+    """
+    Tabelas de saque. Leitura e sorteio para qualquer usuário logado;
+    escrita só para a equipe (staff).
+    """
+    serializer_class = LootTableSerializer
+    pagination_class = ItemCursorPagination
+
+    def get_permissions(self):
+        if self.action in ["list", "retrieve", "roll"]:
+            return [IsAuthenticated()]
+        return [IsAuthenticated(), IsAdminUser()]
+
+    def get_queryset(self):
+        return LootTable.objects.prefetch_related("entries")
+
+    # ----------------------------------------
+    # SORTEAR SEM GRAVAR
+    # ----------------------------------------
+    @action(detail=True, methods=["post"])
+    def roll(self, request, pk=None):
+        serializer = LootRollSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            seed, totals = loot.roll_tables([(int(pk), data["rolls"])], data.get("seed"))
+        except (KeyError, ValueError):
+            raise Http404
+        return Response({
+            "seed": seed,
+            "rolls": data["rolls"],
+            "items": describe(totals),
+        })
+
+
+def describe(totals):
+    """[{item, name, quantity}] de um {item: quantidade}, numa consulta."""
+    names = dict(Item.objects.filter(pk__in=totals).values_list("pk", "name"))
+    return [
+        {"item": item_id, "name": names[item_id], "quantity": quantity}
+        for item_id, quantity in sorted(totals.items())
+    ]
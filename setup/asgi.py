@@ -1,6 +1,9 @@
 """
 ASGI config for setup project.
 
+O stream /api/campaigns/<id>/events/ (Server-Sent Events) só funciona
+sob ASGI: cada ouvinte é uma corrotina, não uma thread.
+
 It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
 
 application = get_asgi_application()
+
+# carrega o catálogo de regras em memória antes da primeira requisição
+from characters import catalog  # noqa: E402
+
+catalog.warm()
@@ -169,3 +169,17 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
+
+# Catálogo de regras em memória (characters.catalog)
+CATALOG_CACHE_MAX_ENTRIES = 20000
+CATALOG_VERSION_TTL = 2.0
+
+# Stream de atividade da mesa (campaigns.events)
+CAMPAIGN_EVENTS_QUEUE_SIZE = 256
+CAMPAIGN_EVENTS_KEEPALIVE = 15.0
+
+# Tabela compacta do bestiário em memória (creatures.statblocks)
+BESTIARY_VERSION_TTL = 2.0
+
+# Processos do pool compartilhado da simulação de encontros (creatures.simulation)
+ENCOUNTER_SIMULATION_WORKERS = min(4, os.cpu_count() or 1)
@@ -26,6 +26,9 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('allauth.urls')),
     path('api-auth/', include('rest_framework.urls')),
+    path("api/catalog/", include("characters.urls")),
+    path("api/", include("creatures.urls")),
+    path("api/", include("items.urls")),
     path("api/", include("campaigns.urls")),
 ]
 
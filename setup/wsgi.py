@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
 
 application = get_wsgi_application()
+
+# carrega o catálogo de regras em memória antes da primeira requisição
+from characters import catalog  # noqa: E402
+
+catalog.warm()